@@ -0,0 +1,446 @@
+"""
+Micro-benchmarks for the static site generator.
+
+Run from the repository root:
+
+    python3 src/bench.py            # run every benchmark
+    python3 src/bench.py props      # run only benchmarks whose name contains "props"
+"""
+import sys
+import time
+
+from htmlnode import LeafNode, ParentNode, escape_attr, escape_text
+
+
+def _best_of(func, repeat=20, number=1):
+    """Return the best wall-clock time in seconds of `number` calls to `func`."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def _list_heavy_page(lists=200, items=50):
+    """Build a node tree shaped like a list-heavy page with linked items."""
+    blocks = []
+    for i in range(lists):
+        list_items = [
+            ParentNode("li", [
+                LeafNode("a", f"item {j}", props={"href": f"/docs/{i}/{j}", "class": "ref"}),
+                LeafNode(None, " description"),
+            ])
+            for j in range(items)
+        ]
+        blocks.append(ParentNode("ul", list_items))
+    return ParentNode("div", blocks)
+
+
+def _props_to_html_uncached(props):
+    props_str = ""
+    for key, value in props.items():
+        props_str += f' {key}="{escape_attr(str(value))}"'
+    return props_str
+
+
+def _to_html_uncached(node):
+    """The previous serializer, escaping like the current one: rebuild props and tags with += on every call."""
+    if node.children:
+        inner_html = ""
+        for child in node.children:
+            inner_html += _to_html_uncached(child)
+        return f"<{node.tag}{_props_to_html_uncached(node._props or {})}>{inner_html}</{node.tag}>"
+    if node.tag is None:
+        return escape_text(node.value)
+    return f"<{node.tag}{_props_to_html_uncached(node._props or {})}>{escape_text(node.value)}</{node.tag}>"
+
+
+def bench_props_list_heavy_page():
+    """Serialize a list-heavy page repeatedly, with and without cached props."""
+    page = _list_heavy_page()
+    assert page.to_html() == _to_html_uncached(page)
+
+    # Alternate the two serializers so machine noise hits both alike
+    uncached = cached = float("inf")
+    for _ in range(40):
+        uncached = min(uncached, _best_of(lambda: _to_html_uncached(page), repeat=1))
+        cached = min(cached, _best_of(page.to_html, repeat=1))
+    return {"uncached_s": uncached, "cached_s": cached, "speedup": uncached / cached}
+
+
+def bench_template_render():
+    """Fill the site template for many small pages: re-read + str.replace vs a cached compiled template."""
+    from generator import _bind_template, _rewrite_basepath
+    from templates import load_template
+
+    template_path = "template.html"
+    contents = [f'<div><h1>Page {i}</h1><p><a href="/docs/{i}">link</a> text</p></div>' for i in range(500)]
+    basepath = "/Boot_Static_Site/"
+
+    def replaced():
+        for content in contents:
+            with open(template_path, "r", encoding="utf-8") as f:
+                template = f.read()
+            page = template.replace("{{ Title }}", "Title").replace("{{ Content }}", content)
+            _rewrite_basepath(page, basepath)
+
+    def compiled():
+        for content in contents:
+            bound = _bind_template(load_template(template_path), basepath)
+            bound.render({"Title": "Title", "Content": _rewrite_basepath(content, basepath)})
+
+    replace_s = _best_of(replaced)
+    compiled_s = _best_of(compiled)
+    return {"replace_s": replace_s, "compiled_s": compiled_s, "speedup": replace_s / compiled_s}
+
+
+def _article_markdown(paragraphs=300):
+    """A long article: paragraphs with inline markup and links, a few with `<` and `&`, lists and code."""
+    blocks = ["# Article"]
+    for i in range(paragraphs):
+        blocks.append(f"Paragraph {i} has **bold** and _italic_ words, `code`, and a [link](/docs/{i}?page=2) "
+                      "to another page in the same section of the site.")
+        if i % 10 == 0:
+            blocks.append(f"- item with a < b & c > d\n- second item {i}\n- [third](/x/{i})")
+            blocks.append("```\nif (a < b && c > d) {\n    return \"<p>\";\n}\n```")
+    return "\n\n".join(blocks)
+
+
+def bench_escaping(repeat=40):
+    """
+    Render an article and serialize a node tree, with escaping and with the escape helpers as no-ops.
+
+    Escaping costs the fast path a few percent. The list-heavy tree has
+    little markup per text value, so its overhead is larger and noisy:
+    between 5% and 40% of serialization time, usually 10-25%. The cost is
+    the membership checks on every value; `str.translate` and a regex
+    search are both slower than them.
+    """
+    import converter
+    import htmlnode
+
+    markdown = _article_markdown()
+    page = _list_heavy_page()
+    escapes = converter.escape_text, converter.escape_attr, htmlnode.escape_text
+
+    def set_escapes(funcs):
+        converter.escape_text, converter.escape_attr, htmlnode.escape_text = funcs
+
+    # Alternate the two variants so machine noise hits both alike
+    best = {}
+    try:
+        for _ in range(repeat):
+            for name, funcs in (("escaped", escapes), ("unescaped", (lambda text: text,) * 3)):
+                set_escapes(funcs)
+                for kind, func in (("fast", lambda: converter.markdown_to_html(markdown)), ("tree", page.to_html)):
+                    key = f"{kind}_{name}_s"
+                    best[key] = min(best.get(key, float("inf")), _best_of(func, repeat=1))
+    finally:
+        set_escapes(escapes)
+    for kind in ("fast", "tree"):
+        best[f"{kind}_overhead"] = best[f"{kind}_escaped_s"] / best[f"{kind}_unescaped_s"] - 1
+    return best
+
+
+def _peak_bytes(func):
+    """Peak traced allocation in bytes while `func` runs."""
+    import tracemalloc
+
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_span_rendering():
+    """Write a large page to a file via block strings and via source spans: peak allocation and time."""
+    import os
+
+    from converter import block_to_html
+    from markdown_extract import iter_blocks
+    from spans import write_markdown
+
+    markdown = _article_markdown(3000) + "\n\n" + "\n".join(
+        f"- item {i} with _italic_ text, `code` and a [link](/p/{i})" for i in range(20000))
+
+    with open(os.devnull, "w") as out:
+        def strings():
+            # The streamed generator path: one HTML string per block
+            for block in iter_blocks(markdown):
+                out.write(block_to_html(block))
+
+        def spans():
+            write_markdown(markdown, out.write)
+
+        strings_peak, spans_peak = _peak_bytes(strings), _peak_bytes(spans)
+        strings_s, spans_s = _best_of(strings, repeat=5), _best_of(spans, repeat=5)
+    return {
+        "strings_peak_kb": strings_peak // 1024, "spans_peak_kb": spans_peak // 1024,
+        "peak_ratio": strings_peak / spans_peak, "strings_s": strings_s, "spans_s": spans_s,
+    }
+
+
+def bench_flat_documents(pages=100):
+    """Hold many parsed pages as HTMLNode trees and as FlatDocuments: memory, build and serialize time."""
+    import tracemalloc
+
+    from converter import markdown_to_html_node
+    from flatdoc import flatten_markdown
+
+    sources = [_article_markdown(30).replace("Article", f"Article {i}") for i in range(pages)]
+    results = {}
+    for name, build in (("tree", markdown_to_html_node), ("flat", flatten_markdown)):
+        tracemalloc.start()
+        try:
+            held = [build(source) for source in sources]
+            results[f"{name}_kb"] = tracemalloc.get_traced_memory()[0] // 1024
+        finally:
+            tracemalloc.stop()
+        results[f"{name}_build_s"] = _best_of(lambda: [build(source) for source in sources], repeat=5)
+        results[f"{name}_to_html_s"] = _best_of(lambda: [doc.to_html() for doc in held], repeat=5)
+    results["memory_ratio"] = results["tree_kb"] / results["flat_kb"]
+    return results
+
+
+def _comment_snippets(count=5000):
+    """Comment-sized documents: a sentence or two, some with inline markup, a few with a list or sign-off."""
+    import random
+
+    rng = random.Random(1)
+    marked = "great post thanks I agree but the **main** point is _different_ see [docs](/docs) and `code` a<b".split()
+    plain = "great post thanks I agree but the main point is different see the docs and code".split()
+    snippets = []
+    for i in range(count):
+        pool = marked if i % 2 else plain
+        snippet = " ".join(rng.choice(pool) for _ in range(rng.randint(3, 25)))
+        if i % 7 == 0:
+            snippet += "\n\n- yes\n- no"
+        if i % 3 == 0:
+            snippet += "\n\nThanks!"
+        snippets.append(snippet)
+    return snippets
+
+
+def _text_to_textnodes_all_passes(text):
+    """`splitter.text_to_textnodes` running every splitting pass, as it did before skipping absent markers."""
+    from splitter import split_nodes_delimiter, split_nodes_image, split_nodes_link
+    from textnode import TextNode, TextType
+
+    if not text:
+        return []
+    nodes = [TextNode(text, TextType.PLAIN)]
+    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    nodes = split_nodes_image(nodes)
+    return split_nodes_link(nodes)
+
+
+def bench_snippet_conversion(count=5000):
+    """
+    Split the inline text of comment-sized snippets, running every pass vs skipping passes whose marker is absent.
+
+    Also reports converting every snippet with `markdown_to_html`. The two
+    splitters are timed in alternation so machine noise hits both alike.
+    """
+    from converter import markdown_to_html
+    from markdown_extract import parse_blocks
+    from splitter import text_to_textnodes
+
+    snippets = _comment_snippets(count)
+    texts = [block.text for snippet in snippets for block in parse_blocks(snippet)]
+    all_passes = skipping = float("inf")
+    for _ in range(10):
+        all_passes = min(all_passes, _best_of(lambda: [_text_to_textnodes_all_passes(t) for t in texts], repeat=1))
+        skipping = min(skipping, _best_of(lambda: [text_to_textnodes(t) for t in texts], repeat=1))
+    return {
+        "all_passes_s": all_passes,
+        "skipping_s": skipping,
+        "speedup": all_passes / skipping,
+        "convert_s": _best_of(lambda: [markdown_to_html(snippet) for snippet in snippets], repeat=5),
+    }
+
+
+def _makespan(tasks, workers, per_task=0.0):
+    """Finish time of `tasks` (lists of costs) handed in order to whichever of `workers` is free first."""
+    import heapq
+
+    free = [0.0] * workers
+    for task in tasks:
+        heapq.heappush(free, heapq.heappop(free) + per_task + sum(task))
+    return max(free)
+
+
+def bench_page_scheduling(pages=2000, workers=8, per_task=0.002):
+    """
+    Simulated build time of a site with one huge page walked last, in walk order vs longest first.
+
+    Costs are seconds per page; `per_task` is the round trip of sending one
+    task to a worker process.
+    """
+    import random
+
+    from schedule import plan_chunks
+
+    rng = random.Random(1)
+    costs = [rng.uniform(0.001, 0.01) for _ in range(pages - 1)] + [2.0]
+    walk = _makespan([[cost] for cost in costs], workers, per_task)
+    planned = _makespan([[costs[i] for i in task] for task in plan_chunks(range(pages), costs, workers)],
+                        workers, per_task)
+    return {
+        "walk_order_s": walk,
+        "longest_first_s": planned,
+        "ideal_s": max(max(costs), sum(costs) / workers),
+        "speedup": walk / planned,
+    }
+
+
+def bench_daemon_rebuild(pages=200):
+    """
+    Rebuild a site after one page was edited: a fresh `main.py` process vs a warm `daemon.BuildDaemon`.
+
+    The fresh process pays interpreter start-up, imports, template
+    compilation and a full rebuild; the daemon only rebuilds the edited page.
+    """
+    import os
+    import subprocess
+    import tempfile
+
+    from daemon import BuildDaemon
+
+    main_py = os.path.join(os.path.dirname(os.path.abspath(__file__)), "main.py")
+    with tempfile.TemporaryDirectory() as root:
+        for name, text in (("template.html", "<title>{{ Title }}</title>{{ Content }}"),
+                           ("static/index.css", "body {}")):
+            os.makedirs(os.path.dirname(os.path.join(root, name)), exist_ok=True)
+            with open(os.path.join(root, name), "w") as f:
+                f.write(text)
+        edited = os.path.join(root, "content", "page0", "index.md")
+        for i in range(pages):
+            path = os.path.join(root, "content", f"page{i}", "index.md")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w") as f:
+                f.write(_article_markdown(5).replace("Article", f"Article {i}"))
+
+        def edit():
+            with open(edited, "a") as f:
+                f.write("\n\nOne more paragraph.")
+
+        def cold():
+            edit()
+            subprocess.run([sys.executable, main_py], cwd=root, check=True, stdout=subprocess.DEVNULL)
+
+        daemon = BuildDaemon(os.path.join(root, "content"), os.path.join(root, "template.html"),
+                             os.path.join(root, "docs"), static_dir=os.path.join(root, "static"),
+                             logger=lambda msg: None)
+        daemon.full()
+
+        def warm():
+            edit()
+            assert len(daemon.incremental()["built"]) == 1
+
+        results = {"cold_process_s": _best_of(cold, repeat=3), "daemon_incremental_s": _best_of(warm, repeat=10)}
+    results["speedup"] = results["cold_process_s"] / results["daemon_incremental_s"]
+    return results
+
+
+# Inputs that make backtracking link/image patterns or delimiter searches rescan the text
+PATHOLOGICAL_INLINE = {
+    "brackets": "[",
+    "close_open": "](",
+    "image_openers": "![",
+    "unclosed_images": "![a](",
+    "unclosed_links": "[a](",
+    "unclosed_lines": "[a](\n",
+    "underscores": "_",
+    "stars": "**",
+}
+
+
+def bench_pathological_inline(n=40000, factor=8, limit=24.0):
+    """
+    Parse adversarial inline text at `n` and `factor * n` repetitions.
+
+    Linear parsing grows the time by about `factor`; the benchmark fails if
+    any input grows it by more than `limit` (a quadratic parser would show
+    `factor ** 2`).
+    """
+    from markdown_extract import extract_markdown_images, extract_markdown_links
+    from splitter import text_to_textnodes
+
+    def parse(text):
+        try:
+            text_to_textnodes(text)
+        except ValueError:
+            pass  # an unclosed delimiter is rejected, which must be fast too
+        extract_markdown_images(text)
+        extract_markdown_links(text)
+
+    results = {}
+    worst = 0.0
+    for name, unit in PATHOLOGICAL_INLINE.items():
+        small_text, large_text = unit * n, unit * (n * factor)
+        small = _best_of(lambda: parse(small_text), repeat=5)
+        large = _best_of(lambda: parse(large_text), repeat=5)
+        results[f"{name}_growth"] = large / small
+        worst = max(worst, large / small)
+    assert worst < limit, f"inline parsing grew {worst:.1f}x for {factor}x the input"
+    return results
+
+
+# Documents whose fence openers are never closed; retrying each opener would rescan the rest
+PATHOLOGICAL_BLOCKS = {
+    "unclosed_fences": "```x\n\n",
+    "unclosed_fences_in_paragraphs": "text\n```x\n",
+}
+
+
+def bench_pathological_blocks(n=20000, factor=8, limit=24.0):
+    """Split adversarial documents into blocks at `n` and `factor * n` repetitions; see `bench_pathological_inline`."""
+    from markdown_extract import parse_blocks
+
+    results = {}
+    worst = 0.0
+    for name, unit in PATHOLOGICAL_BLOCKS.items():
+        small_text, large_text = unit * n, unit * (n * factor)
+        small = _best_of(lambda: parse_blocks(small_text), repeat=5)
+        large = _best_of(lambda: parse_blocks(large_text), repeat=5)
+        results[f"{name}_growth"] = large / small
+        worst = max(worst, large / small)
+    assert worst < limit, f"block scanning grew {worst:.1f}x for {factor}x the input"
+    return results
+
+
+BENCHMARKS = {
+    "props_list_heavy_page": bench_props_list_heavy_page,
+    "template_render": bench_template_render,
+    "pathological_inline": bench_pathological_inline,
+    "pathological_blocks": bench_pathological_blocks,
+    "escaping": bench_escaping,
+    "span_rendering": bench_span_rendering,
+    "flat_documents": bench_flat_documents,
+    "snippet_conversion": bench_snippet_conversion,
+    "page_scheduling": bench_page_scheduling,
+    "daemon_rebuild": bench_daemon_rebuild,
+}
+
+
+def main(argv):
+    selected = argv[1:] if len(argv) > 1 else None
+    for name, func in BENCHMARKS.items():
+        if selected and not any(s in name for s in selected):
+            continue
+        results = func()
+        formatted = ", ".join(
+            f"{key}={value:.4f}" if isinstance(value, float) else f"{key}={value}"
+            for key, value in results.items()
+        )
+        print(f"{name}: {formatted}")
+
+
+if __name__ == "__main__":
+    main(sys.argv)
@@ -1,6 +1,8 @@
-from htmlnode import LeafNode, ParentNode
+from typing import Iterable, List, Optional
+
+from htmlnode import LeafNode, ParentNode, escape_attr, escape_text
 from textnode import TextType, TextNode
-from markdown_extract import markdown_to_blocks, block_to_block_type, BlockType
+from markdown_extract import parse_block, parse_blocks, Block, BlockType
 from splitter import text_to_textnodes
 
 def text_node_to_html_node(text_node: TextNode) -> LeafNode:
@@ -56,17 +58,124 @@ def text_to_children(text):
     return children
 
 
-def block_to_html_node(block, block_type):
+def _render_leaf(tag, text):
+    if not text:
+        raise ValueError("LeafNode has no value")
+    return f"<{tag}>{escape_text(text)}</{tag}>"
+
+
+def _render_plain(text_node):
+    if not text_node.text:
+        raise ValueError("LeafNode has no value")
+    return escape_text(text_node.text)
+
+
+def _render_link(text_node):
+    if text_node.URL is None:
+        raise ValueError("TextNode of type LINK requires a URL")
+    if not text_node.text:
+        raise ValueError("LeafNode has no value")
+    return f'<a href="{escape_attr(text_node.URL)}">{escape_text(text_node.text)}</a>'
+
+
+def _render_image(text_node):
+    if text_node.URL is None:
+        raise ValueError("TextNode of type IMAGE requires a URL")
+    return f'<img src="{escape_attr(text_node.URL)}" alt="{escape_attr(text_node.text)}"> </img>'
+
+
+# TextType -> callable rendering a TextNode straight to its HTML string
+_TEXT_RENDERERS = {
+    TextType.PLAIN: _render_plain,
+    TextType.BOLD: lambda text_node: _render_leaf("b", text_node.text),
+    TextType.ITALIC: lambda text_node: _render_leaf("i", text_node.text),
+    TextType.CODE: lambda text_node: _render_leaf("code", text_node.text),
+    TextType.LINK: _render_link,
+    TextType.IMAGE: _render_image,
+}
+
+
+# Text types whose URL is collected for link checking
+_URL_TYPES = (TextType.LINK, TextType.IMAGE)
+
+
+def text_node_to_html(text_node: TextNode) -> str:
+    """
+    Render a TextNode directly to an HTML string.
+
+    Produces the same output as `text_node_to_html_node(text_node).to_html()`
+    without building the intermediate LeafNode.
+    """
+    if not isinstance(text_node, TextNode):
+        raise ValueError("Input must be a TextNode")
+
+    renderer = _TEXT_RENDERERS.get(text_node.text_type)
+    if renderer is None:
+        raise ValueError(f"Invalid text_type: {text_node.text_type}")
+    return renderer(text_node)
+
+
+def text_to_html(text, links=None):
+    """
+    Convert a string of inline markdown text straight to an HTML string.
+
+    Fast path for callers that only need the HTML and not the node tree.
+    When a `links` list is given, the URL of every link and image is
+    appended to it.
+    """
+    text_nodes = text_to_textnodes(text)
+    if not text_nodes:
+        raise ValueError("ParentNode requires children, but child list is empty")
+    if links is not None:
+        links.extend([node.URL for node in text_nodes if node.text_type in _URL_TYPES])
+    return "".join([text_node_to_html(text_node) for text_node in text_nodes])
+
+
+def block_to_html(block, links=None):
+    """
+    Render a Block record straight to an HTML string.
+
+    Produces the same output as `block_to_html_node(block).to_html()`.
+    Link and image URLs are appended to `links` if given.
+    """
+    block_type = block.type
+    if block_type == BlockType.HEADING:
+        tag = f"h{block.level}"
+        return f"<{tag}>{text_to_html(block.text[block.level + 1:], links)}</{tag}>"
+    elif block_type == BlockType.CODE:
+        return f"<pre>{_render_leaf('code', block.text[3:-3])}</pre>"
+    elif block_type == BlockType.QUOTE:
+        quote_text = "\n".join(block.items())
+        return f"<blockquote>{text_to_html(quote_text, links)}</blockquote>"
+    elif block_type == BlockType.UNORDERED_LIST or block_type == BlockType.ORDERED_LIST:
+        tag = "ul" if block_type == BlockType.UNORDERED_LIST else "ol"
+        items = "".join([f"<li>{text_to_html(item, links)}</li>" for item in block.items()])
+        return f"<{tag}>{items}</{tag}>"
+    else:  # PARAGRAPH
+        return f"<p>{text_to_html(block.text, links)}</p>"
+
+
+def block_to_html_node(block, block_type=None):
     """
     Convert a single markdown block into an HTMLNode.
     
     Args:
-        block: The markdown block text
-        block_type: The BlockType of the block
+        block: A Block record from `parse_block`, or raw markdown block text
+        block_type: Optional expected BlockType when `block` is raw text;
+            raw text is always classified here and checked against it
         
     Returns:
         An HTMLNode representing the block
+
+    Raises:
+        ValueError: if `block_type` does not match the parsed block
     """
+    if not isinstance(block, Block):
+        block = parse_block(block)
+        if block_type is not None and block.type != block_type:
+            raise ValueError(f"Block is {block.type}, not {block_type}")
+
+    block_type = block.type
     if block_type == BlockType.HEADING:
         return heading_block_to_html_node(block)
     elif block_type == BlockType.CODE:
@@ -82,30 +191,22 @@ def block_to_html_node(block, block_type):
 
 
 def heading_block_to_html_node(block):
-    """Convert a heading block to an HTMLNode."""
-    # Find the number of # characters
-    hashes = 0
-    for char in block:
-        if char == "#":
-            hashes += 1
-        else:
-            break
-    
-    # Extract heading text (after the # characters and space)
-    heading_text = block[hashes + 1:]
+    """Convert a heading Block to an HTMLNode."""
+    # Heading text starts after the # characters and the space
+    heading_text = block.text[block.level + 1:]
     
     # Convert heading text to children
     children = text_to_children(heading_text)
     
     # Create heading tag (h1-h6)
-    tag = f"h{hashes}"
+    tag = f"h{block.level}"
     return ParentNode(tag, children)
 
 
 def code_block_to_html_node(block):
-    """Convert a code block to an HTMLNode."""
+    """Convert a code Block to an HTMLNode."""
     # Remove the opening and closing backticks
-    code_text = block[3:-3]
+    code_text = block.text[3:-3]
     
     # Code blocks don't parse inline markdown, just create a plain text node
     code_leaf = LeafNode("code", code_text)
@@ -115,20 +216,9 @@ def code_block_to_html_node(block):
 
 
 def quote_block_to_html_node(block):
-    """Convert a quote block to an HTMLNode."""
-    # Split by newlines and remove the > from each line
-    lines = block.split("\n")
-    quote_lines = []
-    
-    for line in lines:
-        # Remove the > and any following space
-        if line.startswith("> "):
-            quote_lines.append(line[2:])
-        elif line.startswith(">"):
-            quote_lines.append(line[1:])
-    
-    # Join the lines back together
-    quote_text = "\n".join(quote_lines)
+    """Convert a quote Block to an HTMLNode."""
+    # Join the lines back together without their > markers
+    quote_text = "\n".join(block.items())
     
     # Convert to children
     children = text_to_children(quote_text)
@@ -136,51 +226,34 @@ def quote_block_to_html_node(block):
     return ParentNode("blockquote", children)
 
 
-def unordered_list_block_to_html_node(block):
-    """Convert an unordered list block to an HTMLNode."""
-    # Split by newlines
-    lines = block.split("\n")
+def _list_items(block):
+    """Build the <li> children of a list Block."""
     list_items = []
     
-    for line in lines:
-        # Remove the "- " prefix
-        item_text = line[2:]
-        
+    for item_text in block.items():
         # Convert to children
         children = text_to_children(item_text)
         
         # Create list item
-        list_item = ParentNode("li", children)
-        list_items.append(list_item)
+        list_items.append(ParentNode("li", children))
     
-    return ParentNode("ul", list_items)
+    return list_items
+
+
+def unordered_list_block_to_html_node(block):
+    """Convert an unordered list Block to an HTMLNode."""
+    return ParentNode("ul", _list_items(block))
 
 
 def ordered_list_block_to_html_node(block):
-    """Convert an ordered list block to an HTMLNode."""
-    # Split by newlines
-    lines = block.split("\n")
-    list_items = []
-    
-    for line in lines:
-        # Find the dot and space, then extract the text after
-        dot_index = line.index(". ")
-        item_text = line[dot_index + 2:]
-        
-        # Convert to children
-        children = text_to_children(item_text)
-        
-        # Create list item
-        list_item = ParentNode("li", children)
-        list_items.append(list_item)
-    
-    return ParentNode("ol", list_items)
+    """Convert an ordered list Block to an HTMLNode."""
+    return ParentNode("ol", _list_items(block))
 
 
 def paragraph_block_to_html_node(block):
-    """Convert a paragraph block to an HTMLNode."""
+    """Convert a paragraph Block to an HTMLNode."""
     # Convert to children
-    children = text_to_children(block)
+    children = text_to_children(block.text)
     
     return ParentNode("p", children)
 
@@ -195,15 +268,60 @@ def markdown_to_html_node(markdown):
     Returns:
         A ParentNode (div) containing all block nodes as children
     """
-    # Split markdown into blocks
-    blocks = markdown_to_blocks(markdown)
-    
-    # Convert each block to an HTMLNode
+    # Split markdown into typed blocks and convert each to an HTMLNode
     children = []
-    for block in blocks:
-        block_type = block_to_block_type(block)
-        block_node = block_to_html_node(block, block_type)
-        children.append(block_node)
+    for block in parse_blocks(markdown):
+        children.append(block_to_html_node(block))
     
     # Return a parent div containing all block nodes
-    return ParentNode("div", children)
\ No newline at end of file
+    return ParentNode("div", children)
+
+
+def markdown_to_html(markdown, fast=True):
+    """
+    Convert a full markdown document into an HTML string.
+
+    Args:
+        markdown: A string containing the full markdown document
+        fast: Render text nodes and blocks straight to strings instead of
+            building the HTMLNode tree first. Both paths produce identical HTML.
+
+    Returns:
+        The HTML of the document wrapped in a <div>
+    """
+    if not fast:
+        return markdown_to_html_node(markdown).to_html()
+
+    blocks = parse_blocks(markdown)
+    if not blocks:
+        raise ValueError("ParentNode requires children, but child list is empty")
+    return "<div>" + "".join([block_to_html(block) for block in blocks]) + "</div>"
+
+
+def markdown_to_html_many(documents: Iterable[str], errors: Optional[list] = None) -> List[Optional[str]]:
+    """
+    Convert many markdown documents to HTML strings, returned in order.
+
+    For batches of small documents (comments, previews). Each result is
+    what `markdown_to_html(document)` returns; one failing document does
+    not stop the others when `errors` is given.
+
+    Args:
+        documents: A list or iterator of markdown strings
+        errors: If given, a document that fails to convert gives None in the
+            results and `(index, error)` is appended here; otherwise the
+            first failure is raised
+
+    Returns:
+        A list with one HTML string (or None) per document
+    """
+    results = []
+    for index, document in enumerate(documents):
+        try:
+            results.append(markdown_to_html(document))
+        except ValueError as e:
+            if errors is None:
+                raise
+            errors.append((index, e))
+            results.append(None)
+    return results
@@ -0,0 +1,332 @@
+import json
+import os
+import shutil
+import socket
+import socketserver
+import stat
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+from fs_utils import ASSET_MANIFEST, copy_dir_recursive, file_digest, fingerprint_name, iter_files_sorted
+from generator import _html_rel_path, _page_error, _remove_output, generate_page, iter_content_files
+from templates import load_template, select_template
+
+
+class BuildDaemon:
+    """
+    A site build that stays in memory between requests.
+
+    Modules stay imported and compiled templates stay cached (see
+    `templates.load_template`). The daemon also keeps an index of every
+    content file with the modification time and size it was last built
+    from, and the compiled template each page used. An incremental build
+    then only stats the content directory. It rebuilds the pages whose
+    source changed or whose template (or an include or parent) was edited,
+    and removes the output of deleted sources.
+
+    The static directory is indexed the same way. Incremental and single
+    page builds first re-copy the static files that changed and remove the
+    copies of deleted ones. With `fingerprint`, a changed asset gets a new
+    hashed name. That changes the asset manifest, so every page is rebuilt
+    to reference the new names.
+
+    Builds run one at a time. Each returns a result dict, ready to be sent
+    back as JSON:
+
+        {"ok": True, "built": [...], "removed": [...], "unchanged": 12, "copied": [...],
+         "errors": [...], "timings": {"scan_s": ..., "build_s": ..., "total_s": ..., "copy_s": ...}}
+
+    `copied` lists the static files copied or removed, relative to the
+    static directory.
+
+    `ok` is False when a page failed; `errors` then holds one message per
+    failing page, and the other pages are still built.
+    """
+
+    def __init__(self, content_dir: str, template_path: str, dest_dir: str, static_dir: str = "static",
+                 basepath: str = "/", minify: bool = False, fingerprint: bool = False,
+                 section_templates: Optional[Dict[str, str]] = None, logger: Callable[[str], None] = print):
+        self.content_dir = content_dir
+        self.template_path = template_path
+        self.dest_dir = dest_dir
+        self.static_dir = static_dir
+        self.basepath = basepath
+        self.minify = minify
+        self.fingerprint = fingerprint
+        self.section_templates = section_templates
+        self.logger = logger
+        self.asset_manifest: Optional[Dict[str, str]] = None
+        # src_path -> (mtime_ns, size, rel_html) the page was last built from
+        self._index: Dict[str, Tuple[int, int, str]] = {}
+        # template path -> the compiled template the current pages were built with
+        self._templates = {}
+        # static rel_path -> (mtime_ns, size) the destination copy was made from
+        self._static: Dict[str, Tuple[int, int]] = {}
+
+    def _template_for(self, rel_html: str) -> str:
+        return select_template(rel_html, self.template_path, self.section_templates)
+
+    def _dest_path(self, rel_html: str) -> str:
+        return os.path.join(self.dest_dir, *rel_html.split("/"))
+
+    def _build_page(self, src_path: str, rel_html: str, errors: List[str]) -> bool:
+        try:
+            generate_page(src_path, self._template_for(rel_html), self._dest_path(rel_html), basepath=self.basepath,
+                          logger=self.logger, minify=self.minify, asset_manifest=self.asset_manifest)
+        except Exception as e:
+            errors.append(str(_page_error(e, src_path)))
+            # Retried by the next incremental build
+            self._index.pop(src_path, None)
+            return False
+        return True
+
+    def _scan_static(self) -> Dict[str, Tuple[int, int]]:
+        files = {}
+        for src_path, rel_path in iter_files_sorted(self.static_dir):
+            stat = os.stat(src_path)
+            files[rel_path] = (stat.st_mtime_ns, stat.st_size)
+        return files
+
+    def _sync_static(self) -> Tuple[List[str], bool]:
+        """
+        Copy the static files added or changed since the last copy and remove the copies of deleted ones.
+
+        Returns the changed paths and whether the asset manifest changed,
+        in which case every page has to be rebuilt.
+        """
+        files = self._scan_static()
+        changed = [rel_path for rel_path, entry in files.items() if self._static.get(rel_path) != entry]
+        deleted = [rel_path for rel_path in self._static if rel_path not in files]
+        if not changed and not deleted:
+            return [], False
+
+        # A new dict, so templates bound to the old manifest are not reused
+        manifest = dict(self.asset_manifest or {}) if self.fingerprint else None
+        for rel_path in deleted:
+            dest_rel = manifest.pop(rel_path, rel_path) if self.fingerprint else rel_path
+            self.logger(f"Removing {self._dest_path(dest_rel)}")
+            _remove_output(self._dest_path(dest_rel))
+        for rel_path in changed:
+            src_path = os.path.join(self.static_dir, *rel_path.split("/"))
+            dest_rel = rel_path
+            if self.fingerprint:
+                dest_rel = fingerprint_name(rel_path, file_digest(src_path))
+                previous = manifest.get(rel_path)
+                if previous is not None and previous != dest_rel:
+                    _remove_output(self._dest_path(previous))
+                manifest[rel_path] = dest_rel
+            dest_path = self._dest_path(dest_rel)
+            os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+            shutil.copy2(src_path, dest_path)
+            self.logger(f"Copied {src_path} -> {dest_path}")
+        self._static = files
+
+        if not self.fingerprint or manifest == self.asset_manifest:
+            return sorted(changed + deleted), False
+        self.asset_manifest = manifest
+        with open(os.path.join(self.dest_dir, ASSET_MANIFEST), "wb") as f:
+            f.write(json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8"))
+        return sorted(changed + deleted), True
+
+    def _build(self, force: bool) -> dict:
+        start = time.perf_counter()
+        files = {}
+        for src_path, rel_html in iter_content_files(self.content_dir):
+            stat = os.stat(src_path)
+            files[src_path] = (stat.st_mtime_ns, stat.st_size, rel_html)
+        templates = {}
+        for _, _, rel_html in files.values():
+            path = self._template_for(rel_html)
+            if path not in templates:
+                templates[path] = load_template(path)
+        edited = {path for path, template in templates.items() if self._templates.get(path) is not template}
+        scanned = time.perf_counter()
+
+        built, removed, errors = [], [], []
+        unchanged = 0
+        for src_path, entry in files.items():
+            rel_html = entry[2]
+            if not force and self._index.get(src_path) == entry and self._template_for(rel_html) not in edited:
+                unchanged += 1
+                continue
+            self._index[src_path] = entry
+            if self._build_page(src_path, rel_html, errors):
+                built.append(rel_html)
+        for src_path in [src_path for src_path in self._index if src_path not in files]:
+            rel_html = self._index.pop(src_path)[2]
+            self.logger(f"Removing {self._dest_path(rel_html)}")
+            _remove_output(self._dest_path(rel_html))
+            removed.append(rel_html)
+        self._templates = templates
+        return _result(built, removed, unchanged, errors, start, scanned)
+
+    def full(self) -> dict:
+        """Copy the static files into a cleared destination and build every page."""
+        start = time.perf_counter()
+        # Stat before copying, so a file edited during the copy is copied again next time
+        static = self._scan_static()
+        self.asset_manifest = copy_dir_recursive(self.static_dir, self.dest_dir, logger=self.logger,
+                                                 fingerprint=self.fingerprint)
+        self._static = static
+        # The destination was cleared, so nothing built before is still there
+        self._index.clear()
+        return _with_copy(self._build(force=True), sorted(static), start)
+
+    def incremental(self) -> dict:
+        """
+        Re-copy changed static files, then rebuild pages whose source or template changed
+        and remove pages whose source is gone. Every page is rebuilt when the asset manifest changed.
+        """
+        start = time.perf_counter()
+        copied, manifest_changed = self._sync_static()
+        return _with_copy(self._build(force=manifest_changed), copied, start)
+
+    def page(self, path: str) -> dict:
+        """Rebuild the page for `path`, a markdown file relative to the content directory."""
+        start = time.perf_counter()
+        src_path = os.path.join(self.content_dir, *path.split("/"))
+        content_dir = os.path.abspath(self.content_dir)
+        if (not path.lower().endswith(".md") or not os.path.isfile(src_path)
+                or os.path.commonpath([content_dir, os.path.abspath(src_path)]) != content_dir):
+            raise ValueError(f"No markdown file {path!r} in {self.content_dir}")
+        copied, manifest_changed = self._sync_static()
+        if manifest_changed:
+            # Every page references the old asset names
+            return _with_copy(self._build(force=True), copied, start)
+        copy_end = time.perf_counter()
+        stat = os.stat(src_path)
+        rel_html = _html_rel_path(path)
+        self._index[src_path] = (stat.st_mtime_ns, stat.st_size, rel_html)
+        scanned = time.perf_counter()
+        errors = []
+        built = [rel_html] if self._build_page(src_path, rel_html, errors) else []
+        return _with_copy(_result(built, [], 0, errors, copy_end, scanned), copied, start)
+
+    def handle(self, request: dict) -> dict:
+        """
+        Run one request and return its result.
+
+        Requests are `{"command": "full"}`, `{"command": "incremental"}`,
+        `{"command": "page", "path": "blog/post.md"}` and
+        `{"command": "ping"}`. A request that cannot run gets
+        `{"ok": False, "error": message}`.
+        """
+        command = request.get("command") if isinstance(request, dict) else None
+        try:
+            if command == "full":
+                return self.full()
+            if command == "incremental":
+                return self.incremental()
+            if command == "page":
+                path = request.get("path")
+                if not isinstance(path, str):
+                    raise ValueError('"page" needs a "path" relative to the content directory')
+                return self.page(path)
+            if command == "ping":
+                return {"ok": True, "pages": len(self._index)}
+            raise ValueError(f"Unknown command {command!r}")
+        except Exception as e:
+            return {"ok": False, "error": str(e)}
+
+
+def _result(built, removed, unchanged, errors, start, scanned) -> dict:
+    end = time.perf_counter()
+    return {
+        "ok": not errors,
+        "built": built,
+        "removed": removed,
+        "unchanged": unchanged,
+        "errors": errors,
+        "timings": {"scan_s": scanned - start, "build_s": end - scanned, "total_s": end - start},
+    }
+
+
+def _with_copy(result: dict, copied: List[str], start: float) -> dict:
+    """Add the static files copied since `start`, before `result`'s build started, to `result`."""
+    timings = result["timings"]
+    copy_s = time.perf_counter() - start - timings["total_s"]
+    result["copied"] = copied
+    timings["copy_s"] = copy_s
+    timings["total_s"] += copy_s
+    return result
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Reads one JSON request per line and answers each with one JSON line."""
+
+    def handle(self):
+        for line in self.rfile:
+            if not line.strip():
+                continue
+            try:
+                request = json.loads(line)
+            except ValueError as e:
+                response = {"ok": False, "error": f"Invalid JSON request: {e}"}
+            else:
+                if isinstance(request, dict) and request.get("command") == "shutdown":
+                    self.server.stopping = True
+                    response = {"ok": True}
+                else:
+                    response = self.server.build_daemon.handle(request)
+            self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+            self.wfile.flush()
+            if self.server.stopping:
+                return
+
+
+def remove_stale_socket(socket_path: str):
+    """
+    Make `socket_path` free for a new daemon.
+
+    A socket file left by a daemon that is gone (nothing accepts a
+    connection) is removed. Raises ValueError if the path is some other
+    kind of file or a daemon is still listening on it.
+    """
+    try:
+        mode = os.stat(socket_path).st_mode
+    except FileNotFoundError:
+        return
+    if not stat.S_ISSOCK(mode):
+        raise ValueError(f"{socket_path} exists and is not a socket")
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as probe:
+        try:
+            probe.connect(socket_path)
+        except OSError:
+            os.remove(socket_path)
+            return
+    raise ValueError(f"A daemon is already listening on {socket_path}")
+
+
+def serve(daemon: BuildDaemon, socket_path: str):
+    """
+    Answer build requests on the Unix domain socket `socket_path` until a `shutdown` request.
+
+    Connections are handled one after another, so builds never overlap.
+    Each line sent is a JSON request (see `BuildDaemon.handle`, plus
+    `{"command": "shutdown"}`) and gets one JSON line back. A stale socket
+    file left by a previous daemon is replaced (see `remove_stale_socket`);
+    the socket file is removed on exit.
+    """
+    remove_stale_socket(socket_path)
+    with socketserver.UnixStreamServer(socket_path, _Handler) as server:
+        server.build_daemon = daemon
+        server.stopping = False
+        try:
+            while not server.stopping:
+                server.handle_request()
+        finally:
+            try:
+                os.remove(socket_path)
+            except FileNotFoundError:
+                pass
+
+
+def request(socket_path: str, command: str, timeout: Optional[float] = None, **fields) -> dict:
+    """Send one request to a daemon listening on `socket_path` and return its response."""
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+        sock.settimeout(timeout)
+        sock.connect(socket_path)
+        with sock.makefile("rwb") as stream:
+            stream.write(json.dumps(dict(fields, command=command)).encode("utf-8") + b"\n")
+            stream.flush()
+            return json.loads(stream.readline())
@@ -0,0 +1,265 @@
+import sys
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from htmlnode import LeafNode, ParentNode, close_tag, escape_attr, escape_text, open_tag
+from markdown_extract import BlockType, iter_blocks
+from spans import span_text, text_to_spans
+from textnode import TextType
+
+# Node kinds
+LEAF = 0
+PARENT = 1
+
+# Tag and attribute names are stored as ids into these shared tables; id 0 is "no tag"
+_NAMES: List[Optional[str]] = [None]
+_NAME_IDS: Dict[Optional[str], int] = {None: 0}
+
+
+def _name_id(name: Optional[str]) -> int:
+    name_id = _NAME_IDS.get(name)
+    if name_id is None:
+        name_id = _NAME_IDS[name] = len(_NAMES)
+        _NAMES.append(name)
+    return name_id
+
+
+class FlatDocument:
+    """
+    A parsed page stored as parallel `array` columns instead of node objects.
+
+    Nodes are kept in document (pre-)order. Each node has a kind (LEAF or
+    PARENT), a tag id, the index of its parent (-1 for the root) and a
+    `(start, end)` span of its value in one shared text string. Attributes
+    live in their own columns (owner node, name id, value span), in node
+    order. Values and attribute values are stored unescaped and escaped by
+    `to_html`.
+
+    A page of N nodes is a handful of arrays and one string rather than N
+    objects with their own dicts and lists, which matters when many parsed
+    pages are held at once (dev server, search indexing, link checking).
+    """
+
+    __slots__ = ("kinds", "tags", "parents", "starts", "ends",
+                 "attr_owners", "attr_names", "attr_starts", "attr_ends", "text")
+
+    def __init__(self):
+        self.kinds = array("B")
+        self.tags = array("H")
+        self.parents = array("i")
+        self.starts = array("i")
+        self.ends = array("i")
+        self.attr_owners = array("i")
+        self.attr_names = array("H")
+        self.attr_starts = array("i")
+        self.attr_ends = array("i")
+        self.text = ""
+
+    def __len__(self) -> int:
+        return len(self.kinds)
+
+    def nbytes(self) -> int:
+        """Memory held by the columns and the text, in bytes."""
+        columns = (self.kinds, self.tags, self.parents, self.starts, self.ends,
+                   self.attr_owners, self.attr_names, self.attr_starts, self.attr_ends)
+        return sum(sys.getsizeof(column) for column in columns) + sys.getsizeof(self.text)
+
+    def tag(self, index: int) -> Optional[str]:
+        return _NAMES[self.tags[index]]
+
+    def value(self, index: int) -> str:
+        return self.text[self.starts[index]:self.ends[index]]
+
+    def iter_text(self) -> Iterator[str]:
+        """Yield the value of every leaf, in document order."""
+        text, starts, ends = self.text, self.starts, self.ends
+        for index, kind in enumerate(self.kinds):
+            if kind == LEAF:
+                yield text[starts[index]:ends[index]]
+
+    def attributes(self, name: str) -> List[Tuple[int, str]]:
+        """Return `(node index, value)` for every attribute called `name` (e.g. "href")."""
+        name_id = _NAME_IDS.get(name)
+        text = self.text
+        return [(self.attr_owners[i], text[self.attr_starts[i]:self.attr_ends[i]])
+                for i, attr_name in enumerate(self.attr_names) if attr_name == name_id]
+
+    def to_html(self) -> str:
+        """Serialize in one linear pass over the columns."""
+        kinds, tags, parents, starts, ends = self.kinds, self.tags, self.parents, self.starts, self.ends
+        attr_owners, attr_names, attr_starts, attr_ends = (
+            self.attr_owners, self.attr_names, self.attr_starts, self.attr_ends)
+        text = self.text
+        parts = []
+        open_nodes = []
+        attr = 0
+        attr_count = len(attr_owners)
+        for index in range(len(kinds)):
+            # Close the elements this node is not inside of
+            parent = parents[index]
+            while open_nodes and open_nodes[-1] != parent:
+                parts.append(close_tag(_NAMES[tags[open_nodes.pop()]]))
+
+            props = ""
+            if attr < attr_count and attr_owners[attr] == index:
+                pieces = []
+                while attr < attr_count and attr_owners[attr] == index:
+                    value = escape_attr(text[attr_starts[attr]:attr_ends[attr]])
+                    pieces.append(f' {_NAMES[attr_names[attr]]}="{value}"')
+                    attr += 1
+                props = "".join(pieces)
+
+            tag = _NAMES[tags[index]]
+            if kinds[index] == PARENT:
+                parts.append(open_tag(tag, props))
+                open_nodes.append(index)
+            elif tag is None:
+                parts.append(escape_text(text[starts[index]:ends[index]]))
+            else:
+                parts.append(open_tag(tag, props))
+                parts.append(escape_text(text[starts[index]:ends[index]]))
+                parts.append(close_tag(tag))
+        while open_nodes:
+            parts.append(close_tag(_NAMES[tags[open_nodes.pop()]]))
+        return "".join(parts)
+
+    @classmethod
+    def from_node(cls, node) -> "FlatDocument":
+        """
+        Encode an HTMLNode tree.
+
+        Raises the ValueError `node.to_html()` would raise for an invalid tree,
+        so a FlatDocument always serializes.
+        """
+        builder = _Builder()
+
+        def add(node, parent):
+            if isinstance(node, LeafNode):
+                if not node.value:
+                    raise ValueError("LeafNode has no value")
+                builder.leaf(node.tag, node.value, parent, node._props)
+                return
+            if not isinstance(node, ParentNode):
+                raise ValueError("ParentNode children must be HTMLNode objects")
+            if node.tag is None:
+                raise ValueError("ParentNode requires a tag")
+            if not node.children:
+                raise ValueError("ParentNode requires children, but child list is empty")
+            index = builder.parent(node.tag, parent, node._props)
+            for child in node.children:
+                add(child, index)
+
+        add(node, -1)
+        return builder.finish()
+
+
+class _Builder:
+    """Appends nodes to a FlatDocument in document order."""
+
+    def __init__(self):
+        self.doc = FlatDocument()
+        self.pieces = []
+        self.length = 0
+
+    def _store(self, value: str) -> Tuple[int, int]:
+        start = self.length
+        self.pieces.append(value)
+        self.length += len(value)
+        return start, self.length
+
+    def _node(self, kind, tag, parent, start, end, props):
+        doc = self.doc
+        index = len(doc.kinds)
+        doc.kinds.append(kind)
+        doc.tags.append(_name_id(tag))
+        doc.parents.append(parent)
+        doc.starts.append(start)
+        doc.ends.append(end)
+        if props:
+            for name, value in props.items():
+                value_start, value_end = self._store(str(value))
+                doc.attr_owners.append(index)
+                doc.attr_names.append(_name_id(name))
+                doc.attr_starts.append(value_start)
+                doc.attr_ends.append(value_end)
+        return index
+
+    def parent(self, tag: str, parent: int, props=None) -> int:
+        return self._node(PARENT, tag, parent, 0, 0, props)
+
+    def leaf(self, tag: Optional[str], value: str, parent: int, props=None) -> int:
+        start, end = self._store(value)
+        return self._node(LEAF, tag, parent, start, end, props)
+
+    def finish(self) -> FlatDocument:
+        self.doc.text = "".join(self.pieces)
+        self.pieces = []
+        return self.doc
+
+
+# TextType -> leaf tag
+_INLINE_TAGS = {
+    TextType.PLAIN: None,
+    TextType.BOLD: "b",
+    TextType.ITALIC: "i",
+    TextType.CODE: "code",
+}
+
+
+def _add_inline(builder: _Builder, source: str, start: int, end: Optional[int], parent: int):
+    empty = True
+    for span in text_to_spans(source, start, end):
+        empty = False
+        text_type = span[0]
+        if text_type in _INLINE_TAGS:
+            builder.leaf(_INLINE_TAGS[text_type], span_text(source, span), parent)
+        elif text_type is TextType.LINK:
+            builder.leaf("a", span_text(source, span), parent, {"href": source[span[3]:span[4]]})
+        else:
+            builder.leaf("img", " ", parent, {"src": source[span[3]:span[4]], "alt": span_text(source, span)})
+    if empty:
+        raise ValueError("ParentNode requires children, but child list is empty")
+
+
+def flatten_markdown(markdown: str) -> FlatDocument:
+    """
+    Parse a markdown document straight into a FlatDocument.
+
+    Produces the same page as `converter.markdown_to_html_node(markdown)`,
+    without building the node tree: blocks are read lazily and inline text
+    is split into spans (see `spans.text_to_spans`).
+
+    Raises:
+        ValueError: for the documents `markdown_to_html_node(...).to_html()`
+            rejects
+    """
+    builder = _Builder()
+    root = builder.parent("div", -1)
+    empty = True
+    for block in iter_blocks(markdown):
+        empty = False
+        text = block.text
+        block_type = block.type
+        if block_type == BlockType.HEADING:
+            _add_inline(builder, text, block.level + 1, None, builder.parent(f"h{block.level}", root))
+        elif block_type == BlockType.CODE:
+            if len(text) <= 6:
+                raise ValueError("LeafNode has no value")
+            builder.leaf("code", text[3:-3], builder.parent("pre", root))
+        elif block_type == BlockType.QUOTE:
+            quote = "\n".join(block.items())
+            _add_inline(builder, quote, 0, None, builder.parent("blockquote", root))
+        elif block_type == BlockType.UNORDERED_LIST or block_type == BlockType.ORDERED_LIST:
+            list_node = builder.parent("ul" if block_type == BlockType.UNORDERED_LIST else "ol", root)
+            start = 0
+            for offset in block.offsets:
+                end = text.find("\n", start)
+                if end == -1:
+                    end = len(text)
+                _add_inline(builder, text, start + offset, end, builder.parent("li", list_node))
+                start = end + 1
+        else:  # PARAGRAPH
+            _add_inline(builder, text, 0, None, builder.parent("p", root))
+    if empty:
+        raise ValueError("ParentNode requires children, but child list is empty")
+    return builder.finish()
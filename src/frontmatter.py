@@ -0,0 +1,139 @@
+from typing import Dict, Optional, Tuple
+
+from markdown_extract import extract_title
+
+
+# Bytes read by `scan_header` before giving up on finding the H1 title
+HEADER_SCAN_BYTES = 4096
+
+FENCE = "---"
+
+
+def _unquote(value: str) -> str:
+    if len(value) >= 2 and value[0] == value[-1] and value[0] in "\"'":
+        return value[1:-1]
+    return value
+
+
+def _parse_header(text: str, final: bool = True) -> Tuple[Dict[str, str], Optional[int]]:
+    """
+    Parse a front-matter block at the start of `text`.
+
+    Returns `(meta, end)` where `end` is the index just past the closing
+    fence line, 0 when `text` has no front matter, or None when the closing
+    fence was not found yet and more input may follow (unless `final`).
+    A leading `---` that is never closed is not front matter, so it gives
+    `({}, 0)` once `final`; a line that is not `key: value` is only an
+    error once the closing fence shows the block is front matter.
+    """
+    first = text.find("\n")
+    if (text[:first] if first != -1 else text).rstrip() != FENCE:
+        return {}, 0
+
+    meta = {}
+    error = None
+    pos = first + 1 if first != -1 else len(text)
+    lineno = 1
+    while pos < len(text):
+        nl = text.find("\n", pos)
+        if nl == -1:
+            if not final:
+                # The last line may continue in data not read yet
+                return meta, None
+            nl = len(text)
+        line = text[pos:nl].strip()
+        lineno += 1
+        pos = min(nl + 1, len(text))
+        if line == FENCE:
+            if error is not None:
+                raise error
+            return meta, pos
+        if not line or line.startswith("#") or error is not None:
+            continue
+        key, sep, value = line.partition(":")
+        if not sep or not key.strip():
+            error = ValueError(f"Invalid front matter on line {lineno}: {line!r} (expected 'key: value')")
+            continue
+        meta[key.strip().lower()] = _unquote(value.strip())
+    return ({}, 0) if final else (meta, None)
+
+
+def split_front_matter(markdown: str) -> Tuple[Dict[str, str], str]:
+    """
+    Split a leading front-matter block off a markdown document.
+
+    Front matter is a block of `key: value` lines between two `---` lines at
+    the very start of the document:
+
+        ---
+        title: Tolkien Fan Club
+        date: 2024-05-01
+        ---
+        # Tolkien Fan Club
+
+    Keys are lowercased; values are stripped strings with surrounding
+    quotes removed. Blank lines and `#` comments inside the block are
+    ignored. A leading `---` without a closing `---` line is not front
+    matter; the document is returned whole.
+
+    Returns:
+        A `(meta, body)` tuple; `meta` is empty and `body` is the whole
+        document when there is no front matter
+
+    Raises:
+        ValueError: if a line of the front matter is not `key: value`
+    """
+    meta, end = _parse_header(markdown)
+    return meta, markdown[end:]
+
+
+def _read_header(path: str, limit: int) -> Tuple[Dict[str, str], int, str]:
+    """
+    Read the front matter of the file at `path`, reading only as much as needed.
+
+    Returns `(meta, offset, rest)` where `offset` is the byte offset of the
+    markdown body and `rest` is the decoded part of the body that was read.
+    """
+    with open(path, "rb") as f:
+        data = f.read(limit)
+        eof = len(data) < limit
+        while True:
+            # Only decode whole lines so a multi-byte character is never split
+            cut = len(data) if eof else data.rfind(b"\n") + 1
+            text = data[:cut].decode("utf-8")
+            meta, end = _parse_header(text, final=eof)
+            if end is not None:
+                break
+            # A front-matter block longer than `limit`: keep reading
+            chunk = f.read(limit)
+            data += chunk
+            eof = len(chunk) < limit
+    return meta, len(text[:end].encode("utf-8")), text[end:]
+
+
+def read_front_matter(path: str, limit: int = HEADER_SCAN_BYTES) -> Tuple[Dict[str, str], int]:
+    """
+    Return `(meta, offset)` for the file at `path` without reading its body.
+
+    `offset` is the byte offset where the markdown body starts (0 when the
+    file has no front matter).
+    """
+    meta, offset, _ = _read_header(path, limit)
+    return meta, offset
+
+
+def scan_header(path: str, limit: int = HEADER_SCAN_BYTES) -> Dict[str, str]:
+    """
+    Return the metadata of a page from the first `limit` bytes of its file.
+
+    Meant for site-wide listings: only the front matter and the start of
+    the body are read, never the whole document. When the front matter has
+    no `title`, the first H1 within the scanned bytes is used, if any.
+    """
+    meta, _, rest = _read_header(path, limit)
+    if "title" not in meta:
+        try:
+            meta["title"] = extract_title(rest)
+        except ValueError:
+            pass
+    return meta
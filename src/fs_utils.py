@@ -1,6 +1,8 @@
+import hashlib
+import json
 import os
 import shutil
-from typing import Callable
+from typing import Callable, Dict, Optional
 
 
 def _clear_directory(path: str):
@@ -23,7 +25,46 @@ def _clear_directory(path: str):
             raise
 
 
-def copy_dir_recursive(src: str, dest: str, logger: Callable[[str], None] = print):
+def iter_files_sorted(src: str):
+    """
+    Yield `(src_path, rel_path)` for every file under `src` in sorted order.
+
+    Directories and files are visited in name order so archive output is
+    reproducible. `rel_path` uses "/" separators.
+    """
+    for root, dirs, files in os.walk(src):
+        dirs.sort()
+        rel_root = os.path.relpath(root, src)
+        for fname in sorted(files):
+            rel_path = fname if rel_root == os.curdir else os.path.join(rel_root, fname)
+            yield os.path.join(root, fname), rel_path.replace(os.sep, "/")
+
+
+# Name of the asset manifest written next to fingerprinted assets
+ASSET_MANIFEST = "asset-manifest.json"
+
+
+def file_digest(path: str, length: int = 10) -> str:
+    """Return the first `length` hex digits of the SHA-256 of the file at `path`."""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()[:length]
+
+
+def fingerprint_name(rel_path: str, digest: str) -> str:
+    """Insert `digest` before the extension: "images/tom.png" -> "images/tom.<digest>.png"."""
+    head, fname = os.path.split(rel_path)
+    stem, ext = os.path.splitext(fname)
+    if not stem:
+        # Dotfiles such as ".nojekyll" have no extension to keep
+        stem, ext = fname, ""
+    return os.path.join(head, f"{stem}.{digest}{ext}").replace(os.sep, "/")
+
+
+def copy_dir_recursive(src: str, dest, logger: Callable[[str], None] = print, precompressor=None,
+                       fingerprint: bool = False) -> Optional[Dict[str, str]]:
     """
     Recursively copy contents from `src` directory into `dest` directory.
 
@@ -31,11 +72,23 @@ def copy_dir_recursive(src: str, dest: str, logger: Callable[[str], None] = prin
     - If `dest` exists, all of its contents are deleted first so the copy is clean.
     - All files and subdirectories under `src` are recreated under `dest`.
     - Logs each file copied via the `logger` callable.
+    - With `fingerprint`, each file is copied under a content-hashed name
+      (`index.css` -> `index.<hash>.css`) and an `asset-manifest.json` mapping
+      original to fingerprinted paths is written alongside.
 
     Args:
         src: Source directory path.
-        dest: Destination directory path.
+        dest: Destination directory path, or an output sink (see `sinks`) that
+            receives each file, e.g. an ArchiveSink streaming into a tarball.
         logger: Callable that accepts a single string to log progress (defaults to `print`).
+        precompressor: Optional `precompress.Precompressor` that receives every
+            file copied into a destination directory.
+        fingerprint: Copy files under content-hashed names.
+
+    Returns:
+        The asset manifest (`{"index.css": "index.<hash>.css", ...}`, paths
+        relative to `src` with "/" separators) when `fingerprint` is set,
+        otherwise None.
 
     Raises:
         FileNotFoundError: if `src` does not exist or is not a directory.
@@ -44,25 +97,43 @@ def copy_dir_recursive(src: str, dest: str, logger: Callable[[str], None] = prin
     if not os.path.exists(src) or not os.path.isdir(src):
         raise FileNotFoundError(f"Source directory not found: {src}")
 
-    # Ensure destination exists, then clear its contents
-    os.makedirs(dest, exist_ok=True)
-    _clear_directory(dest)
+    manifest = {} if fingerprint else None
+    to_sink = not isinstance(dest, (str, os.PathLike))
 
-    # Walk source tree and copy files/directories
-    for root, dirs, files in os.walk(src):
-        # Compute destination root corresponding to current `root`
-        rel_root = os.path.relpath(root, src)
-        dest_root = dest if rel_root == os.curdir else os.path.join(dest, rel_root)
+    if not to_sink:
+        # Ensure destination exists, then clear its contents
+        os.makedirs(dest, exist_ok=True)
+        _clear_directory(dest)
+
+    # Walk source tree and copy files
+    for src_path, rel_path in iter_files_sorted(src):
+        dest_rel = rel_path
+        if fingerprint:
+            dest_rel = fingerprint_name(rel_path, file_digest(src_path))
+            manifest[rel_path] = dest_rel
+
+        if to_sink:
+            dest.copy(dest_rel, src_path)
+            logger(f"Copied {src_path} -> {dest.describe(dest_rel)}")
+            continue
 
+        dest_path = os.path.join(dest, *dest_rel.split("/"))
         # Ensure directory exists in destination
-        os.makedirs(dest_root, exist_ok=True)
-
-        # Copy files
-        for fname in files:
-            src_path = os.path.join(root, fname)
-            dest_path = os.path.join(dest_root, fname)
-            shutil.copy2(src_path, dest_path)
-            logger(f"Copied {src_path} -> {dest_path}")
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        shutil.copy2(src_path, dest_path)
+        logger(f"Copied {src_path} -> {dest_path}")
+        if precompressor is not None:
+            precompressor.submit(dest_path)
+
+    if fingerprint:
+        data = json.dumps(manifest, indent=2, sort_keys=True).encode("utf-8")
+        if to_sink:
+            dest.write(ASSET_MANIFEST, data)
+        else:
+            with open(os.path.join(dest, ASSET_MANIFEST), "wb") as f:
+                f.write(data)
+
+    return manifest
 
 
 if __name__ == "__main__":
@@ -1,87 +1,669 @@
 import os
-from typing import Callable
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from html import unescape
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+from urllib.parse import quote, unquote
 
-from markdown_extract import extract_title
-from converter import markdown_to_html_node
+from markdown_extract import extract_title, iter_file_blocks, parse_blocks, parse_file_blocks
+from frontmatter import read_front_matter, split_front_matter
+from converter import block_to_html
+from htmlnode import escape_attr
+from minify import MinifyingWriter, minify_html
+from schedule import BuildTimings, estimate_costs, plan_chunks
+from siteindex import PageRecord, SiteIndex, page_url
+from templates import CompiledTemplate, compile_template, load_template, select_template
 
 
-def generate_page(from_path: str, template_path: str, dest_path: str, basepath: str = '/', logger: Callable[[str], None] = print):
+# Markdown sources at least this large are streamed through mmap block by block
+MMAP_THRESHOLD = 16 * 1024 * 1024
+
+
+_ROOT_REFERENCE = re.compile(r'(href|src)="/([^"?#]*)')
+
+# Characters left as they are when a hashed asset name is put back into a URL path
+_PATH_SAFE = "/!$&'()*+,;=:@"
+
+
+class PageError(ValueError):
+    """
+    A page that failed to build, with where it failed.
+
+    `path` is the markdown source and `line` the 1-based line where the
+    failing block starts, when known. `block` is the Block being converted.
+    """
+
+    def __init__(self, message: str, path: Optional[str] = None, line: Optional[int] = None, block=None):
+        super().__init__(message)
+        self.message = message
+        self.path = path
+        self.line = line
+        self.block = block
+
+    def __str__(self):
+        location = self.path or ""
+        if self.line is not None:
+            location = f"{location}:{self.line}" if location else f"line {self.line}"
+        return f"{location}: {self.message}" if location else self.message
+
+
+def _page_error(error: Exception, src_path: str) -> PageError:
+    """Wrap any exception raised while building `src_path` in a PageError naming the file."""
+    if not isinstance(error, PageError):
+        error = PageError(str(error))
+    if error.path is None:
+        error.path = src_path
+    return error
+
+
+def _rewrite_basepath(html: str, basepath: str, asset_manifest: Optional[Dict[str, str]] = None, images=None) -> str:
+    """
+    Replace absolute references to root ("/...") with basepath-prefixed paths.
+
+    With an `asset_manifest` (see `fs_utils.copy_dir_recursive`), references
+    to fingerprinted assets are also rewritten to their hashed names. With an
+    `images.ImagePipeline`, `<img>` tags first get their dimensions and
+    responsive variants.
+    """
+    if images is not None:
+        html = images.rewrite(html, basepath, asset_manifest)
+    if not asset_manifest:
+        html = html.replace('href="/', f'href="{basepath}')
+        return html.replace('src="/', f'src="{basepath}')
+
+    def replace(match):
+        path = match.group(2)
+        # The attribute holds escaped HTML and the URL may be percent-encoded; the manifest has file names
+        hashed = asset_manifest.get(unquote(unescape(path)))
+        if hashed is not None:
+            path = escape_attr(quote(hashed, safe=_PATH_SAFE))
+        return f'{match.group(1)}="{basepath}{path}'
+
+    return _ROOT_REFERENCE.sub(replace, html)
+
+
+def _bind_template(template, basepath: str, asset_manifest: Optional[Dict[str, str]] = None,
+                   images=None) -> CompiledTemplate:
+    """
+    Compile `template` (text or `templates.CompiledTemplate`) and apply the
+    basepath rewrite to its literal text once per basepath/manifest.
+    """
+    if isinstance(template, str):
+        template = compile_template(template)
+    return template.transformed(lambda text: _rewrite_basepath(text, basepath, asset_manifest, images),
+                                key=(basepath, id(asset_manifest), id(images)), keepalive=(asset_manifest, images))
+
+
+def _render_blocks(blocks, record: Optional[PageRecord] = None, links: Optional[List[str]] = None) -> Iterator[str]:
+    """
+    Render Block records to HTML, feeding each one to `record` for the site
+    index and collecting link/image URLs into `links`.
+    """
+    for block in blocks:
+        try:
+            html = block_to_html(block, links)
+        except ValueError as e:
+            raise PageError(str(e), line=block.first_line, block=block) from e
+        if record is not None:
+            record.add_block(block, html)
+        yield html
+
+
+def _extract_title_streamed(from_path: str, offset: int = 0) -> str:
+    """Find the first H1 title scanning the mmap-backed source block by block."""
+    for block in iter_file_blocks(from_path, offset=offset):
+        try:
+            return extract_title(block)
+        except ValueError:
+            continue
+    raise ValueError("No H1 title found in markdown")
+
+
+def _template_values(header: Dict[str, str], title: str) -> Dict[str, str]:
+    """Front matter and the page title as template variables, escaped for text or attribute use."""
+    values = {key: escape_attr(value) for key, value in header.items()}
+    values["Title"] = escape_attr(title)
+    return values
+
+
+def _write_page_streamed(from_path: str, template, out, basepath: str, asset_manifest: Optional[Dict[str, str]] = None,
+                         images=None, record: Optional[PageRecord] = None, links: Optional[List[str]] = None,
+                         meta: Optional[Dict[str, str]] = None):
+    """
+    Convert `from_path` one block at a time and write the page to `out`.
+
+    The source is read through mmap and only the current block is decoded,
+    converted and written, so memory stays proportional to the largest block.
+    Front matter is read from the head of the file and skipped.
+    """
+    header, offset = read_front_matter(from_path)
+    if meta is not None:
+        meta.update(header)
+    title = header.get("title") or _extract_title_streamed(from_path, offset)
+    if record is not None:
+        record.title = title
+    template = _bind_template(template, basepath, asset_manifest, images)
+    parts = template.split(_template_values(header, title), "Content")
+
+    for i, part in enumerate(parts):
+        out.write(part)
+        if i == len(parts) - 1:
+            break
+        out.write("<div>")
+        empty = True
+        blocks = parse_file_blocks(from_path, offset=offset)
+        # Only the first {{ Content }} feeds the site index and link list
+        first = i == 0
+        for html in _render_blocks(blocks, record if first else None, links if first else None):
+            out.write(_rewrite_basepath(html, basepath, asset_manifest, images))
+            empty = False
+        if empty:
+            raise ValueError("ParentNode requires children, but child list is empty")
+        out.write("</div>")
+
+
+def render_page(markdown: str, template, basepath: str = '/', minify: bool = False,
+                asset_manifest: Optional[Dict[str, str]] = None, images=None,
+                record: Optional[PageRecord] = None, links: Optional[List[str]] = None,
+                meta: Optional[Dict[str, str]] = None) -> str:
+    """
+    Render a markdown document into `template` entirely in memory.
+
+    A leading front-matter block (see `frontmatter.split_front_matter`) is
+    removed from the content; its `title`, if set, replaces the H1 as the
+    page title, and every key is available to the template as `{{ key }}`.
+
+    Args:
+        markdown: The markdown source text
+        template: Template text containing `{{ Title }}` and `{{ Content }}`
+            placeholders, or a `templates.CompiledTemplate`
+        basepath: Prefix substituted for root-absolute `href`/`src` references
+        minify: Minify the rendered page (see `minify.HTMLMinifier`)
+        asset_manifest: Optional mapping of asset paths to fingerprinted names
+            used to rewrite `href`/`src` references
+        images: Optional `images.ImagePipeline` adding dimensions and
+            `srcset` to `<img>` tags
+        record: Optional `siteindex.PageRecord` filled with the title,
+            headings and text extract as the page is rendered
+        links: Optional list that receives every link and image URL in the
+            content, as written in the markdown
+        meta: Optional dict updated with the page's front matter
+
+    Returns:
+        The rendered HTML page
+
+    Raises:
+        PageError: if a block fails to convert, with the line it starts on
+    """
+    if not basepath.endswith('/'):
+        basepath = basepath + '/'
+
+    source = markdown
+    header, markdown = split_front_matter(markdown)
+    if meta is not None:
+        meta.update(header)
+
+    # Convert markdown to HTML string; block line numbers count the front matter
+    blocks = parse_blocks(markdown, source.count("\n", 0, len(source) - len(markdown)) + 1)
+    if not blocks:
+        raise ValueError("ParentNode requires children, but child list is empty")
+    content_html = "<div>" + "".join(_render_blocks(blocks, record, links)) + "</div>"
+    content_html = _rewrite_basepath(content_html, basepath, asset_manifest, images)
+
+    # Extract title
+    title = header.get("title") or extract_title(markdown)
+    if record is not None:
+        record.title = title
+    return _fill_template(template, header, title, content_html, basepath, minify, asset_manifest, images)
+
+
+def _fill_template(template, header: Dict[str, str], title: str, content_html: str, basepath: str, minify: bool,
+                   asset_manifest: Optional[Dict[str, str]], images) -> str:
+    # The template's own text was rewritten once when it was bound
+    values = _template_values(header, title)
+    values["Content"] = content_html
+    page = _bind_template(template, basepath, asset_manifest, images).render(values)
+    return minify_html(page) if minify else page
+
+
+def _render_listing(listing, template, basepath: str = '/', minify: bool = False,
+                    asset_manifest: Optional[Dict[str, str]] = None, images=None,
+                    record: Optional[PageRecord] = None, links: Optional[List[str]] = None) -> str:
+    """Render a `sections.Listing`, already HTML, into `template` like `render_page` renders markdown."""
+    if not basepath.endswith('/'):
+        basepath = basepath + '/'
+    if record is not None:
+        record.title = listing.title
+        for block, html in listing.blocks:
+            record.add_block(block, html)
+    if links is not None:
+        links.extend(listing.links)
+    content_html = "<div>" + "".join([html for _, html in listing.blocks]) + "</div>"
+    content_html = _rewrite_basepath(content_html, basepath, asset_manifest, images)
+    return _fill_template(template, {}, listing.title, content_html, basepath, minify, asset_manifest, images)
+
+
+def generate_page(from_path: str, template_path: str, dest_path: str, basepath: str = '/', logger: Callable[[str], None] = print, stream: Optional[bool] = None, minify: bool = False,
+                  asset_manifest: Optional[Dict[str, str]] = None, images=None, record: Optional[PageRecord] = None,
+                  links: Optional[List[str]] = None, meta: Optional[Dict[str, str]] = None):
     """
     Generate an HTML page by converting a markdown file to HTML and injecting it into a template.
 
     Args:
         from_path: Path to the markdown source file
-        template_path: Path to the HTML template containing `{{ Title }}` and `{{ Content }}` placeholders
+        template_path: Path to the HTML template containing `{{ Title }}` and `{{ Content }}`
+            placeholders; compiled once and cached (see `templates.load_template`)
         dest_path: Destination path for the generated HTML
         logger: Optional logger callable
+        stream: Read the source through mmap and convert it one block at a time.
+            Defaults to streaming for sources of at least `MMAP_THRESHOLD` bytes.
+        minify: Minify the page as it is written (see `minify.HTMLMinifier`)
+        asset_manifest: Optional mapping of asset paths to fingerprinted names
+            used to rewrite `href`/`src` references
+        images: Optional `images.ImagePipeline` adding dimensions and
+            `srcset` to `<img>` tags
+        record: Optional `siteindex.PageRecord` filled in during rendering
+        links: Optional list that receives every link and image URL in the content
+        meta: Optional dict updated with the page's front matter
     """
     logger(f"Generating page from {from_path} to {dest_path} using {template_path}")
 
-    # Read source markdown
-    with open(from_path, "r", encoding="utf-8") as f:
-        markdown = f.read()
-
-    # Read template
-    with open(template_path, "r", encoding="utf-8") as f:
-        template = f.read()
-
-    # Convert markdown to HTML string
-    root = markdown_to_html_node(markdown)
-    content_html = root.to_html()
-
-    # Extract title
-    title = extract_title(markdown)
-
-    # Replace placeholders
-    page = template.replace("{{ Title }}", title).replace("{{ Content }}", content_html)
+    template = load_template(template_path)
 
     # Normalize basepath to always end with a slash
     if not basepath.endswith('/'):
         basepath = basepath + '/'
 
-    # Replace absolute references to root ("/...") with basepath-prefixed paths
-    page = page.replace('href="/', f'href="{basepath}')
-    page = page.replace('src="/', f'src="{basepath}')
+    if stream is None:
+        stream = os.path.getsize(from_path) >= MMAP_THRESHOLD
 
-    # Ensure destination directory exists
+    # The destination directory is only created once there is something to write
     dest_dir = os.path.dirname(dest_path)
-    if dest_dir:
-        os.makedirs(dest_dir, exist_ok=True)
+
+    if stream:
+        if dest_dir:
+            os.makedirs(dest_dir, exist_ok=True)
+        try:
+            with open(dest_path, "w", encoding="utf-8") as f:
+                out = MinifyingWriter(f) if minify else f
+                _write_page_streamed(from_path, template, out, basepath, asset_manifest, images, record, links, meta)
+                if minify:
+                    out.close()
+        except Exception:
+            # Never leave a half-written page behind
+            os.remove(dest_path)
+            raise
+        logger(f"Wrote {dest_path}")
+        return
+
+    # Read source markdown
+    with open(from_path, "r", encoding="utf-8") as f:
+        markdown = f.read()
+
+    page = render_page(markdown, template, basepath, minify=minify, asset_manifest=asset_manifest, images=images,
+                       record=record, links=links, meta=meta)
 
     # Write out
+    if dest_dir:
+        os.makedirs(dest_dir, exist_ok=True)
     with open(dest_path, "w", encoding="utf-8") as f:
         f.write(page)
 
     logger(f"Wrote {dest_path}")
 
 
-def generate_pages_recursive(dir_path_content: str, template_path: str, dest_dir_path: str, basepath: str = '/', logger: Callable[[str], None] = print):
+def _lastmod(src_path: str) -> str:
+    """Sitemap `lastmod` date (UTC) from the source file's modification time."""
+    return time.strftime("%Y-%m-%d", time.gmtime(os.path.getmtime(src_path)))
+
+
+def _html_rel_path(md_rel_path: str) -> str:
+    """Map a content-relative markdown path to its output path, using "/" separators."""
+    rel_base, _ = os.path.splitext(md_rel_path)
+    return (rel_base + '.html').replace(os.sep, '/')
+
+
+def iter_content_files(dir_path_content: str) -> Iterator[Tuple[str, str]]:
     """
-    Walk `dir_path_content` and generate an HTML page for every markdown file found.
+    Yield `(src_path, rel_html_path)` for every markdown file under `dir_path_content`.
 
-    The generated .html files are written under `dest_dir_path` preserving the
-    directory structure relative to `dir_path_content`.
+    `rel_html_path` is the output path relative to the site root, with "/" separators.
     """
     if not os.path.isdir(dir_path_content):
         raise FileNotFoundError(f"Content directory not found: {dir_path_content}")
 
     for root, dirs, files in os.walk(dir_path_content):
-        for fname in files:
+        # Visit in name order so builds (and archives) are reproducible
+        dirs.sort()
+        for fname in sorted(files):
             if not fname.lower().endswith('.md'):
                 continue
 
             src_path = os.path.join(root, fname)
             # Compute relative path from content dir
             rel_path = os.path.relpath(src_path, dir_path_content)
-            # Replace extension with .html
-            rel_base, _ = os.path.splitext(rel_path)
-            dest_rel = rel_base + '.html'
-            dest_path = os.path.join(dest_dir_path, dest_rel)
+            yield src_path, _html_rel_path(rel_path)
 
-            # Ensure destination directory exists (generate_page will also ensure)
-            dest_parent = os.path.dirname(dest_path)
-            if dest_parent:
-                os.makedirs(dest_parent, exist_ok=True)
 
-            generate_page(src_path, template_path, dest_path, basepath=basepath, logger=logger)
+def _iter_sources(content_source) -> Iterator[Tuple[str, str]]:
+    """Normalize a content source into `(rel_html_path, markdown)` pairs."""
+    if isinstance(content_source, (str, os.PathLike)):
+        for src_path, rel_html in iter_content_files(os.fspath(content_source)):
+            with open(src_path, "r", encoding="utf-8") as f:
+                yield rel_html, f.read()
+        return
+
+    items = content_source.items() if hasattr(content_source, "items") else content_source
+    for rel_path, markdown in items:
+        if isinstance(markdown, bytes):
+            markdown = markdown.decode("utf-8")
+        yield _html_rel_path(rel_path), markdown
+
+
+def build_site(content_source, template, basepath: str = '/', minify: bool = False,
+               asset_manifest: Optional[Dict[str, str]] = None, images=None,
+               site_index: Optional[SiteIndex] = None, link_checker=None) -> Iterator[Tuple[str, bytes]]:
+    """
+    Render every markdown page of a site without writing anything to disk.
+
+    Args:
+        content_source: Either a content directory path, a mapping of
+            content-relative markdown paths (e.g. "blog/tom/index.md") to
+            markdown text or bytes, or an iterable of such `(path, markdown)` pairs
+        template: Template text containing `{{ Title }}` and `{{ Content }}`
+            placeholders, or a `templates.CompiledTemplate`
+        basepath: Prefix substituted for root-absolute `href`/`src` references
+        minify: Minify every rendered page
+        asset_manifest: Optional mapping of asset paths to fingerprinted names
+        images: Optional `images.ImagePipeline` for `<img>` dimensions and variants
+        site_index: Optional `siteindex.SiteIndex` updated with every page
+        link_checker: Optional `linkcheck.LinkChecker` that records every
+            page and the URLs it links to
+
+    Yields:
+        `(rel_path, html_bytes)` pairs, where `rel_path` is the output path
+        relative to the site root ("blog/tom/index.html") and `html_bytes` is
+        the UTF-8 encoded page
+    """
+    for rel_html, markdown in _iter_sources(content_source):
+        record = PageRecord(page_url(rel_html, basepath)) if site_index is not None else None
+        links = [] if link_checker is not None else None
+        page = render_page(markdown, template, basepath, minify=minify, asset_manifest=asset_manifest,
+                           images=images, record=record, links=links)
+        if record is not None:
+            site_index.update(record)
+        if link_checker is not None:
+            link_checker.add_page(rel_html)
+            link_checker.add_links(rel_html, links)
+        yield rel_html, page.encode("utf-8")
+
+
+def _write_if_changed(path: str, data: bytes) -> bool:
+    """Write `data` to `path` unless the file already holds exactly those bytes."""
+    try:
+        with open(path, "rb") as f:
+            if f.read() == data:
+                return False
+    except FileNotFoundError:
+        pass
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+    with open(path, "wb") as f:
+        f.write(data)
+    return True
+
+
+def _remove_output(path: str):
+    """Remove a generated file, its precompressed sidecars and any directories left empty."""
+    for name in (path, path + ".gz", path + ".br"):
+        if os.path.exists(name):
+            os.remove(name)
+    try:
+        os.removedirs(os.path.dirname(path))
+    except OSError:
+        pass
+
+
+def _quiet(message: str):
+    pass
+
+
+def _build_chunk(chunk, options):
+    """
+    Build a chunk of pages in a worker process.
+
+    Each item is `(src_path, template_path, dest_path, record, links)`.
+    Returns `(record, links, seconds, error)` per page, with the record and
+    links filled in and `error` a PageError or None.
+    """
+    results = []
+    for src_path, template_path, dest_path, record, links in chunk:
+        start = time.perf_counter()
+        error = None
+        try:
+            generate_page(src_path, template_path, dest_path, logger=_quiet, record=record, links=links, **options)
+        except Exception as e:
+            error = _page_error(e, src_path)
+        results.append((record, links, time.perf_counter() - start, error))
+    return results
+
+
+def generate_pages_recursive(dir_path_content: str, template_path: str, dest_dir_path, basepath: str = '/', logger: Callable[[str], None] = print, precompressor=None, minify: bool = False,
+                             asset_manifest: Optional[Dict[str, str]] = None, images=None,
+                             site_index: Optional[SiteIndex] = None, link_checker=None, sections=None,
+                             section_templates: Optional[Dict[str, str]] = None,
+                             errors: Optional[List[PageError]] = None, workers: int = 1,
+                             timings: Optional[BuildTimings] = None):
+    """
+    Walk `dir_path_content` and generate an HTML page for every markdown file found.
+
+    The generated .html files are written under `dest_dir_path` preserving the
+    directory structure relative to `dir_path_content`. `dest_dir_path` may
+    also be an output sink (see `sinks`), in which case each page is rendered
+    in memory and handed to the sink as it is produced.
+
+    When a `precompress.Precompressor` is given, every page written to
+    `dest_dir_path` is queued for `.gz`/`.br` sidecar generation. An
+    `asset_manifest` from a fingerprinting `copy_dir_recursive` rewrites
+    asset references to their hashed names, and an `images.ImagePipeline`
+    adds dimensions and responsive variants to `<img>` tags.
+
+    With a `siteindex.SiteIndex`, each page's title, headings and text
+    extract are collected while it is rendered; entries for pages that no
+    longer exist are pruned and `sitemap.xml` (when the index has a site
+    URL) and `search-index.json` are written to `dest_dir_path` at the end. A `linkcheck.LinkChecker` records
+    every generated page and the link/image URLs collected while converting it.
+
+    A `sections.SectionIndex` adds paginated listing pages for its sections,
+    built from page headers after the content pages. In a destination
+    directory a listing page is only rewritten when its HTML changed, and
+    listing pages a previous build produced but this one does not are removed.
+
+    `section_templates` maps content sections ("blog") to template paths
+    used instead of `template_path` for the pages below them (see
+    `templates.select_template`).
+
+    By default the first page that fails to build aborts the walk. When an
+    `errors` list is given, each failing page is recorded there as a
+    `PageError` (source path, line and message) and the build carries on
+    with the remaining pages.
+
+    With `workers` above 1, content pages written to a destination directory
+    are built in that many processes. Pages are dispatched most expensive
+    first and small pages are sent in chunks (see `schedule.plan_chunks`);
+    costs come from the source sizes, or from the previous build's times
+    when a `schedule.BuildTimings` is given. Pages finish in any order, so
+    without an `errors` list the first failure to come back is raised.
+    Parallel builds do not support an image pipeline.
+
+    A `schedule.BuildTimings` records how long each content page took and
+    is saved at the end of a directory build.
+    """
+    if workers > 1 and images is not None:
+        raise ValueError("Parallel page builds do not support an image pipeline")
+    urls = []
+    written = set()
+
+    def new_record(src_path, rel_html):
+        written.add(rel_html)
+        if site_index is None:
+            return None
+        record = PageRecord(page_url(rel_html, basepath), lastmod=_lastmod(src_path) if src_path else None)
+        urls.append(record.url)
+        return record
+
+    def new_links(rel_html):
+        if link_checker is None:
+            return None
+        link_checker.add_page(rel_html)
+        return []
+
+    def done(rel_html, record, links):
+        if record is not None:
+            site_index.update(record)
+        if links is not None:
+            link_checker.add_links(rel_html, links)
+
+    def failed(src_path, error):
+        error = _page_error(error, src_path)
+        errors.append(error)
+        logger(f"Failed to build {error}")
+
+    def template_for(rel_html):
+        return select_template(rel_html, template_path, section_templates)
+
+    def render_sections():
+        for rel_html, listing in section_listings():
+            try:
+                if rel_html in written:
+                    raise ValueError(f"Section listing {rel_html} conflicts with a page in {dir_path_content}")
+                template = load_template(template_for(rel_html))
+                record, links = new_record(None, rel_html), new_links(rel_html)
+                page = _render_listing(listing, template, basepath, minify=minify, asset_manifest=asset_manifest,
+                                       images=images, record=record, links=links)
+            except Exception as e:
+                if errors is None:
+                    raise
+                # Listings have no source file; name the page instead
+                failed(rel_html, e)
+                continue
+            done(rel_html, record, links)
+            yield rel_html, page.encode("utf-8")
+        sections.save()
+
+    def section_listings():
+        for section in sections.sections:
+            try:
+                listings = sections.section_pages(section)
+            except Exception as e:
+                if errors is None:
+                    raise
+                # A section that cannot be listed is reported like a failing page; the others still are
+                failed(os.path.join(sections.content_dir, *section.name.split("/")), e)
+                continue
+            yield from listings
+
+    def finish():
+        if site_index is not None:
+            site_index.prune(urls)
+            site_index.write(dest_dir_path, logger=logger)
+
+    if not isinstance(dest_dir_path, (str, os.PathLike)):
+        for src_path, rel_html in iter_content_files(dir_path_content):
+            page_template = template_for(rel_html)
+            logger(f"Generating page from {src_path} to {dest_dir_path.describe(rel_html)} using {page_template}")
+            record, links = new_record(src_path, rel_html), new_links(rel_html)
+            try:
+                template = load_template(page_template)
+                with open(src_path, "r", encoding="utf-8") as f:
+                    markdown = f.read()
+                page = render_page(markdown, template, basepath, minify=minify, asset_manifest=asset_manifest,
+                                   images=images, record=record, links=links)
+            except Exception as e:
+                if errors is None:
+                    raise
+                failed(src_path, e)
+                continue
+            dest_dir_path.write(rel_html, page.encode("utf-8"))
+            done(rel_html, record, links)
+        if sections is not None:
+            for rel_html, data in render_sections():
+                logger(f"Generating section listing {dest_dir_path.describe(rel_html)}")
+                dest_dir_path.write(rel_html, data)
+        finish()
+        return
+
+    def build_parallel(pages):
+        work = []
+        for src_path, rel_html in pages:
+            dest_path = os.path.join(dest_dir_path, *rel_html.split('/'))
+            work.append((src_path, template_for(rel_html), dest_path,
+                         new_record(src_path, rel_html), new_links(rel_html)))
+        chunks = plan_chunks(range(len(work)), estimate_costs(pages, timings), workers)
+        logger(f"Building {len(work)} pages as {len(chunks)} tasks on {workers} workers")
+        options = dict(basepath=basepath, minify=minify, asset_manifest=asset_manifest)
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = {pool.submit(_build_chunk, [work[index] for index in chunk], options): chunk
+                       for chunk in chunks}
+            try:
+                for future in as_completed(futures):
+                    for index, (record, links, seconds, error) in zip(futures[future], future.result()):
+                        src_path, rel_html = pages[index]
+                        if error is not None:
+                            if errors is None:
+                                raise error
+                            failed(src_path, error)
+                            continue
+                        dest_path = work[index][2]
+                        logger(f"Wrote {dest_path}")
+                        if timings is not None:
+                            timings.record(rel_html, seconds)
+                        done(rel_html, record, links)
+                        if precompressor is not None:
+                            precompressor.submit(dest_path)
+            except BaseException:
+                # Do not start the remaining tasks once the build is failing
+                pool.shutdown(cancel_futures=True)
+                raise
+
+    if workers > 1:
+        build_parallel(list(iter_content_files(dir_path_content)))
+    else:
+        for src_path, rel_html in iter_content_files(dir_path_content):
+            # generate_page creates the destination directory once the page rendered
+            dest_path = os.path.join(dest_dir_path, *rel_html.split('/'))
+            record, links = new_record(src_path, rel_html), new_links(rel_html)
+            start = time.perf_counter()
+            try:
+                generate_page(src_path, template_for(rel_html), dest_path, basepath=basepath, logger=logger,
+                              minify=minify, asset_manifest=asset_manifest, images=images, record=record, links=links)
+            except Exception as e:
+                if errors is None:
+                    raise
+                failed(src_path, e)
+                continue
+            if timings is not None:
+                timings.record(rel_html, time.perf_counter() - start)
+            done(rel_html, record, links)
+            if precompressor is not None:
+                precompressor.submit(dest_path)
+    if timings is not None:
+        timings.save()
+
+    if sections is not None:
+        for rel_html, data in render_sections():
+            dest_path = os.path.join(dest_dir_path, *rel_html.split('/'))
+            if not _write_if_changed(dest_path, data):
+                logger(f"Unchanged section listing {dest_path}")
+                continue
+            logger(f"Wrote section listing {dest_path}")
+            if precompressor is not None:
+                precompressor.submit(dest_path)
+        for rel_html in sections.stale_pages():
+            dest_path = os.path.join(dest_dir_path, *rel_html.split('/'))
+            logger(f"Removing stale section listing {dest_path}")
+            _remove_output(dest_path)
 
+    finish()
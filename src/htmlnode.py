@@ -1,23 +1,113 @@
 from textnode import TextType
 
+# Interned open/close strings for the fixed tag set the converter emits
+_TAGS = ("div", "p", "li", "ul", "ol", "h1", "h2", "h3", "h4", "h5", "h6",
+         "pre", "code", "blockquote", "a", "img", "b", "i")
+_OPEN_TAGS = {tag: f"<{tag}>" for tag in _TAGS}
+_CLOSE_TAGS = {tag: f"</{tag}>" for tag in _TAGS}
+
+
+def escape_text(text):
+    """Escape `&`, `<` and `>` in element content."""
+    # Most text has nothing to escape; the membership tests are cheaper than replacing
+    if "&" in text or "<" in text or ">" in text:
+        return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+    return text
+
+
+def escape_attr(value):
+    """Escape a value for a double-quoted attribute (`escape_text` plus `"`)."""
+    if "&" in value or "<" in value or ">" in value or '"' in value:
+        return value.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;").replace('"', "&quot;")
+    return value
+
+
+def open_tag(tag, props_html=""):
+    """Return the opening tag string, reusing the interned one when there are no props."""
+    if not props_html:
+        interned = _OPEN_TAGS.get(tag)
+        if interned is not None:
+            return interned
+    return f"<{tag}{props_html}>"
+
+
+def close_tag(tag):
+    """Return the closing tag string, reusing the interned one when possible."""
+    interned = _CLOSE_TAGS.get(tag)
+    if interned is not None:
+        return interned
+    return f"</{tag}>"
+
+
+class Props(dict):
+    """
+    Attribute dict that caches its rendered HTML attribute string.
+
+    Values are escaped when the string is built, so once per attribute
+    however often the node is rendered. Any mutation drops the cached string so it is rebuilt on the next render.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._html = None
+
+    def to_html(self):
+        if self._html is None:
+            self._html = "".join([f' {key}="{escape_attr(str(value))}"' for key, value in self.items()])
+        return self._html
+
+    def _invalidating(name):
+        method = getattr(dict, name)
+
+        def wrapper(self, *args, **kwargs):
+            self._html = None
+            return method(self, *args, **kwargs)
+
+        wrapper.__name__ = name
+        return wrapper
+
+    __setitem__ = _invalidating("__setitem__")
+    __delitem__ = _invalidating("__delitem__")
+    __ior__ = _invalidating("__ior__")
+    clear = _invalidating("clear")
+    pop = _invalidating("pop")
+    popitem = _invalidating("popitem")
+    setdefault = _invalidating("setdefault")
+    update = _invalidating("update")
+    del _invalidating
+
+
 class HTMLNode:
     def __init__(self, tag=None, value=None, children=None, props=None):
         self.tag = tag
         self.value = value
         self.children = children if children is not None else []
-        self.props = props if props is not None else {}
+        self.props = props
+
+    @property
+    def props(self):
+        if self._props is None:
+            # Most nodes have no attributes; their empty dict is only made when asked for
+            self._props = Props()
+        return self._props
+
+    @props.setter
+    def props(self, props):
+        # Wrap plain dicts so the rendered attribute string can be cached
+        if not props:
+            self._props = None
+        else:
+            self._props = props if isinstance(props, Props) else Props(props)
 
     def to_html(self):
         raise NotImplementedError("Subclasses should implement this method")
 
     def props_to_html(self):
-        props_str = ""
-        for key, value in self.props.items():
-            props_str += f' {key}="{value}"'
-        return props_str
+        props = self._props
+        return props.to_html() if props else ""
 
     def __repr__(self):
-        return f"HTMLNode(tag={self.tag!r}, value={self.value!r}, children={self.children!r}, props={self.props!r})"
+        return f"HTMLNode(tag={self.tag!r}, value={self.value!r}, children={self.children!r}, props={self._props or {}!r})"
     
     def __eq__(self, other):
         if not isinstance(other, HTMLNode):
@@ -26,7 +116,7 @@ class HTMLNode:
             self.tag == other.tag and
             self.value == other.value and
             self.children == other.children and
-            self.props == other.props
+            (self._props or {}) == (other._props or {})
         )
 
 
@@ -43,9 +133,15 @@ class LeafNode(HTMLNode):
             raise ValueError("LeafNode has no value")
 
         if self.tag is None:
-            return self.value
+            return escape_text(self.value)
 
-        return f"<{self.tag}{self.props_to_html()}>{self.value}</{self.tag}>"
+        tag = self.tag
+        props = self._props
+        if not props:
+            opening = _OPEN_TAGS.get(tag) or f"<{tag}>"
+        else:
+            opening = f"<{tag}{props._html or props.to_html()}>"
+        return opening + escape_text(self.value) + (_CLOSE_TAGS.get(tag) or f"</{tag}>")
     
 
     
@@ -63,10 +159,11 @@ class ParentNode(HTMLNode):
         if self.children == []:
             raise ValueError("ParentNode requires children, but child list is empty")
 
-        inner_html = ""
+        parts = [open_tag(self.tag, self.props_to_html())]
         for child in self.children:
             if not isinstance(child, HTMLNode):
                 raise ValueError("ParentNode children must be HTMLNode objects")
-            inner_html += child.to_html()
+            parts.append(child.to_html())
+        parts.append(close_tag(self.tag))
 
-        return f"<{self.tag}{self.props_to_html()}>{inner_html}</{self.tag}>"
\ No newline at end of file
+        return "".join(parts)
\ No newline at end of file
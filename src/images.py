@@ -0,0 +1,215 @@
+import hashlib
+import io
+import os
+import re
+import struct
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from html import unescape
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+from htmlnode import escape_attr
+
+try:
+    from PIL import Image
+except ImportError:
+    Image = None
+
+
+# Variant widths generated when Pillow is available
+DEFAULT_WIDTHS = (480, 960)
+
+_IMG_TAG = re.compile(r'<img src="/([^"?#]+)"([^>]*)>')
+
+# JPEG start-of-frame markers carrying the image dimensions
+_JPEG_SOF = {0xC0, 0xC1, 0xC2, 0xC3, 0xC5, 0xC6, 0xC7, 0xC9, 0xCA, 0xCB, 0xCD, 0xCE, 0xCF}
+
+
+def image_size(path: str) -> Optional[Tuple[int, int]]:
+    """
+    Return `(width, height)` read from a PNG, GIF or JPEG file header.
+
+    Only the header is read, never the pixel data. Returns None for other
+    formats or truncated files.
+    """
+    with open(path, "rb") as f:
+        head = f.read(26)
+        if head[:8] == b"\x89PNG\r\n\x1a\n" and head[12:16] == b"IHDR":
+            return struct.unpack(">II", head[16:24])
+        if head[:6] in (b"GIF87a", b"GIF89a"):
+            return struct.unpack("<HH", head[6:10])
+        if head[:2] != b"\xff\xd8":
+            return None
+
+        # Walk JPEG segments until a start-of-frame marker
+        f.seek(2)
+        while True:
+            marker = f.read(2)
+            if len(marker) < 2 or marker[0] != 0xFF:
+                return None
+            code = marker[1]
+            if code == 0xFF:
+                # Fill byte before the real marker
+                f.seek(-1, os.SEEK_CUR)
+                continue
+            if code in (0xD8, 0x01) or 0xD0 <= code <= 0xD7:
+                continue
+            length = f.read(2)
+            if len(length) < 2:
+                return None
+            (size,) = struct.unpack(">H", length)
+            if code in _JPEG_SOF:
+                frame = f.read(5)
+                if len(frame) < 5:
+                    return None
+                height, width = struct.unpack(">HH", frame[1:5])
+                return width, height
+            f.seek(size - 2, os.SEEK_CUR)
+
+
+def variant_name(rel_path: str, digest: str, width: int) -> str:
+    """Name of a downscaled variant: "images/tom.png" -> "images/tom.<digest>.<width>w.png"."""
+    stem, ext = os.path.splitext(rel_path)
+    return f"{stem}.{digest}.{width}w{ext}"
+
+
+class ImagePipeline:
+    """
+    Adds intrinsic dimensions and responsive variants to `<img>` tags.
+
+    Images are looked up under `static_dir` by their root-absolute URL
+    (`/images/tom.png` -> `static/images/tom.png`). Every image gets `width`
+    and `height` attributes read from its header. When Pillow is installed
+    and `dest` is given, downscaled variants for each of `widths` narrower
+    than the original are generated in a thread pool, written to `dest` (a
+    directory path or an output sink, see `sinks`) and listed in a `srcset`.
+    Variants for a sink are held until `close`.
+
+    Variants are named and cached by the SHA-256 of the source image, so an
+    unchanged image is never resized twice when a `cache_dir` is given.
+    """
+
+    def __init__(self, static_dir: str, dest=None, widths: Sequence[int] = DEFAULT_WIDTHS,
+                 cache_dir: Optional[str] = None, workers: Optional[int] = None,
+                 logger: Callable[[str], None] = print):
+        self.static_dir = static_dir
+        self.dest = dest
+        self.widths = sorted(widths)
+        self.cache_dir = cache_dir
+        self.logger = logger
+        self._info: Dict[str, Optional[dict]] = {}
+        self._lock = threading.Lock()
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._futures = []
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+
+    @property
+    def makes_variants(self) -> bool:
+        return Image is not None and self.dest is not None and bool(self.widths)
+
+    def _load(self, rel_path: str) -> Optional[dict]:
+        src_path = os.path.join(self.static_dir, *rel_path.split("/"))
+        if not os.path.isfile(src_path):
+            return None
+        size = image_size(src_path)
+        if size is None:
+            return None
+
+        info = {"size": size, "variants": []}
+        if self.makes_variants:
+            with open(src_path, "rb") as f:
+                digest = hashlib.sha256(f.read()).hexdigest()[:10]
+            for width in self.widths:
+                if width >= size[0]:
+                    break
+                name = variant_name(rel_path, digest, width)
+                info["variants"].append((name, width))
+                self._futures.append(self._pool.submit(self._make_variant, src_path, name, width, digest))
+        return info
+
+    def info(self, rel_path: str) -> Optional[dict]:
+        """Return (and on first use compute) dimensions and variants for an image."""
+        with self._lock:
+            if rel_path not in self._info:
+                self._info[rel_path] = self._load(rel_path)
+            return self._info[rel_path]
+
+    def _make_variant(self, src_path: str, name: str, width: int, digest: str):
+        cached = None
+        if self.cache_dir:
+            cached = os.path.join(self.cache_dir, f"{digest}.{width}w{os.path.splitext(name)[1]}")
+        if cached and os.path.exists(cached):
+            with open(cached, "rb") as f:
+                data = f.read()
+        else:
+            with Image.open(src_path) as image:
+                height = max(1, round(image.height * width / image.width))
+                resized = image.resize((width, height), Image.LANCZOS)
+                out = io.BytesIO()
+                resized.save(out, format=image.format)
+                data = out.getvalue()
+            if cached:
+                tmp = f"{cached}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(data)
+                os.replace(tmp, cached)
+
+        self.logger(f"Resized {src_path} -> {name} ({width}w)")
+        if not isinstance(self.dest, (str, os.PathLike)):
+            # Sinks are written from the calling thread in `close`
+            return name, data
+        dest_path = os.path.join(self.dest, *name.split("/"))
+        os.makedirs(os.path.dirname(dest_path), exist_ok=True)
+        with open(dest_path, "wb") as f:
+            f.write(data)
+        return None
+
+    def rewrite(self, html: str, basepath: str = '/', asset_manifest: Optional[Dict[str, str]] = None) -> str:
+        """
+        Add `width`/`height` (and `srcset`) to root-absolute `<img>` tags in `html`.
+
+        `src` itself is left for the caller's basepath rewrite; `srcset`
+        entries are emitted already prefixed with `basepath` (and mapped
+        through `asset_manifest` when assets are fingerprinted).
+        """
+        asset_manifest = asset_manifest or {}
+
+        def replace(match):
+            src, rest = match.groups()
+            # `src` is escaped HTML; look the file up by its real name
+            rel_path = unescape(src)
+            info = self.info(rel_path)
+            if info is None or " width=" in rest:
+                return match.group(0)
+            width, height = info["size"]
+            attrs = f' width="{width}" height="{height}"'
+            if info["variants"]:
+                candidates = [f"{basepath}{name} {w}w" for name, w in info["variants"]]
+                candidates.append(f"{basepath}{asset_manifest.get(rel_path, rel_path)} {width}w")
+                attrs += f' srcset="{escape_attr(", ".join(candidates))}"'
+            return f'<img src="/{src}"{rest}{attrs}>'
+
+        return _IMG_TAG.sub(replace, html)
+
+    def close(self):
+        """
+        Wait for queued variants and re-raise the first failure, if any.
+
+        Variants for an output sink are written here, from the calling
+        thread and sorted by name, so the sink is never written from two
+        threads and archives list their members in a reproducible order.
+        """
+        try:
+            pending = [future.result() for future in self._futures]
+        finally:
+            self._futures = []
+            self._pool.shutdown()
+        for name, data in sorted(variant for variant in pending if variant is not None):
+            self.dest.write(name, data)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,86 @@
+import posixpath
+from typing import Iterable, List, NamedTuple
+
+from fs_utils import iter_files_sorted
+
+
+# URL prefixes that never point into the generated site
+_EXTERNAL_PREFIXES = ("http://", "https://", "//", "mailto:", "tel:", "data:", "javascript:")
+
+
+class BrokenLink(NamedTuple):
+    page: str
+    url: str
+
+
+class LinkChecker:
+    """
+    Validates internal link and image URLs against the pages and assets of a build.
+
+    Pages register the URLs collected while they are converted
+    (`add_links`), the generator and static copy register what they produce
+    (`add_page`, `add_asset`), and `check` resolves every URL against those
+    in-memory sets. Root-absolute URLs may or may not carry the basepath;
+    relative URLs are resolved against the linking page's directory.
+    """
+
+    def __init__(self, basepath: str = '/'):
+        if not basepath.endswith('/'):
+            basepath = basepath + '/'
+        self.basepath = basepath
+        self.targets = set()
+        self.links = []
+
+    def add_page(self, rel_html: str):
+        self.targets.add(rel_html)
+
+    def add_asset(self, rel_path: str):
+        self.targets.add(rel_path)
+
+    def add_assets_from_dir(self, static_dir: str):
+        for _, rel_path in iter_files_sorted(static_dir):
+            self.targets.add(rel_path)
+
+    def add_links(self, rel_html: str, urls: Iterable[str]):
+        """Record the URLs found on the page at `rel_html`."""
+        self.links.extend([(rel_html, url) for url in urls])
+
+    def _target(self, page: str, url: str):
+        """Map `url` to a site-relative path, or None when it is not internal."""
+        path = url.split("#", 1)[0].split("?", 1)[0]
+        if not path or url.startswith(_EXTERNAL_PREFIXES):
+            return None
+        if path.startswith("/"):
+            if self.basepath != "/" and (path + "/").startswith(self.basepath):
+                path = path[len(self.basepath):]
+            path = path.lstrip("/")
+        else:
+            path = posixpath.join(posixpath.dirname(page), path)
+        trailing = path.endswith("/")
+        path = posixpath.normpath(path) if path else ""
+        if path == ".":
+            path = ""
+        return path + "/" if trailing and path else path
+
+    def resolves(self, path: str) -> bool:
+        targets = self.targets
+        if path in targets:
+            return True
+        if path == "" or path.endswith("/"):
+            return path + "index.html" in targets
+        return path + "/index.html" in targets or path + ".html" in targets
+
+    def check(self) -> List[BrokenLink]:
+        """Return every recorded internal URL that does not resolve, in recording order."""
+        broken = []
+        cache = {}
+        for page, url in self.links:
+            path = self._target(page, url)
+            if path is None:
+                continue
+            ok = cache.get(path)
+            if ok is None:
+                ok = cache[path] = self.resolves(path)
+            if not ok:
+                broken.append(BrokenLink(page, url))
+        return broken
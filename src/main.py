@@ -1,30 +1,183 @@
+import argparse
+import os
 import sys
 
 from textnode import TextNode, TextType
 from fs_utils import copy_dir_recursive
 from generator import generate_pages_recursive
+from sinks import ArchiveSink
+from precompress import Precompressor
+from images import ImagePipeline
+from siteindex import SiteIndex
+from linkcheck import LinkChecker
+from sections import Section, SectionIndex
+from schedule import BuildTimings
+from daemon import BuildDaemon, remove_stale_socket, serve
 
 
-def main():
+def _positive_int(value):
+    """argparse type for counts that must be at least 1."""
+    try:
+        number = int(value)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected a whole number, got {value!r}")
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"expected at least 1, got {number}")
+    return number
+
+
+def parse_args(argv):
+    parser = argparse.ArgumentParser(description="Build the static site from `content` and `static` into `docs`")
+    parser.add_argument("basepath", nargs="?", default="/", help="Base path prefixed to root-absolute links (default: /)")
+    parser.add_argument("--archive", metavar="PATH",
+                        help="Stream the site into a .tar, .tar.gz, .tar.zst or .zip archive instead of `docs`")
+    parser.add_argument("--precompress", action="store_true",
+                        help="Write .gz (and .br if brotli is installed) sidecars next to pages and static assets in `docs`")
+    parser.add_argument("--precompress-cache", metavar="DIR", default=".cache/precompress",
+                        help="Cache of compressed outputs keyed by content hash (default: .cache/precompress)")
+    parser.add_argument("--fingerprint", action="store_true",
+                        help="Copy static assets under content-hashed names and rewrite page references to them")
+    parser.add_argument("--images", action="store_true",
+                        help="Add width/height to <img> tags and, if Pillow is installed, generate srcset variants")
+    parser.add_argument("--site-index", action="store_true",
+                        help="Write search-index.json, and sitemap.xml when --site-url is set, built while pages are rendered")
+    parser.add_argument("--site-url", default="",
+                        help="Absolute site URL prefixed to sitemap entries, e.g. https://example.com (required for sitemap.xml)")
+    parser.add_argument("--check-links", action="store_true",
+                        help="Report internal links and images that do not resolve to a generated page or asset")
+    parser.add_argument("--section", action="append", default=[], metavar="DIR",
+                        help="Generate paginated listing pages for the posts under content/DIR (repeatable)")
+    parser.add_argument("--per-page", type=_positive_int, default=10, metavar="N",
+                        help="Posts per section listing page (default: 10)")
+    parser.add_argument("--template", action="append", default=[], metavar="SECTION=PATH",
+                        help="Render pages under content/SECTION with the template at PATH (repeatable)")
+    parser.add_argument("--minify", action="store_true",
+                        help="Minify generated pages (strip comments, collapse whitespace outside <pre>/<code>)")
+    parser.add_argument("--jobs", type=int, default=1, metavar="N",
+                        help="Build pages in N processes, longest first, using page times from the previous build")
+    parser.add_argument("--daemon", metavar="SOCKET",
+                        help="Build once, then keep caches warm and answer build requests on the Unix socket SOCKET")
+    args = parser.parse_args(argv)
+    args.section_templates = {}
+    for spec in args.template:
+        section, sep, path = spec.partition("=")
+        if not sep or not section.strip("/") or not path:
+            parser.error(f"--template expects SECTION=PATH, got {spec!r}")
+        args.section_templates[section.strip("/")] = path
+    for name in args.section:
+        if not name.strip("/") or not os.path.isdir(os.path.join("content", *name.strip("/").split("/"))):
+            parser.error(f"--section {name!r} is not a directory under content")
+    if args.precompress and args.archive:
+        parser.error("--precompress writes sidecars next to files in `docs` and cannot be combined with --archive")
+    if args.jobs < 1:
+        parser.error("--jobs needs at least one process")
+    if args.jobs > 1 and (args.archive or args.images):
+        parser.error("--jobs builds pages into `docs` and cannot be combined with --archive or --images")
+    if args.daemon and (args.archive or args.precompress or args.images or args.site_index or args.check_links
+                        or args.section or args.jobs > 1):
+        parser.error("--daemon supports --fingerprint, --minify and --template only")
+    return args
+
+
+def main(argv=None):
+    args = parse_args(sys.argv[1:] if argv is None else argv)
+
     # small demo object still printed for backwards compatibility
     node = TextNode("Click here", TextType.LINK, "https://example.com")
     print(node)
 
-    # Perform a site copy from `static` -> `docs` by default.
+    if args.daemon:
+        return run_daemon(args)
+
+    # Output goes to `docs` by default, or straight into an archive
+    dest = ArchiveSink(args.archive) if args.archive else "docs"
+    precompressor = Precompressor(cache_dir=args.precompress_cache) if args.precompress else None
+    asset_manifest = None
+    errors = []
+    status = 0
+    link_checker = LinkChecker(args.basepath) if args.check_links else None
+    site_index = None
+    if args.site_index:
+        # Load before `docs` is cleared so unchanged pages keep their entries
+        site_index = SiteIndex.load("docs", args.site_url) if not args.archive else SiteIndex(args.site_url)
+    sections = None
+    if args.section:
+        sections = SectionIndex("content", [Section(name.strip("/"), args.per_page) for name in args.section],
+                                cache_path=".cache/sections.json")
+    images = ImagePipeline("static", dest, cache_dir=".cache/images") if args.images else None
+    timings = BuildTimings(".cache/timings.json") if args.jobs > 1 else None
+
     try:
-        copy_dir_recursive("static", "docs")
-    except Exception as e:
-        print(f"Error copying static files: {e}")
+        # Perform a site copy from `static` -> `docs` by default.
+        try:
+            asset_manifest = copy_dir_recursive("static", dest, precompressor=precompressor,
+                                                fingerprint=args.fingerprint)
+            if link_checker is not None:
+                link_checker.add_assets_from_dir("static")
+        except Exception as e:
+            print(f"Error copying static files: {e}")
+            status = 1
+
+        # Generate HTML pages for every markdown file in `content` -> `docs`
+        try:
+            generate_pages_recursive("content", "template.html", dest, basepath=args.basepath,
+                                     precompressor=precompressor, minify=args.minify,
+                                     asset_manifest=asset_manifest, images=images, site_index=site_index,
+                                     link_checker=link_checker, sections=sections,
+                                     section_templates=args.section_templates, errors=errors,
+                                     workers=args.jobs, timings=timings)
+        except Exception as e:
+            print(f"Error generating pages: {e}")
+            status = 1
+    finally:
+        if images is not None:
+            try:
+                images.close()
+            except Exception as e:
+                print(f"Error generating image variants: {e}")
+                status = 1
+        if precompressor is not None:
+            try:
+                precompressor.close()
+            except Exception as e:
+                print(f"Error precompressing files: {e}")
+                status = 1
+        if args.archive:
+            dest.close()
+
+    if errors:
+        # Every failing page is reported together, after the rest of the site was built
+        print(f"{len(errors)} page(s) failed to build:")
+        for error in errors:
+            print(f"  {error}")
+        status = 1
+
+    if link_checker is not None:
+        broken = link_checker.check()
+        for link in broken:
+            print(f"Broken link in {link.page}: {link.url}")
+        print(f"Checked {len(link_checker.links)} links, {len(broken)} broken")
+        if broken:
+            status = 1
+    return status
 
-    # Determine basepath from CLI first argument (default "/")
-    basepath = sys.argv[1] if len(sys.argv) > 1 else '/'
 
-    # Generate HTML pages for every markdown file in `content` -> `docs`
+def run_daemon(args):
+    # Checked before the build, which clears `docs`
     try:
-        generate_pages_recursive("content", "template.html", "docs", basepath=basepath)
-    except Exception as e:
-        print(f"Error generating pages: {e}")
+        remove_stale_socket(args.daemon)
+    except ValueError as e:
+        print(f"Error: {e}")
+        return 1
+    daemon = BuildDaemon("content", "template.html", "docs", basepath=args.basepath, minify=args.minify,
+                         fingerprint=args.fingerprint, section_templates=args.section_templates)
+    result = daemon.full()
+    for error in result["errors"]:
+        print(f"  {error}")
+    print(f"Built {len(result['built'])} pages in {result['timings']['total_s']:.3f}s; listening on {args.daemon}")
+    serve(daemon, args.daemon)
+    return 0
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    sys.exit(main())
@@ -1,3 +1,4 @@
+import mmap
 import re
 from enum import Enum
 
@@ -10,10 +11,95 @@ class BlockType(Enum):
     ORDERED_LIST = "ordered_list"
     PARAGRAPH = "paragraph"
 
+def link_positions(text, opener="[", skip_after=None, label_required=False,
+                   url_required=False, url_newlines=True, pos=0, endpos=None):
+    """
+    Yield `(start, close, paren)` for each `<opener>label](url)` in `text[pos:endpos]`.
+
+    `start` is the index of the opener, `close` of the `]` ending the label
+    and `paren` of the `)` ending the URL. Finds the same matches as
+    `re.finditer` over the usual link patterns, but in linear time: a regex
+    engine retries every opener and rescans to the end of the text when a
+    `]` or `)` never comes, which is quadratic (or worse) on runs of `[`,
+    `![` or `[a](`. Here the label ends at the first `]` and the URL at the
+    first `)`, so a failed candidate lets the scan jump past that `]`, and
+    the next `)` and newline are only searched for again once the scan has
+    passed them.
+
+    Args:
+        opener: "[" for links, "![" for images
+        skip_after: a character that may not precede the opener (e.g. "!")
+        label_required / url_required: reject empty labels / URLs
+        url_newlines: whether the URL may span lines
+        pos / endpos: bounds of the scanned text, as for `re.Pattern.finditer`
+    """
+    if endpos is None:
+        endpos = len(text)
+    skip = len(opener)
+    first = pos
+    paren = -1      # first ")" at or after the last URL start looked at
+    line_end = -1   # first newline at or after the last URL start looked at
+    while True:
+        start = text.find(opener, pos, endpos)
+        if start == -1:
+            return
+        if skip_after and start > first and text[start - 1] == skip_after:
+            pos = start + 1
+            continue
+        close = text.find("]", start + skip, endpos)
+        if close == -1:
+            return
+        # Every opener before `close` ends its label there too, so they all fail alike
+        pos = close + 1
+        if (label_required and close == start + skip) or not text.startswith("(", close + 1, endpos):
+            continue
+        url_start = close + 2
+        if paren < url_start:
+            paren = text.find(")", url_start, endpos)
+            if paren == -1:
+                return
+        if not url_newlines:
+            if line_end < url_start:
+                line_end = text.find("\n", url_start, endpos)
+                if line_end == -1:
+                    line_end = endpos
+            if paren > line_end:
+                continue
+        if url_required and paren == url_start:
+            continue
+        yield start, close, paren
+        pos = paren + 1
+
+
+def iter_link_spans(text, opener="[", **options):
+    """
+    Yield `(start, end, label, url)` for each `<opener>label](url)` in `text`.
+
+    Takes the options of `link_positions`.
+    """
+    skip = len(opener)
+    for start, close, paren in link_positions(text, opener, **options):
+        yield start, paren + 1, text[start + skip:close], text[close + 2:paren]
+
+
 def extract_markdown_images(text):
-    # ![alt](url)
-    pattern = r"!\[(.*?)\]\((.*?)\)"
-    return re.findall(pattern, text)
+    # ![alt](url), on one line; the alt text ends at the first "](" of the line
+    matches = []
+    for line in text.split("\n"):
+        pos = 0
+        while True:
+            start = line.find("![", pos)
+            if start == -1:
+                break
+            close = line.find("](", start + 2)
+            if close == -1:
+                break
+            end = line.find(")", close + 2)
+            if end == -1:
+                break
+            matches.append((line[start + 2:close], line[close + 2:end]))
+            pos = end + 1
+    return matches
 
 
 def extract_markdown_links(text):
@@ -21,20 +107,17 @@ def extract_markdown_links(text):
     Extract markdown links [text](url) but ignore images ![alt](url)
     Returns list of (text, url) tuples
     """
-    # Pattern explanation:
-    # (?<!\!)        -> negative lookbehind, ensures not preceded by '!'
-    # \[([^\]]*?)\]  -> match link text inside brackets (non-greedy)
-    # \((.*?)\)      -> match URL inside parentheses (non-greedy)
-    pattern = r'(?<!\!)\[([^\]]*?)\]\((.*?)\)'
-    return re.findall(pattern, text)
+    # Same matches as the pattern (?<!\!)\[([^\]]*?)\]\((.*?)\), in linear time
+    return [(label, url) for _, _, label, url in iter_link_spans(text, skip_after="!", url_newlines=False)]
 
 
 def markdown_to_blocks(markdown):
     """
-    Split a markdown document into blocks separated by double newlines.
+    Split a markdown document into blocks separated by blank lines.
     
     Each block is stripped of leading/trailing whitespace.
     Empty blocks (from excessive newlines) are removed.
+    A fenced code block is kept whole even when it contains blank lines.
     
     Args:
         markdown: A string containing the full markdown document
@@ -42,15 +125,328 @@ def markdown_to_blocks(markdown):
     Returns:
         A list of block strings
     """
-    blocks = markdown.split("\n\n")
-    result = []
-    
-    for block in blocks:
-        stripped = block.strip()
-        if stripped:  # Only add non-empty blocks
-            result.append(stripped)
-    
-    return result
+    return [block.text for block in _scan_blocks(markdown.split("\n"))]
+
+
+class Block:
+    """
+    A typed markdown block, produced once by the block stage.
+
+    Attributes:
+        text: The block text (whitespace already stripped)
+        type: The BlockType of the block
+        lines: The block split on newlines, or None if it was never split
+        level: Heading level (1-6) for headings, 0 otherwise
+        offsets: For quote and list blocks, the index in each line where the
+            item content starts (just past the `>`, `- ` or `N. ` marker)
+        first_line: 1-based source line the block starts on, when known
+    """
+
+    def __init__(self, text, block_type, lines=None, level=0, offsets=None, first_line=None):
+        self.text = text
+        self.type = block_type
+        self.lines = lines
+        self.level = level
+        self.offsets = offsets
+        self.first_line = first_line
+
+    @property
+    def last_line(self):
+        """1-based source line the block ends on, when known."""
+        if self.first_line is None:
+            return None
+        return self.first_line + self.text.count("\n")
+
+    def items(self):
+        """Return the content of each line with its marker removed."""
+        return [line[offset:] for line, offset in zip(self.lines, self.offsets)]
+
+    def __eq__(self, other):
+        if not isinstance(other, Block):
+            return False
+        return (self.text == other.text and
+                self.type == other.type and
+                self.lines == other.lines and
+                self.level == other.level and
+                self.offsets == other.offsets)
+
+    def __repr__(self):
+        return (f"Block(text={self.text!r}, type={self.type}, lines={self.lines!r}, "
+                f"level={self.level!r}, offsets={self.offsets!r})")
+
+
+def parse_block(block):
+    """
+    Classify a markdown block and record what the converters need from it.
+
+    Dispatches on the first character so most blocks are typed without
+    looking past their first line. Lines are only split when a line-oriented
+    type (quote or list) passes its first-line test, and the heading level
+    and per-line marker offsets are recorded while scanning so the block
+    converters never re-scan the block.
+
+    Args:
+        block: A single block of markdown text (whitespace already stripped)
+
+    Returns:
+        A Block record
+    """
+    if not block:
+        return Block(block, BlockType.PARAGRAPH)
+
+    first = block[0]
+
+    # Heading (1-6 # followed by space)
+    if first == "#":
+        hashes = len(block) - len(block.lstrip("#"))
+        if hashes <= 6 and len(block) > hashes and block[hashes] == " ":
+            return Block(block, BlockType.HEADING, level=hashes)
+        return Block(block, BlockType.PARAGRAPH)
+
+    # Code block (starts and ends with 3 backticks)
+    if first == "`":
+        if block.startswith("```") and block.endswith("```"):
+            return Block(block, BlockType.CODE)
+        return Block(block, BlockType.PARAGRAPH)
+
+    # Quote block (every line starts with >, optionally followed by a space)
+    if first == ">":
+        lines = block.split("\n")
+        offsets = []
+        for line in lines:
+            if not line.startswith(">"):
+                return Block(block, BlockType.PARAGRAPH, lines)
+            offsets.append(2 if line.startswith(" ", 1) else 1)
+        return Block(block, BlockType.QUOTE, lines, offsets=offsets)
+
+    # Unordered list (every line starts with "- ")
+    if first == "-":
+        if not block.startswith("- "):
+            return Block(block, BlockType.PARAGRAPH)
+        lines = block.split("\n")
+        for line in lines:
+            if not line.startswith("- "):
+                return Block(block, BlockType.PARAGRAPH, lines)
+        return Block(block, BlockType.UNORDERED_LIST, lines, offsets=[2] * len(lines))
+
+    # Ordered list (lines numbered 1., 2., 3. ... each followed by a space)
+    if first == "1":
+        if not block.startswith("1. "):
+            return Block(block, BlockType.PARAGRAPH)
+        lines = block.split("\n")
+        offsets = []
+        number = 1
+        for line in lines:
+            digits = str(number)
+            width = len(digits)
+            if not (line.startswith(digits) and line.startswith(". ", width)):
+                return Block(block, BlockType.PARAGRAPH, lines)
+            offsets.append(width + 2)
+            number += 1
+        return Block(block, BlockType.ORDERED_LIST, lines, offsets=offsets)
+
+    return Block(block, BlockType.PARAGRAPH)
+
+
+def _fence_opens(line):
+    """
+    True if `line` opens a fenced code block: ``` and an optional info string.
+
+    A line with more backticks after the opening three, such as
+    "```x``` is inline", is text; a block starting and ending with ``` is
+    still typed as code by `parse_block`.
+    """
+    stripped = line.strip()
+    return stripped.startswith("```") and "`" not in stripped[3:]
+
+
+def _make_block(chunk, first, fenced):
+    """Build the Block for source text `chunk` starting on line `first`, or None if it is all whitespace."""
+    text = chunk.strip()
+    if not text:
+        return None
+    left = chunk.find(text[0])
+    block = Block(text, BlockType.CODE) if fenced else parse_block(text)
+    # Whitespace-only lines before the text were stripped
+    block.first_line = first + chunk.count("\n", 0, left)
+    return block
+
+
+def _scan_blocks(lines, line=1):
+    """
+    Group lines into typed Block records in a single pass.
+
+    A line-oriented state machine. `lines` yields the document's lines
+    without their newlines; `line` is the number of the first one. Outside
+    a fence, empty lines separate blocks and each block is typed by
+    `parse_block`. A line of ``` and an optional info string without
+    backticks opens a fenced code block wherever it appears, ending the
+    block before it. The fence runs to the next line ending with ```,
+    across empty lines, and is emitted as one CODE block; lines after the
+    closing line start a new block.
+
+    A fence that is never closed is not code: its lines are read again as
+    ordinary text, continuing the block the opening line interrupted. Since
+    no later line can close a fence either, fence detection is switched off
+    for them, so every line is scanned at most twice and the pass stays
+    linear.
+    """
+    current = []
+    current_line = line
+    fence = None
+    fence_line = 0
+    fences = True
+    pending = lines
+    while True:
+        for text in pending:
+            if fence is not None:
+                fence.append(text)
+                if text.rstrip().endswith("```"):
+                    if current:
+                        block = _make_block("\n".join(current), current_line, fenced=False)
+                        if block is not None:
+                            yield block
+                        current = []
+                    yield _make_block("\n".join(fence), fence_line, fenced=True)
+                    fence = None
+            elif not text:
+                if current:
+                    block = _make_block("\n".join(current), current_line, fenced=False)
+                    if block is not None:
+                        yield block
+                    current = []
+            elif fences and _fence_opens(text):
+                fence = [text]
+                fence_line = line
+            else:
+                if not current:
+                    current_line = line
+                current.append(text)
+            line += 1
+        if fence is None:
+            break
+        # Unclosed fence: read its lines again as ordinary text
+        pending, line, fence, fences = fence, fence_line, None, False
+
+    if current:
+        block = _make_block("\n".join(current), current_line, fenced=False)
+        if block is not None:
+            yield block
+
+
+def parse_blocks(markdown, first_line=1):
+    """
+    Split a markdown document into typed Block records.
+
+    Args:
+        markdown: A string containing the full markdown document
+        first_line: Line number of the document's first line in its source file
+
+    Returns:
+        A list of Block records, in document order
+    """
+    return list(_scan_blocks(markdown.split("\n"), first_line))
+
+
+def _text_runs(markdown):
+    """Yield the blank-line separated runs of `markdown` one at a time, like a lazy `split("\\n\\n")`."""
+    start = 0
+    size = len(markdown)
+    while start <= size:
+        end = markdown.find("\n\n", start)
+        if end == -1:
+            end = size
+        yield markdown[start:end]
+        start = end + 2
+
+
+def _run_lines(runs):
+    """Yield the lines of blank-line separated `runs`, with the empty line that separated them."""
+    separator = False
+    for run in runs:
+        if separator:
+            yield ""
+        separator = True
+        yield from run.split("\n")
+
+
+def iter_blocks(markdown, first_line=1):
+    """
+    Yield the typed Block records of a markdown document one at a time.
+
+    Yields the same blocks as `parse_blocks`, but never holds more than the
+    current run of lines and its blocks, so a caller that consumes each
+    block as it comes keeps no copy of the document.
+    """
+    return _scan_blocks(_run_lines(_text_runs(markdown)), first_line)
+
+
+# A blank-line boundary in raw bytes, with either "\n" or "\r\n" line endings
+_BUFFER_BOUNDARY = re.compile(rb"\r?\n\r?\n")
+
+
+def _buffer_runs(buffer, encoding, start):
+    """
+    Yield the blank-line separated runs of a bytes-like buffer, decoding one run at a time.
+
+    "\r\n" line endings become "\n", as reading the file in text mode does.
+    """
+    size = len(buffer)
+    while start <= size:
+        match = _BUFFER_BOUNDARY.search(buffer, start)
+        end, next_start = (size, size + 1) if match is None else match.span()
+        run = buffer[start:end].decode(encoding)
+        yield run.replace("\r\n", "\n") if "\r" in run else run
+        start = next_start
+
+
+def parse_buffer_blocks(buffer, encoding="utf-8", start=0):
+    """
+    Yield the typed Block records of a bytes-like buffer one at a time.
+
+    Scans the raw bytes for blank-line boundaries (two consecutive line
+    endings, "\n" or "\r\n") and decodes only the current run of lines, so a memory-mapped file is
+    never decoded as a whole. Yields the same blocks as `parse_blocks` on
+    the decoded text, with line numbers counted from the start of the buffer.
+
+    Args:
+        buffer: A bytes-like object supporting `find` and slicing (e.g. mmap)
+        encoding: Text encoding of the buffer
+        start: Byte offset to start scanning from (e.g. past front matter)
+    """
+    first_line = buffer[:start].count(b"\n") + 1
+    yield from _scan_blocks(_run_lines(_buffer_runs(buffer, encoding, start)), first_line)
+
+
+def iter_buffer_blocks(buffer, encoding="utf-8", start=0):
+    """
+    Yield the markdown blocks of a bytes-like buffer one at a time.
+
+    Yields the same block strings as `markdown_to_blocks` on the decoded text.
+    """
+    for block in parse_buffer_blocks(buffer, encoding, start):
+        yield block.text
+
+
+def parse_file_blocks(path, encoding="utf-8", offset=0):
+    """
+    Yield the typed Block records of the file at `path` through a read-only mmap.
+
+    Peak memory stays proportional to the largest block rather than the
+    whole file. Scanning starts at byte `offset`.
+    """
+    with open(path, "rb") as f:
+        # mmap refuses zero-length files; they simply have no blocks
+        if not f.seek(0, 2):
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+            yield from parse_buffer_blocks(buffer, encoding, offset)
+
+
+def iter_file_blocks(path, encoding="utf-8", offset=0):
+    """Yield the markdown block strings of the file at `path` (see `parse_file_blocks`)."""
+    for block in parse_file_blocks(path, encoding, offset):
+        yield block.text
 
 
 def block_to_block_type(block):
@@ -63,53 +459,7 @@ def block_to_block_type(block):
     Returns:
         A BlockType enum value representing the block type
     """
-    lines = block.split("\n")
-    
-    # Check for heading (1-6 # followed by space)
-    if block.startswith("#"):
-        hashes = 0
-        for char in block:
-            if char == "#":
-                hashes += 1
-            else:
-                break
-        if 1 <= hashes <= 6 and len(block) > hashes and block[hashes] == " ":
-            return BlockType.HEADING
-    
-    # Check for code block (starts and ends with 3 backticks)
-    if block.startswith("```") and block.endswith("```"):
-        return BlockType.CODE
-    
-    # Check for quote block (every line starts with >)
-    is_quote = True
-    for line in lines:
-        if not line.startswith(">"):
-            is_quote = False
-            break
-    if is_quote:
-        return BlockType.QUOTE
-    
-    # Check for unordered list (every line starts with - followed by space)
-    is_unordered = True
-    for line in lines:
-        if not line.startswith("- "):
-            is_unordered = False
-            break
-    if is_unordered:
-        return BlockType.UNORDERED_LIST
-    
-    # Check for ordered list (lines start with number, dot, space - incrementing)
-    is_ordered = True
-    for i, line in enumerate(lines, 1):
-        expected_prefix = f"{i}. "
-        if not line.startswith(expected_prefix):
-            is_ordered = False
-            break
-    if is_ordered:
-        return BlockType.ORDERED_LIST
-    
-    # Default to paragraph
-    return BlockType.PARAGRAPH
+    return parse_block(block).type
 
 
 def extract_title(markdown: str) -> str:
@@ -0,0 +1,174 @@
+import re
+
+# Elements whose contents are emitted exactly as written
+RAW_TAGS = {"pre", "code", "textarea", "script", "style"}
+
+# Raw elements whose contents are not markup: everything up to their end tag is copied,
+# even a "<" as in `if (a<b)`
+RAW_TEXT_TAGS = {"script", "style"}
+
+# Elements whitespace next to is not rendered, so it is dropped rather than collapsed
+BLOCK_TAGS = {
+    "html", "head", "body", "title", "meta", "link", "script", "style",
+    "div", "p", "ul", "ol", "li", "h1", "h2", "h3", "h4", "h5", "h6", "pre", "blockquote",
+    "article", "section", "header", "footer", "nav", "main", "aside", "hr", "br",
+    "table", "thead", "tbody", "tr", "th", "td",
+}
+
+_WHITESPACE = re.compile(r"\s+")
+_TAG_NAME = re.compile(r"</?([A-Za-z][A-Za-z0-9-]*)")
+_RAW_TEXT_END = {name: re.compile(f"</{name}", re.IGNORECASE) for name in RAW_TEXT_TAGS}
+
+
+class HTMLMinifier:
+    """
+    Incremental HTML minifier.
+
+    Feed the document in chunks with `feed` and finish with `close`; each call
+    returns the minified output available so far, so a page can be minified
+    while it is being written without holding a second full copy of it.
+
+    - Comments are removed (conditional comments `<!--[if ...` are kept).
+      The whitespace around a removed comment is treated as one run, so
+      `<b>a</b> <!-- c --> <i>b</i>` still reads "a b".
+    - Whitespace-only runs next to a block-level or head tag (see
+      `BLOCK_TAGS`), a doctype, or the start or end of the document are
+      dropped; between inline elements they collapse to one space, so
+      `<b>a</b>\n<i>b</i>` still reads "a b".
+    - Other whitespace runs in text collapse to a single space.
+    - Everything inside `<pre>`, `<code>`, `<textarea>`, `<script>` and
+      `<style>` is left untouched.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._raw_depth = 0
+        # End tag pattern of the script or style element being copied, if inside one
+        self._raw_text_end = None
+        # Whether the last tag emitted (or the start of the document) ends inline content
+        self._after_block = True
+        # Whitespace held back before a removed comment, merged with the run after it
+        self._pending_space = False
+
+    def _text(self, text, before_block):
+        if self._raw_depth:
+            return text
+        if self._pending_space:
+            text = " " + text
+            self._pending_space = False
+        if not text:
+            return text
+        if text.isspace():
+            return "" if self._after_block or before_block else " "
+        self._after_block = False
+        return _WHITESPACE.sub(" ", text)
+
+    def _tag(self, tag):
+        match = _TAG_NAME.match(tag)
+        self._after_block = _is_block(match)
+        name = match.group(1).lower() if match else None
+        if name in RAW_TEXT_TAGS:
+            if not tag.startswith("</") and not tag.endswith("/>"):
+                self._raw_text_end = _RAW_TEXT_END[name]
+        elif name in RAW_TAGS and not tag.endswith("/>"):
+            if tag.startswith("</"):
+                self._raw_depth = max(self._raw_depth - 1, 0)
+            else:
+                self._raw_depth += 1
+        return tag
+
+    def _process(self, final):
+        buf = self._buffer
+        out = []
+        pos = 0
+        while True:
+            if self._raw_text_end is not None:
+                closer = self._raw_text_end.search(buf, pos)
+                if closer is None:
+                    # Copy all but what could be the start of the end tag
+                    keep = len(buf) if final else max(pos, len(buf) - len("</script") + 1)
+                    out.append(buf[pos:keep])
+                    pos = keep
+                    break
+                out.append(buf[pos:closer.start()])
+                pos = closer.start()
+                self._raw_text_end = None
+
+            lt = buf.find("<", pos)
+            if lt == -1:
+                # Trailing text may continue in the next chunk
+                if final:
+                    out.append(self._text(buf[pos:], True))
+                    pos = len(buf)
+                break
+
+            if buf.startswith("<!--", lt):
+                end = buf.find("-->", lt + 4)
+                if end == -1:
+                    break
+                end += 3
+                comment = buf[lt:end]
+                if self._raw_depth or comment.startswith("<!--[if"):
+                    out.append(self._text(buf[pos:lt], True))
+                    out.append(comment)
+                    if not self._raw_depth:
+                        self._after_block = True
+                else:
+                    # A removed comment is no boundary: the whitespace before it joins the run after it
+                    text = self._text(buf[pos:lt], False)
+                    if text.endswith(" "):
+                        text = text[:-1]
+                        self._pending_space = True
+                    out.append(text)
+            else:
+                end = buf.find(">", lt + 1)
+                if end == -1:
+                    break
+                out.append(self._text(buf[pos:lt], _is_block(_TAG_NAME.match(buf, lt))))
+                end += 1
+                out.append(self._tag(buf[lt:end]))
+            pos = end
+
+        if final and pos < len(buf):
+            # Unterminated tag or comment: emit it unchanged
+            lt = buf.find("<", pos)
+            out.append(self._text(buf[pos:lt], True))
+            out.append(buf[lt:])
+            pos = len(buf)
+
+        self._buffer = buf[pos:]
+        return "".join(out)
+
+    def feed(self, chunk: str) -> str:
+        """Add `chunk` and return the minified output that is now complete."""
+        self._buffer += chunk
+        return self._process(final=False)
+
+    def close(self) -> str:
+        """Return whatever output was held back waiting for more input."""
+        return self._process(final=True)
+
+
+def _is_block(match) -> bool:
+    """Whether whitespace next to the tag `_TAG_NAME` matched (None for a doctype) can be dropped."""
+    return match is None or match.group(1).lower() in BLOCK_TAGS
+
+
+class MinifyingWriter:
+    """Text file wrapper that minifies everything written through it."""
+
+    def __init__(self, out):
+        self._out = out
+        self._minifier = HTMLMinifier()
+
+    def write(self, chunk: str):
+        self._out.write(self._minifier.feed(chunk))
+
+    def close(self):
+        self._out.write(self._minifier.close())
+
+
+def minify_html(html: str) -> str:
+    """Minify a complete HTML document in one call."""
+    minifier = HTMLMinifier()
+    return minifier.feed(html) + minifier.close()
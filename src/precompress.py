@@ -0,0 +1,111 @@
+import gzip
+import hashlib
+import os
+import shutil
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Optional
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+# Only text-like outputs benefit; images and archives are already compressed
+COMPRESSIBLE_EXTENSIONS = {".html", ".css", ".js", ".json", ".xml", ".svg", ".txt", ".map"}
+
+# Files smaller than this are not worth a sidecar
+MIN_SIZE = 1024
+
+
+def _gzip(data: bytes) -> bytes:
+    # mtime=0 keeps the sidecar identical for identical input
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def _brotli(data: bytes) -> bytes:
+    return brotli.compress(data, quality=11)
+
+
+class Precompressor:
+    """
+    Write `.gz` (and `.br` when the brotli module is installed) sidecars next
+    to generated files, compressing in a pool of worker threads.
+
+    Compressed output is cached by the SHA-256 of the source bytes in
+    `cache_dir`, so a file whose content did not change since a previous build
+    is never recompressed, even though the output directory is recreated from
+    scratch each time. Without a `cache_dir`, an existing sidecar that is newer
+    than its source is kept as is.
+
+    Usage:
+        with Precompressor(cache_dir=".cache/precompress") as pre:
+            pre.submit("docs/index.html")
+    """
+
+    def __init__(self, min_size: int = MIN_SIZE, workers: Optional[int] = None,
+                 cache_dir: Optional[str] = None, logger: Callable[[str], None] = print):
+        self.min_size = min_size
+        self.cache_dir = cache_dir
+        self.logger = logger
+        self.formats = {".gz": _gzip}
+        if brotli is not None:
+            self.formats[".br"] = _brotli
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        self._pool = ThreadPoolExecutor(max_workers=workers)
+        self._futures = []
+
+    def wants(self, path: str) -> bool:
+        """Return True if `path` should get compressed sidecars."""
+        if os.path.splitext(path)[1].lower() not in COMPRESSIBLE_EXTENSIONS:
+            return False
+        return os.path.getsize(path) >= self.min_size
+
+    def submit(self, path: str):
+        """Queue sidecar generation for `path` if it qualifies."""
+        if self.wants(path):
+            self._futures.append(self._pool.submit(self._compress, path))
+
+    def _is_fresh(self, path: str, sidecar: str) -> bool:
+        return os.path.exists(sidecar) and os.path.getmtime(sidecar) >= os.path.getmtime(path)
+
+    def _compress(self, path: str):
+        with open(path, "rb") as f:
+            data = f.read()
+        digest = hashlib.sha256(data).hexdigest() if self.cache_dir else None
+
+        for suffix, compress in self.formats.items():
+            sidecar = path + suffix
+            if digest is None:
+                if self._is_fresh(path, sidecar):
+                    continue
+                with open(sidecar, "wb") as f:
+                    f.write(compress(data))
+                continue
+
+            cached = os.path.join(self.cache_dir, digest + suffix)
+            if not os.path.exists(cached):
+                # Write then rename so a concurrent reader never sees a partial file
+                tmp = f"{cached}.{os.getpid()}.{threading.get_ident()}.tmp"
+                with open(tmp, "wb") as f:
+                    f.write(compress(data))
+                os.replace(tmp, cached)
+            shutil.copyfile(cached, sidecar)
+        self.logger(f"Precompressed {path}")
+
+    def close(self):
+        """Wait for all queued work and re-raise the first failure, if any."""
+        try:
+            for future in self._futures:
+                future.result()
+        finally:
+            self._futures = []
+            self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
@@ -0,0 +1,94 @@
+import json
+import os
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Tasks per worker a parallel build aims for; pages cheaper than one task's share are chunked together
+CHUNKS_PER_WORKER = 4
+
+
+class BuildTimings:
+    """
+    How long each page took to build, kept between builds in `cache_path`.
+
+    The generator records every page it builds; `get` returns the time the
+    previous build took for a page, which `estimate_costs` prefers over the
+    source file size. Only pages built this time are saved, so removed pages
+    drop out of the cache.
+    """
+
+    def __init__(self, cache_path: Optional[str] = None):
+        self.cache_path = cache_path
+        self._previous: Dict[str, float] = {}
+        self._current: Dict[str, float] = {}
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, "r", encoding="utf-8") as f:
+                self._previous = json.load(f).get("pages", {})
+
+    def get(self, rel_html: str) -> Optional[float]:
+        """Seconds the previous build spent on `rel_html`, if it built it."""
+        return self._previous.get(rel_html)
+
+    def record(self, rel_html: str, seconds: float):
+        self._current[rel_html] = seconds
+
+    def save(self):
+        """Write this build's timings for the next build."""
+        if not self.cache_path:
+            return
+        cache_dir = os.path.dirname(self.cache_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        tmp = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"pages": self._current}, f, sort_keys=True)
+        os.replace(tmp, self.cache_path)
+
+
+def estimate_costs(pages: Sequence[Tuple[str, str]], timings: Optional[BuildTimings] = None) -> List[float]:
+    """
+    Estimate the build cost of each `(src_path, rel_html)` page.
+
+    The cost is the source size in bytes. Pages with a recorded time from
+    the previous build use that time instead, converted to bytes at the
+    rate the timed pages were built, so timed and untimed pages compare.
+    """
+    sizes = [os.path.getsize(src_path) for src_path, _ in pages]
+    times = [timings.get(rel_html) if timings is not None else None for _, rel_html in pages]
+    timed_bytes = sum(size for size, seconds in zip(sizes, times) if seconds is not None)
+    timed_seconds = sum(seconds for seconds in times if seconds is not None)
+    if not timed_seconds:
+        return [float(size) for size in sizes]
+    rate = timed_bytes / timed_seconds
+    return [float(size) if seconds is None else seconds * rate for size, seconds in zip(sizes, times)]
+
+
+def plan_chunks(items: Sequence, costs: Sequence[float], workers: int,
+                chunks_per_worker: int = CHUNKS_PER_WORKER) -> List[list]:
+    """
+    Group `items` into tasks for `workers` processes, most expensive task first.
+
+    Longest-job-first keeps a large page from starting last and leaving the
+    other workers idle while it finishes. An item costing at least an even
+    share of the work (`total / (workers * chunks_per_worker)`) is a task of
+    its own; cheaper items are packed, largest first, into chunks of about
+    that share, so small pages do not each pay a round trip to a worker.
+    Equal costs keep their input order.
+    """
+    order = sorted(range(len(items)), key=lambda index: -costs[index])
+    share = sum(costs) / max(1, workers * chunks_per_worker)
+    tasks = []
+    chunk, chunk_cost = [], 0.0
+    for index in order:
+        if costs[index] >= share:
+            tasks.append((costs[index], [items[index]]))
+            continue
+        chunk.append(items[index])
+        chunk_cost += costs[index]
+        if chunk_cost >= share:
+            tasks.append((chunk_cost, chunk))
+            chunk, chunk_cost = [], 0.0
+    if chunk:
+        tasks.append((chunk_cost, chunk))
+    # Stable, so single pages stay ahead of chunks of the same cost
+    tasks.sort(key=lambda task: -task[0])
+    return [task for _, task in tasks]
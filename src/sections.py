@@ -0,0 +1,162 @@
+import json
+import os
+from typing import Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+
+from frontmatter import scan_header
+from generator import iter_content_files
+from htmlnode import escape_attr, escape_text
+from markdown_extract import Block, BlockType
+from siteindex import page_url
+
+
+class Section(NamedTuple):
+    """A content directory (e.g. "blog") whose pages get a generated listing."""
+    name: str
+    per_page: int = 10
+    sort_key: str = "date"
+    reverse: bool = True
+    title: Optional[str] = None
+
+
+class Listing(NamedTuple):
+    """A listing page, rendered: its title, its blocks with their HTML, and the URLs it links to."""
+    title: str
+    blocks: List[Tuple[Block, str]]
+    links: List[str]
+
+
+def listing_path(name: str, page: int) -> str:
+    """Output path of a listing page: "blog/index.html", "blog/page/2/index.html", ..."""
+    if page == 1:
+        return f"{name}/index.html"
+    return f"{name}/page/{page}/index.html"
+
+
+class SectionIndex:
+    """
+    Paginated listing pages for content sections.
+
+    Every markdown file below `content_dir/<section>` (except the section's
+    own `index.md`) is a post. Posts are described by their front matter and
+    H1 title, read with `frontmatter.scan_header`, so listings never convert
+    a full document. Headers are cached by file modification time and size
+    in `cache_path`, so on a rebuild only new or edited posts are scanned.
+
+    `pages` yields each listing page as a `Listing`, built as HTML with
+    post titles and dates escaped, so front matter is never parsed as
+    markdown; the generator puts it into the page template (see
+    `generator.generate_pages_recursive`).
+    """
+
+    def __init__(self, content_dir: str, sections: Sequence[Section], cache_path: Optional[str] = None):
+        self.content_dir = content_dir
+        self.sections = list(sections)
+        self.cache_path = cache_path
+        self.scanned = 0
+        self._headers: Dict[str, dict] = {}
+        self._previous_pages: List[str] = []
+        self._pages: List[str] = []
+        if cache_path and os.path.exists(cache_path):
+            with open(cache_path, "r", encoding="utf-8") as f:
+                cache = json.load(f)
+            self._cached_headers = cache.get("headers", {})
+            self._previous_pages = cache.get("pages", [])
+        else:
+            self._cached_headers = {}
+
+    def _header(self, src_path: str) -> Dict[str, str]:
+        stat = os.stat(src_path)
+        key = src_path.replace(os.sep, "/")
+        cached = self._cached_headers.get(key)
+        if cached and cached["mtime"] == stat.st_mtime_ns and cached["size"] == stat.st_size:
+            entry = cached
+        else:
+            entry = {"mtime": stat.st_mtime_ns, "size": stat.st_size, "meta": scan_header(src_path)}
+            self.scanned += 1
+        self._headers[key] = entry
+        return entry["meta"]
+
+    def posts(self, section: Section) -> List[dict]:
+        """Return the section's posts as `{"path", "title", **meta}` dicts in listing order."""
+        section_dir = os.path.join(self.content_dir, *section.name.split("/"))
+        posts = []
+        for src_path, rel_html in iter_content_files(section_dir):
+            if rel_html == "index.html":
+                continue
+            meta = self._header(src_path)
+            path = f"{section.name}/{rel_html}"
+            posts.append(dict(meta, path=path, title=meta.get("title") or path))
+        posts.sort(key=lambda post: (post.get(section.sort_key, ""), post["path"]), reverse=section.reverse)
+        return posts
+
+    def _listing(self, section: Section, posts: List[dict], page: int, total: int) -> Listing:
+        links = []
+
+        def link(url, text):
+            links.append(url)
+            return f'<a href="{escape_attr(url)}">{escape_text(text)}</a>'
+
+        title = section.title or section.name.rsplit("/", 1)[-1].title()
+        if page > 1:
+            title += f" (page {page} of {total})"
+        blocks = [(Block(title, BlockType.HEADING, level=1), f"<h1>{escape_text(title)}</h1>")]
+        if posts:
+            items = []
+            for post in posts:
+                item = link(page_url(post["path"]), post["title"])
+                if post.get("date"):
+                    item += f" ({escape_text(post['date'])})"
+                items.append(f"<li>{item}</li>")
+            blocks.append((Block("", BlockType.UNORDERED_LIST), f"<ul>{''.join(items)}</ul>"))
+        else:
+            blocks.append((Block("No posts yet.", BlockType.PARAGRAPH), "<p>No posts yet.</p>"))
+
+        nav = []
+        if page > 1:
+            nav.append(link(page_url(listing_path(section.name, page - 1)), "Newer posts"))
+        if page < total:
+            nav.append(link(page_url(listing_path(section.name, page + 1)), "Older posts"))
+        if nav:
+            blocks.append((Block("", BlockType.PARAGRAPH), f"<p>{' | '.join(nav)}</p>"))
+        return Listing(title, blocks, links)
+
+    def section_pages(self, section: Section) -> List[Tuple[str, Listing]]:
+        """
+        Return `(rel_html, listing)` for every listing page of `section`.
+
+        Raises ValueError for a section without posts per page and
+        FileNotFoundError when its directory does not exist.
+        """
+        if section.per_page < 1:
+            raise ValueError(f"Section {section.name!r} needs at least one post per page")
+        posts = self.posts(section)
+        total = max(1, -(-len(posts) // section.per_page))
+        pages = []
+        for page in range(1, total + 1):
+            start = (page - 1) * section.per_page
+            pages.append((listing_path(section.name, page),
+                          self._listing(section, posts[start:start + section.per_page], page, total)))
+        self._pages.extend(rel_html for rel_html, _ in pages)
+        return pages
+
+    def pages(self) -> Iterator[Tuple[str, Listing]]:
+        """Yield `(rel_html, listing)` for every listing page of every section."""
+        for section in self.sections:
+            yield from self.section_pages(section)
+
+    def stale_pages(self) -> List[str]:
+        """Listing pages written by the previous build that this build no longer produces."""
+        current = set(self._pages)
+        return [rel_html for rel_html in self._previous_pages if rel_html not in current]
+
+    def save(self):
+        """Write the header cache and page list for the next incremental build."""
+        if not self.cache_path:
+            return
+        cache_dir = os.path.dirname(self.cache_path)
+        if cache_dir:
+            os.makedirs(cache_dir, exist_ok=True)
+        tmp = f"{self.cache_path}.{os.getpid()}.tmp"
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"headers": self._headers, "pages": self._pages}, f, sort_keys=True)
+        os.replace(tmp, self.cache_path)
@@ -0,0 +1,156 @@
+import gzip
+import io
+import os
+import shutil
+import tarfile
+import time
+import zipfile
+
+try:  # Python 3.14+
+    from compression import zstd
+except ImportError:
+    zstd = None
+
+
+ARCHIVE_SUFFIXES = (".tar", ".tar.gz", ".tgz", ".tar.zst", ".tzst", ".zip")
+
+
+def _source_date_epoch() -> int:
+    """Timestamp stamped on archive members, honoring SOURCE_DATE_EPOCH for reproducible builds."""
+    return int(os.environ.get("SOURCE_DATE_EPOCH", "0"))
+
+
+class DirectorySink:
+    """
+    Output sink that writes files under a directory on disk.
+
+    Paths passed to `write` and `copy` are relative to the sink root and use
+    "/" separators.
+    """
+
+    def __init__(self, root: str):
+        self.root = root
+
+    def _dest(self, rel_path: str) -> str:
+        dest = os.path.join(self.root, *rel_path.split("/"))
+        dest_dir = os.path.dirname(dest)
+        if dest_dir:
+            os.makedirs(dest_dir, exist_ok=True)
+        return dest
+
+    def describe(self, rel_path: str) -> str:
+        return os.path.join(self.root, *rel_path.split("/"))
+
+    def write(self, rel_path: str, data: bytes):
+        with open(self._dest(rel_path), "wb") as f:
+            f.write(data)
+
+    def copy(self, rel_path: str, src_path: str):
+        shutil.copy2(src_path, self._dest(rel_path))
+
+    def close(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class ArchiveSink:
+    """
+    Output sink that streams files straight into a tar or zip archive.
+
+    The format is taken from the archive file name: `.tar`, `.tar.gz`/`.tgz`,
+    `.tar.zst` (Python 3.14+) or `.zip`. Members get a fixed timestamp
+    (SOURCE_DATE_EPOCH, default 0), owner and mode, so building the same
+    inputs in the same order produces a byte-identical archive.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.mtime = _source_date_epoch()
+        self._names = set()
+        self._stream = None
+        self._tar = None
+        self._zip = None
+
+        name = path.lower()
+        if name.endswith((".tar.zst", ".tzst")) and zstd is None:
+            raise ValueError("zstd archives require Python 3.14+ (compression.zstd)")
+        if not name.endswith(ARCHIVE_SUFFIXES):
+            raise ValueError(f"Unsupported archive format: {path}")
+
+        self._fileobj = open(path, "wb")
+        if name.endswith(".zip"):
+            self._zip = zipfile.ZipFile(self._fileobj, "w", compression=zipfile.ZIP_DEFLATED)
+            return
+        if name.endswith((".tar.gz", ".tgz")):
+            # GzipFile directly so the header carries our mtime and no file name
+            self._stream = gzip.GzipFile(filename="", mode="wb", fileobj=self._fileobj, mtime=self.mtime)
+        elif name.endswith((".tar.zst", ".tzst")):
+            self._stream = zstd.ZstdFile(self._fileobj, "wb")
+        self._tar = tarfile.open(fileobj=self._stream or self._fileobj, mode="w|", format=tarfile.PAX_FORMAT)
+
+    def describe(self, rel_path: str) -> str:
+        return f"{self.path}:{rel_path}"
+
+    def _check_name(self, rel_path: str):
+        if rel_path in self._names:
+            raise ValueError(f"Duplicate archive member: {rel_path}")
+        self._names.add(rel_path)
+
+    def _add(self, rel_path: str, size: int, fileobj):
+        self._check_name(rel_path)
+        if self._zip is not None:
+            # ZIP timestamps cannot predate 1980
+            date_time = time.gmtime(max(self.mtime, 315532800))[:6]
+            info = zipfile.ZipInfo(rel_path, date_time=date_time)
+            info.external_attr = 0o644 << 16
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with self._zip.open(info, "w") as member:
+                shutil.copyfileobj(fileobj, member)
+            return
+
+        info = tarfile.TarInfo(rel_path)
+        info.size = size
+        info.mtime = self.mtime
+        info.mode = 0o644
+        info.uid = info.gid = 0
+        info.uname = info.gname = ""
+        self._tar.addfile(info, fileobj)
+
+    def write(self, rel_path: str, data: bytes):
+        self._add(rel_path, len(data), io.BytesIO(data))
+
+    def copy(self, rel_path: str, src_path: str):
+        with open(src_path, "rb") as f:
+            self._add(rel_path, os.fstat(f.fileno()).st_size, f)
+
+    def close(self):
+        if self._fileobj is None:
+            return
+        try:
+            if self._zip is not None:
+                self._zip.close()
+            if self._tar is not None:
+                self._tar.close()
+            if self._stream is not None:
+                self._stream.close()
+        finally:
+            self._fileobj.close()
+            self._fileobj = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_sink(target: str):
+    """Return an ArchiveSink when `target` names an archive, otherwise a DirectorySink."""
+    if target.lower().endswith(ARCHIVE_SUFFIXES):
+        return ArchiveSink(target)
+    return DirectorySink(target)
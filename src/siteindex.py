@@ -0,0 +1,142 @@
+import json
+import os
+import re
+from html import unescape
+from typing import Callable, Dict, Iterable, Optional
+from xml.sax.saxutils import escape
+
+from markdown_extract import BlockType
+
+
+SITEMAP = "sitemap.xml"
+SEARCH_INDEX = "search-index.json"
+
+_BLOCK_TAG = re.compile(r"</?(?:p|li|ul|ol|blockquote|pre|div|h[1-6])\b[^>]*>")
+_TAG = re.compile(r"<[^>]+>")
+_WHITESPACE = re.compile(r"\s+")
+
+# Block types whose text goes into the search extract
+_TEXT_BLOCKS = {BlockType.PARAGRAPH, BlockType.QUOTE, BlockType.UNORDERED_LIST, BlockType.ORDERED_LIST}
+
+
+def _plain_text(html: str) -> str:
+    """Strip tags from rendered block HTML, decode entities and collapse whitespace."""
+    # Block tags separate words; inline tags (<b>, <a>, ...) do not
+    text = _TAG.sub("", _BLOCK_TAG.sub(" ", html))
+    return _WHITESPACE.sub(" ", unescape(text)).strip()
+
+
+def page_url(rel_html: str, basepath: str = '/') -> str:
+    """Public URL of an output page: "blog/tom/index.html" -> "/blog/tom/"."""
+    if not basepath.endswith('/'):
+        basepath = basepath + '/'
+    if rel_html == "index.html":
+        return basepath
+    if rel_html.endswith("/index.html"):
+        return basepath + rel_html[:-len("index.html")]
+    return basepath + rel_html
+
+
+class PageRecord:
+    """
+    Search and sitemap data for one page, filled in while the page is rendered.
+
+    The generator calls `add_block` with each parsed Block and its rendered
+    HTML, so nothing is parsed twice.
+    """
+
+    def __init__(self, url: str, lastmod: Optional[str] = None, text_limit: int = 300):
+        self.url = url
+        self.lastmod = lastmod
+        self.title = ""
+        self.headings = []
+        self.text_limit = text_limit
+        self._text = []
+        self._text_len = 0
+
+    def add_block(self, block, html: str):
+        if block.type == BlockType.HEADING:
+            # The H1 is the page title
+            if block.level > 1:
+                self.headings.append(_plain_text(html))
+        elif block.type in _TEXT_BLOCKS and self._text_len < self.text_limit:
+            text = _plain_text(html)
+            if text:
+                self._text.append(text)
+                self._text_len += len(text) + 1
+
+    @property
+    def text(self) -> str:
+        return " ".join(self._text)[:self.text_limit]
+
+    def to_dict(self) -> dict:
+        entry = {"url": self.url, "title": self.title, "headings": self.headings, "text": self.text}
+        if self.lastmod:
+            entry["lastmod"] = self.lastmod
+        return entry
+
+
+class SiteIndex:
+    """
+    Sitemap and client-side search index for a whole site.
+
+    Entries are keyed by page URL. Load the previous build's index with
+    `SiteIndex.load` and only the pages that are rebuilt are replaced;
+    `prune` drops pages whose sources are gone.
+    """
+
+    def __init__(self, site_url: str = "", entries: Optional[Dict[str, dict]] = None):
+        self.site_url = site_url.rstrip("/")
+        self.entries = entries if entries is not None else {}
+
+    @classmethod
+    def load(cls, dest_dir: str, site_url: str = "") -> "SiteIndex":
+        """Load the search index written by a previous build into `dest_dir`, if any."""
+        path = os.path.join(dest_dir, SEARCH_INDEX)
+        entries = {}
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                entries = {entry["url"]: entry for entry in json.load(f)}
+        return cls(site_url, entries)
+
+    def update(self, record: PageRecord):
+        self.entries[record.url] = record.to_dict()
+
+    def prune(self, urls: Iterable[str]):
+        """Keep only the entries whose URL is in `urls`."""
+        keep = set(urls)
+        self.entries = {url: entry for url, entry in self.entries.items() if url in keep}
+
+    def search_index_bytes(self) -> bytes:
+        ordered = [self.entries[url] for url in sorted(self.entries)]
+        return json.dumps(ordered, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+    def sitemap_bytes(self) -> bytes:
+        lines = ['<?xml version="1.0" encoding="UTF-8"?>',
+                 '<urlset xmlns="http://www.sitemaps.org/schemas/sitemap/0.9">']
+        for url in sorted(self.entries):
+            entry = self.entries[url]
+            lines.append(f"  <url><loc>{escape(self.site_url + url)}</loc>"
+                         + (f"<lastmod>{entry['lastmod']}</lastmod>" if entry.get("lastmod") else "")
+                         + "</url>")
+        lines.append("</urlset>")
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+    def write(self, dest, logger: Callable[[str], None] = print):
+        """
+        Write `sitemap.xml` and `search-index.json` to a directory path or output sink.
+
+        Sitemaps must list absolute URLs, so without a `site_url` only the
+        search index is written and the skipped sitemap is logged.
+        """
+        files = {SEARCH_INDEX: self.search_index_bytes()}
+        if self.site_url:
+            files[SITEMAP] = self.sitemap_bytes()
+        else:
+            logger(f"Skipping {SITEMAP}: it needs absolute URLs, set a site URL (--site-url)")
+        for name, data in files.items():
+            if isinstance(dest, (str, os.PathLike)):
+                with open(os.path.join(dest, name), "wb") as f:
+                    f.write(data)
+            else:
+                dest.write(name, data)
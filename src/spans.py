@@ -0,0 +1,202 @@
+from typing import Callable, Iterable, Iterator, List, Optional, Tuple
+
+from htmlnode import escape_attr, escape_text
+from markdown_extract import Block, BlockType, iter_blocks, link_positions
+from textnode import TextType
+
+# An inline node as positions in its source text instead of a copy of it:
+# `(text_type, start, end)`, plus `url_start, url_end` for links and images.
+Span = Tuple
+
+_PLAIN = TextType.PLAIN
+
+
+def span_text(source: str, span: Span) -> str:
+    return source[span[1]:span[2]]
+
+
+def span_url(source: str, span: Span) -> Optional[str]:
+    return source[span[3]:span[4]] if len(span) > 3 else None
+
+
+def _split_delimiter(source: str, spans: Iterable[Span], delimiter: str, text_type: TextType) -> Iterator[Span]:
+    """`splitter.split_nodes_delimiter` over spans of `source`."""
+    find = source.find
+    size = len(delimiter)
+    for span in spans:
+        if span[0] is not _PLAIN:
+            yield span
+            continue
+        idx, end = span[1], span[2]
+        while idx < end:
+            start = find(delimiter, idx, end)
+            if start == -1:
+                yield (_PLAIN, idx, end)
+                break
+            if start > idx:
+                yield (_PLAIN, idx, start)
+            close = find(delimiter, start + size, end)
+            if close == -1:
+                raise ValueError(f"Invalid markdown: missing closing '{delimiter}' delimiter")
+            if close > start + size:
+                yield (text_type, start + size, close)
+            idx = close + size
+
+
+def _split_links(source: str, spans: Iterable[Span], image: bool) -> Iterator[Span]:
+    """`splitter.split_nodes_image` / `split_nodes_link` over spans of `source`."""
+    if image:
+        options = dict(opener="![", url_newlines=False)
+    else:
+        options = dict(label_required=True, url_required=True)
+    for span in spans:
+        if span[0] is not _PLAIN:
+            yield span
+            continue
+        last = span[1]
+        for start, close, paren in link_positions(source, pos=span[1], endpos=span[2], **options):
+            if start > last:
+                yield (_PLAIN, last, start)
+            if image:
+                # Images keep no alt text, like `split_nodes_image`
+                yield (TextType.IMAGE, close, close, close + 2, paren)
+            else:
+                yield (TextType.LINK, start + 1, close, close + 2, paren)
+            last = paren + 1
+        if last < span[2]:
+            yield (_PLAIN, last, span[2])
+
+
+def text_to_spans(source: str, start: int = 0, end: Optional[int] = None) -> Iterator[Span]:
+    """
+    Split the inline markdown in `source[start:end]` into spans, lazily.
+
+    Yields the same nodes, in the same order, as
+    `splitter.text_to_textnodes(source[start:end])`, without slicing any
+    text out of `source`. Each splitting pass is a generator feeding the
+    next, so no list of nodes is built either. Invalid markup raises the
+    same ValueError, though when a text has several unclosed delimiters
+    the one reported may differ.
+    """
+    spans = iter([(_PLAIN, start, len(source) if end is None else end)])
+    spans = _split_delimiter(source, spans, "`", TextType.CODE)
+    spans = _split_delimiter(source, spans, "**", TextType.BOLD)
+    spans = _split_delimiter(source, spans, "_", TextType.ITALIC)
+    spans = _split_links(source, spans, image=True)
+    return _split_links(source, spans, image=False)
+
+
+# TextType -> (opening, closing) markup around the escaped text
+_WRAPPERS = {
+    TextType.PLAIN: ("", ""),
+    TextType.BOLD: ("<b>", "</b>"),
+    TextType.ITALIC: ("<i>", "</i>"),
+    TextType.CODE: ("<code>", "</code>"),
+}
+
+
+def write_spans(source: str, spans: Iterable[Span], write: Callable[[str], object],
+                links: Optional[List[str]] = None):
+    """
+    Write the HTML of `spans` to `write`, slicing each text out of `source` as it goes.
+
+    Writes the same HTML as `converter.text_to_html`; link and image URLs
+    are appended to `links` if given.
+    """
+    empty = True
+    for span in spans:
+        empty = False
+        wrapper = _WRAPPERS.get(span[0])
+        if wrapper is not None:
+            opening, closing = wrapper
+            if opening:
+                write(opening)
+            write(escape_text(source[span[1]:span[2]]))
+            if closing:
+                write(closing)
+            continue
+        url = source[span[3]:span[4]]
+        if links is not None:
+            links.append(url)
+        if span[0] is TextType.LINK:
+            write(f'<a href="{escape_attr(url)}">')
+            write(escape_text(source[span[1]:span[2]]))
+            write("</a>")
+        else:
+            write(f'<img src="{escape_attr(url)}" alt=""> </img>')
+    if empty:
+        raise ValueError("ParentNode requires children, but child list is empty")
+
+
+def _line_bounds(text: str):
+    """Yield `(start, end)` of each line of `text`."""
+    start = 0
+    while True:
+        end = text.find("\n", start)
+        if end == -1:
+            yield start, len(text)
+            return
+        yield start, end
+        start = end + 1
+
+
+def write_block(block: Block, write: Callable[[str], object], links: Optional[List[str]] = None):
+    """
+    Write the HTML of a Block record to `write`.
+
+    Writes the same HTML as `converter.block_to_html`. Inline content is
+    split into spans of the block text, so no per-node or per-item strings
+    are built and nothing is held beyond the node being written. Only
+    quotes, whose lines lose their `>` markers, are joined into a new
+    string first.
+    """
+    text = block.text
+    block_type = block.type
+    if block_type == BlockType.HEADING:
+        tag = f"h{block.level}"
+        write(f"<{tag}>")
+        write_spans(text, text_to_spans(text, block.level + 1), write, links)
+        write(f"</{tag}>")
+    elif block_type == BlockType.CODE:
+        if len(text) <= 6:
+            raise ValueError("LeafNode has no value")
+        write("<pre><code>")
+        write(escape_text(text[3:-3]))
+        write("</code></pre>")
+    elif block_type == BlockType.QUOTE:
+        quote = "\n".join(block.items())
+        write("<blockquote>")
+        write_spans(quote, text_to_spans(quote), write, links)
+        write("</blockquote>")
+    elif block_type == BlockType.UNORDERED_LIST or block_type == BlockType.ORDERED_LIST:
+        tag = "ul" if block_type == BlockType.UNORDERED_LIST else "ol"
+        write(f"<{tag}>")
+        for (start, end), offset in zip(_line_bounds(text), block.offsets):
+            write("<li>")
+            write_spans(text, text_to_spans(text, start + offset, end), write, links)
+            write("</li>")
+        write(f"</{tag}>")
+    else:  # PARAGRAPH
+        write("<p>")
+        write_spans(text, text_to_spans(text), write, links)
+        write("</p>")
+
+
+def write_markdown(markdown: str, write: Callable[[str], object], links: Optional[List[str]] = None):
+    """
+    Write the HTML of a markdown document to `write` block by block.
+
+    Writes the same HTML as `converter.markdown_to_html`. Blocks are parsed
+    lazily (`markdown_extract.iter_blocks`) and each one is written as soon
+    as it is parsed, so besides the document itself only the current block
+    is held in memory.
+    """
+    blocks = iter_blocks(markdown)
+    block = next(blocks, None)
+    if block is None:
+        raise ValueError("ParentNode requires children, but child list is empty")
+    write("<div>")
+    write_block(block, write, links)
+    for block in blocks:
+        write_block(block, write, links)
+    write("</div>")
@@ -1,4 +1,4 @@
-import re
+from markdown_extract import iter_link_spans
 from textnode import TextNode, TextType
 
 def split_nodes_delimiter(old_nodes, delimiter, text_type):
@@ -51,7 +51,6 @@ def split_nodes_link(old_nodes):
     Example: "Check   and  " → Text, Link(a,1), Text, Link(b,2)
     """
     new_nodes = []
-    link_pattern = re.compile(r"\[([^\]]+)\]\(([^)]+)\)")
 
     for node in old_nodes:
         if node.text_type != TextType.PLAIN:
@@ -61,9 +60,8 @@ def split_nodes_link(old_nodes):
         text = node.text
         last_index = 0
 
-        for match in link_pattern.finditer(text):
-            start, end = match.span()
-            anchor, url = match.groups()
+        # Same matches as \[([^\]]+)\]\(([^)]+)\), in linear time
+        for start, end, anchor, url in iter_link_spans(text, label_required=True, url_required=True):
 
             # Add preceding plain text
             if start > last_index:
@@ -83,8 +81,6 @@ def split_nodes_link(old_nodes):
 def split_nodes_image(old_nodes):
     new_nodes = []
 
-    image_pattern = re.compile(r"!\[([^\]]*?)\]\((.*?)\)")
-
     for old in old_nodes:
         if old.text_type != TextType.PLAIN:
             new_nodes.append(old)
@@ -93,9 +89,8 @@ def split_nodes_image(old_nodes):
         text = old.text
         current_index = 0
 
-        for match in image_pattern.finditer(text):
-            start, end = match.span()
-            alt_text, url = match.groups()
+        # Same matches as !\[([^\]]*?)\]\((.*?)\), in linear time
+        for start, end, alt_text, url in iter_link_spans(text, opener="![", url_newlines=False):
 
             # Text before image
             if start > current_index:
@@ -118,16 +113,24 @@ def text_to_textnodes(text):
     Convert raw text with markdown-like formatting into a list of TextNode objects.
     Handles bold (**), italic (_), code (`), links ([...](...)), and images (![...](...)).
     """
+    if not text:
+        return []
+
     # Start with a single plain text node
     nodes = [TextNode(text, TextType.PLAIN)]
 
-    # Order matters: code first (so we don't split formatting inside code)
-    nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
-    nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
-    nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
+    # Order matters: code first (so we don't split formatting inside code).
+    # A pass whose marker does not occur in the text would change nothing.
+    if "`" in text:
+        nodes = split_nodes_delimiter(nodes, "`", TextType.CODE)
+    if "**" in text:
+        nodes = split_nodes_delimiter(nodes, "**", TextType.BOLD)
+    if "_" in text:
+        nodes = split_nodes_delimiter(nodes, "_", TextType.ITALIC)
 
     # Links and images last
-    nodes = split_nodes_image(nodes)
-    nodes = split_nodes_link(nodes)
+    if "[" in text:
+        nodes = split_nodes_image(nodes)
+        nodes = split_nodes_link(nodes)
 
-    return nodes
\ No newline at end of file
+    return nodes
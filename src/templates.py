@@ -0,0 +1,288 @@
+import functools
+import os
+import re
+from typing import Callable, Dict, Hashable, List, Optional, Tuple
+
+# `{{ Name }}` variables and `{% tag "argument" %}` / `{% tag name %}` statements
+_TOKEN = re.compile(r'\{\{\s*([\w.-]+)\s*\}\}|\{%\s*(\w+)(?:\s+"([^"]*)"|\s+(\w+))?\s*%\}')
+
+# Rewritten copies kept per compiled template (one per basepath/manifest in practice)
+_MAX_TRANSFORMED = 8
+
+
+class CompiledTemplate:
+    """
+    A template flattened into literal text and variable slots.
+
+    Includes and layout inheritance are resolved at compile time, so
+    rendering is a single join of precomputed segments with the context
+    values dropped into their slots.
+    """
+
+    def __init__(self, segments, dependencies=()):
+        parts = []
+        slots = []
+        literal = False
+        for segment in segments:
+            if isinstance(segment, _Slot):
+                slots.append((len(parts), segment.name))
+                parts.append("")
+                literal = False
+            elif literal:
+                # Adjacent text (e.g. from an include) becomes one segment
+                parts[-1] += segment
+            else:
+                parts.append(segment)
+                literal = True
+        self._parts = parts
+        self._slots = slots
+        self._slot_names = dict(slots)
+        self.dependencies = tuple(dependencies)
+        self._transformed = {}
+
+    def render(self, context: Dict[str, str]) -> str:
+        """Render with `context`; variables missing from it render as empty strings."""
+        parts = self._parts[:]
+        for index, name in self._slots:
+            parts[index] = context.get(name, "")
+        return "".join(parts)
+
+    def split(self, context: Dict[str, str], name: str) -> List[str]:
+        """
+        Render everything but the `name` variable and return the text around it.
+
+        The result has one more element than there are `name` slots, so a
+        caller can stream its own content between the pieces.
+        """
+        pieces = []
+        current = []
+        for index, part in enumerate(self._parts):
+            slot = self._slot_names.get(index)
+            if slot == name:
+                pieces.append("".join(current))
+                current = []
+            elif slot is not None:
+                current.append(context.get(slot, ""))
+            else:
+                current.append(part)
+        pieces.append("".join(current))
+        return pieces
+
+    def transformed(self, func: Callable[[str], str], key: Hashable, keepalive=()) -> "CompiledTemplate":
+        """
+        Return a copy with `func` applied to every literal segment, cached by `key`.
+
+        `keepalive` holds objects whose `id` is part of `key` so the ids stay
+        unique while the cached copy exists.
+        """
+        entry = self._transformed.get(key)
+        if entry is None:
+            if len(self._transformed) >= _MAX_TRANSFORMED:
+                self._transformed.clear()
+            copy = CompiledTemplate((), self.dependencies)
+            copy._parts = [part if index in self._slot_names else func(part) for index, part in enumerate(self._parts)]
+            copy._slots = self._slots
+            copy._slot_names = self._slot_names
+            entry = self._transformed[key] = (keepalive, copy)
+        return entry[1]
+
+
+class _Slot:
+    __slots__ = ("name",)
+
+    def __init__(self, name):
+        self.name = name
+
+
+def _line(text: str, pos: int) -> int:
+    return text.count("\n", 0, pos) + 1
+
+
+def _parse(text: str, name: str):
+    """
+    Parse template text into `(extends, nodes)`.
+
+    Nodes are strings, `_Slot`s, `("include", name)` and
+    `("block", name, nodes)` tuples.
+    """
+    extends = None
+    stack = [(None, [])]
+    pos = 0
+    for match in _TOKEN.finditer(text):
+        nodes = stack[-1][1]
+        if match.start() > pos:
+            nodes.append(text[pos:match.start()])
+        pos = match.end()
+
+        if match.group(1):
+            nodes.append(_Slot(match.group(1)))
+            continue
+
+        tag, quoted, word = match.group(2), match.group(3), match.group(4)
+        where = f"{name}, line {_line(text, match.start())}"
+        if tag == "include":
+            if quoted is None:
+                raise ValueError(f'{{% include %}} needs a quoted template name ({where})')
+            nodes.append(("include", quoted))
+        elif tag == "extends":
+            if quoted is None or extends is not None or len(stack) > 1:
+                raise ValueError(f'{{% extends "..." %}} must appear once, outside any block ({where})')
+            extends = quoted
+        elif tag == "block":
+            if word is None:
+                raise ValueError(f"{{% block %}} needs a name ({where})")
+            block = ("block", word, [])
+            nodes.append(block)
+            stack.append((word, block[2]))
+        elif tag == "endblock":
+            if len(stack) == 1:
+                raise ValueError(f"{{% endblock %}} without a matching {{% block %}} ({where})")
+            stack.pop()
+        else:
+            raise ValueError(f"Unknown template tag {tag!r} ({where})")
+
+    if len(stack) > 1:
+        raise ValueError(f"Unclosed {{% block {stack[-1][0]} %}} in {name}")
+    if pos < len(text):
+        stack[0][1].append(text[pos:])
+    return extends, stack[0][1]
+
+
+def _collect_blocks(nodes, blocks):
+    """Record every block defined in `nodes` (outermost first) without overriding `blocks`."""
+    for node in nodes:
+        if isinstance(node, tuple) and node[0] == "block":
+            blocks.setdefault(node[1], node[2])
+            _collect_blocks(node[2], blocks)
+    return blocks
+
+
+class TemplateLoader:
+    """
+    Loads templates from `root` and caches them compiled.
+
+    Templates may use `{{ Name }}` variables, `{% include "partial.html" %}`
+    and layout inheritance: a template starting with
+    `{% extends "base.html" %}` overrides the parent's
+    `{% block name %}...{% endblock %}` sections. Names are paths relative
+    to `root`.
+
+    A compiled template is reused until the modification time of its file,
+    or of any file it includes or extends, changes.
+    """
+
+    def __init__(self, root: str = "."):
+        self.root = root
+        self._cache: Dict[str, Tuple[CompiledTemplate, Tuple[Tuple[str, int], ...]]] = {}
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.root, *name.split("/"))
+
+    def _read(self, name: str, deps: Dict[str, int]) -> str:
+        path = self._path(name)
+        # Stat before reading so an edit racing the read forces a recompile
+        deps[path] = os.stat(path).st_mtime_ns
+        with open(path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    def _flatten(self, nodes, blocks, out, deps, seen):
+        for node in nodes:
+            if isinstance(node, tuple):
+                if node[0] == "include":
+                    self._resolve(node[1], {}, out, deps, seen)
+                else:
+                    self._flatten(blocks.get(node[1], node[2]), blocks, out, deps, seen)
+            else:
+                out.append(node)
+
+    def _resolve(self, name, blocks, out, deps, seen):
+        if name in seen:
+            raise ValueError(f"Template {name} includes or extends itself: {' -> '.join(seen + (name,))}")
+        seen = seen + (name,)
+        extends, nodes = _parse(self._read(name, deps), name)
+        if extends is not None:
+            # The most derived template's blocks win
+            merged = _collect_blocks(nodes, {})
+            merged.update(blocks)
+            self._resolve(extends, merged, out, deps, seen)
+        else:
+            self._flatten(nodes, blocks, out, deps, seen)
+
+    def _fresh(self, deps) -> bool:
+        try:
+            return all(os.stat(path).st_mtime_ns == mtime for path, mtime in deps)
+        except FileNotFoundError:
+            return False
+
+    def get(self, name: str) -> CompiledTemplate:
+        """Return the compiled template `name`, recompiling it if a source file changed."""
+        cached = self._cache.get(name)
+        if cached is not None and self._fresh(cached[1]):
+            return cached[0]
+        segments = []
+        deps = {}
+        self._resolve(name, {}, segments, deps, ())
+        compiled = CompiledTemplate(segments, deps)
+        self._cache[name] = (compiled, tuple(deps.items()))
+        return compiled
+
+
+@functools.lru_cache(maxsize=32)
+def compile_template(text: str) -> CompiledTemplate:
+    """
+    Compile template text that does not come from a file.
+
+    Only variables and blocks are available; `include` and `extends` need a
+    `TemplateLoader` to resolve names.
+    """
+    extends, nodes = _parse(text, "<string>")
+    if extends is not None:
+        raise ValueError("{% extends %} needs a template loaded from a file")
+    segments = []
+
+    def flatten(nodes):
+        for node in nodes:
+            if isinstance(node, tuple):
+                if node[0] == "include":
+                    raise ValueError("{% include %} needs a template loaded from a file")
+                flatten(node[2])
+            else:
+                segments.append(node)
+
+    flatten(nodes)
+    return CompiledTemplate(segments)
+
+
+_LOADERS: Dict[str, TemplateLoader] = {}
+
+
+def load_template(path: str) -> CompiledTemplate:
+    """
+    Return the compiled template at `path`, cached across calls.
+
+    Includes and parents are resolved relative to the template's directory.
+    """
+    root, name = os.path.split(os.path.abspath(path))
+    loader = _LOADERS.get(root)
+    if loader is None:
+        loader = _LOADERS[root] = TemplateLoader(root)
+    return loader.get(name)
+
+
+def select_template(rel_html: str, default: str, section_templates: Optional[Dict[str, str]] = None) -> str:
+    """
+    Pick the template path for the output page `rel_html`.
+
+    `section_templates` maps content sections ("blog", "blog/reviews") to
+    template paths; the longest section containing the page wins, otherwise
+    `default` is used.
+    """
+    if section_templates:
+        best = None
+        for section in section_templates:
+            prefix = section.strip("/") + "/"
+            if rel_html.startswith(prefix) and (best is None or len(section) > len(best)):
+                best = section
+        if best is not None:
+            return section_templates[best]
+    return default
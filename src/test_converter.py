@@ -1,7 +1,8 @@
 import unittest
 from textnode import TextNode, TextType
 from htmlnode import LeafNode, ParentNode
-from converter import text_node_to_html_node, markdown_to_html_node  
+from converter import text_node_to_html_node, text_node_to_html, markdown_to_html_node, markdown_to_html, block_to_html_node, markdown_to_html_many
+from markdown_extract import BlockType
 
 class TestTextNodeToHTML(unittest.TestCase):
 
@@ -104,6 +105,11 @@ class TestMarkdownToHTMLNode(unittest.TestCase):
         self.assertEqual(html.children[0].tag, "pre")
         self.assertEqual(html.children[0].children[0].tag, "code")
 
+    def test_code_block_with_blank_lines(self):
+        markdown = "# T\n\n```\nfirst\n\nsecond\n```"
+        self.assertEqual(markdown_to_html_node(markdown).to_html(),
+                         "<div><h1>T</h1><pre><code>\nfirst\n\nsecond\n</code></pre></div>")
+
     def test_code_block_no_markdown_parsing(self):
         markdown = "```\nprint(**bold**)\nprint(_italic_)\n```"
         html = markdown_to_html_node(markdown)
@@ -252,5 +258,128 @@ Final paragraph."""
         self.assertIn("</h1>", html_string)
         self.assertIn("</div>", html_string)
 
+    def test_list_items_html(self):
+        markdown = "1. **a**\n2. b\n\n- x\n- _y_\n\n> q1\n>q2"
+        html = markdown_to_html_node(markdown).to_html()
+        self.assertEqual(
+            html,
+            "<div><ol><li><b>a</b></li><li>b</li></ol>"
+            "<ul><li>x</li><li><i>y</i></li></ul>"
+            "<blockquote>q1\nq2</blockquote></div>"
+        )
+
+    def test_block_to_html_node_raw_text(self):
+        node = block_to_html_node("## Sub", BlockType.HEADING)
+        self.assertEqual(node.to_html(), "<h2>Sub</h2>")
+
+    def test_block_to_html_node_type_mismatch(self):
+        with self.assertRaises(ValueError):
+            block_to_html_node("plain", BlockType.HEADING)
+
+
+class TestFastPath(unittest.TestCase):
+
+    def test_inline_code_paragraph_before_fence(self):
+        markdown = "```x``` is inline\n\nSome para\n\n```\nreal code\n```"
+        self.assertEqual(markdown_to_html(markdown),
+                         "<div><p><code>x</code> is inline</p><p>Some para</p>"
+                         "<pre><code>\nreal code\n</code></pre></div>")
+
+    def test_text_node_matches_leaf(self):
+        nodes = [
+            TextNode("hello", TextType.PLAIN),
+            TextNode("bold", TextType.BOLD),
+            TextNode("italic", TextType.ITALIC),
+            TextNode("x = 1", TextType.CODE),
+            TextNode("Click", TextType.LINK, url="https://example.com"),
+            TextNode("", TextType.IMAGE, url="/images/x.png"),
+        ]
+        for node in nodes:
+            self.assertEqual(text_node_to_html(node), text_node_to_html_node(node).to_html())
+
+    def test_escaping_matches_leaf(self):
+        nodes = [
+            TextNode("a < b & c", TextType.PLAIN),
+            TextNode("<b>", TextType.CODE),
+            TextNode("Q&A", TextType.LINK, url='/q?a=1&b="2"'),
+            TextNode('"alt" <x>', TextType.IMAGE, url="/a&b.png"),
+        ]
+        for node in nodes:
+            self.assertEqual(text_node_to_html(node), text_node_to_html_node(node).to_html())
+
+    def test_code_block_is_escaped(self):
+        markdown = "```\nif a < b && c > d:\n    print(\"<p>\")\n```"
+        expected = '<div><pre><code>\nif a &lt; b &amp;&amp; c &gt; d:\n    print("&lt;p&gt;")\n</code></pre></div>'
+        self.assertEqual(markdown_to_html(markdown), expected)
+        self.assertEqual(markdown_to_html_node(markdown).to_html(), expected)
+
+    def test_text_node_invalid_type(self):
+        with self.assertRaises(ValueError):
+            text_node_to_html(TextNode("x", "BAD_TYPE"))
+
+    def test_link_requires_url(self):
+        with self.assertRaises(ValueError):
+            text_node_to_html(TextNode("Click", TextType.LINK))
+
+    def test_markdown_matches_tree(self):
+        markdown = """# Title with **bold**
+
+Para with [link](/a) and ![img](/b.png) and `code`.
+
+- one
+- _two_
+
+1. first
+2. second
+
+> quoted
+>line
+
+```
+raw **text**
+```"""
+        self.assertEqual(markdown_to_html(markdown), markdown_to_html_node(markdown).to_html())
+        self.assertEqual(markdown_to_html(markdown, fast=False), markdown_to_html(markdown))
+
+    def test_empty_markdown_raises_like_tree(self):
+        with self.assertRaises(ValueError):
+            markdown_to_html("")
+
+
+class TestBatchConversion(unittest.TestCase):
+
+    DOCUMENTS = [
+        "Great post!",
+        "I agree with **this** and _that_, see [the docs](/docs).",
+        "a < b & c",
+        "# Title\n\n- one\n- `two`\n\n> quoted",
+        "Great post!",
+        "```\nraw **text**\n```",
+        "Thanks!\n\nThanks!",
+    ]
+
+    def test_matches_single_conversion(self):
+        expected = [markdown_to_html(document) for document in self.DOCUMENTS]
+        self.assertEqual(markdown_to_html_many(self.DOCUMENTS), expected)
+
+    def test_accepts_iterator(self):
+        expected = [markdown_to_html(document) for document in self.DOCUMENTS]
+        self.assertEqual(markdown_to_html_many(iter(self.DOCUMENTS)), expected)
+
+    def test_empty_batch(self):
+        self.assertEqual(markdown_to_html_many([]), [])
+
+    def test_failure_raises_without_errors(self):
+        with self.assertRaises(ValueError):
+            markdown_to_html_many(["fine", "**unclosed", "fine"])
+
+    def test_errors_are_collected(self):
+        errors = []
+        results = markdown_to_html_many(["fine", "**unclosed", "", "fine"], errors=errors)
+        self.assertEqual(results, ["<div><p>fine</p></div>", None, None, "<div><p>fine</p></div>"])
+        self.assertEqual([index for index, _ in errors], [1, 2])
+        self.assertTrue(all(isinstance(error, ValueError) for _, error in errors))
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
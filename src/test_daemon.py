@@ -0,0 +1,190 @@
+import json
+import os
+import socket
+import tempfile
+import threading
+import unittest
+
+from daemon import BuildDaemon, remove_stale_socket, request, serve
+
+
+TEMPLATE = "<title>{{ Title }}</title>{{ Content }}"
+
+
+class TestBuildDaemon(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+        self.content = os.path.join(self.tmp, "content")
+        self.static = os.path.join(self.tmp, "static")
+        self.dest = os.path.join(self.tmp, "docs")
+        self.template = os.path.join(self.tmp, "template.html")
+        self.write(self.template, TEMPLATE)
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        self.add("index.md", "# Home")
+        self.add("blog/post.md", "# Post\n\nBody")
+        self.daemon = BuildDaemon(self.content, self.template, self.dest, static_dir=self.static,
+                                  logger=lambda msg: None)
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def write(self, path, text, mtime=None):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        if mtime is not None:
+            os.utime(path, ns=(mtime, mtime))
+
+    def add(self, rel_path, markdown, mtime=None):
+        self.write(os.path.join(self.content, *rel_path.split("/")), markdown, mtime)
+
+    def read(self, rel_path):
+        with open(os.path.join(self.dest, *rel_path.split("/"))) as f:
+            return f.read()
+
+    def test_full_build(self):
+        result = self.daemon.full()
+        self.assertTrue(result["ok"])
+        self.assertEqual(sorted(result["built"]), ["blog/post.html", "index.html"])
+        self.assertIn("<h1>Post</h1>", self.read("blog/post.html"))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "index.css")))
+        self.assertEqual(set(result["timings"]), {"scan_s", "build_s", "total_s", "copy_s"})
+
+    def test_incremental_rebuilds_changed_pages_only(self):
+        self.daemon.full()
+        result = self.daemon.incremental()
+        self.assertEqual((result["built"], result["unchanged"]), ([], 2))
+
+        self.add("blog/post.md", "# Post\n\nEdited body")
+        self.add("blog/new.md", "# New")
+        result = self.daemon.incremental()
+        self.assertEqual(sorted(result["built"]), ["blog/new.html", "blog/post.html"])
+        self.assertEqual(result["unchanged"], 1)
+        self.assertIn("Edited body", self.read("blog/post.html"))
+
+    def test_incremental_removes_deleted_pages(self):
+        self.daemon.full()
+        os.remove(os.path.join(self.content, "blog", "post.md"))
+        result = self.daemon.incremental()
+        self.assertEqual(result["removed"], ["blog/post.html"])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog")))
+
+    def test_template_edit_rebuilds_every_page(self):
+        self.daemon.full()
+        mtime = os.stat(self.template).st_mtime_ns + 10 ** 9
+        self.write(self.template, "<h6>{{ Title }}</h6>{{ Content }}", mtime)
+        result = self.daemon.incremental()
+        self.assertEqual(len(result["built"]), 2)
+        self.assertTrue(self.read("index.html").startswith("<h6>Home</h6>"))
+
+    def test_failing_page_is_reported_and_retried(self):
+        self.daemon.full()
+        self.add("blog/post.md", "no title")
+        result = self.daemon.incremental()
+        self.assertFalse(result["ok"])
+        self.assertEqual(len(result["errors"]), 1)
+        self.assertIn("post.md", result["errors"][0])
+
+        self.add("blog/post.md", "# Fixed")
+        result = self.daemon.incremental()
+        self.assertTrue(result["ok"])
+        self.assertEqual(result["built"], ["blog/post.html"])
+
+    def test_single_page(self):
+        self.daemon.full()
+        self.add("blog/post.md", "# Post\n\nChanged")
+        result = self.daemon.handle({"command": "page", "path": "blog/post.md"})
+        self.assertEqual(result["built"], ["blog/post.html"])
+        self.assertIn("Changed", self.read("blog/post.html"))
+        # Already up to date for the next incremental build
+        self.assertEqual(self.daemon.incremental()["built"], [])
+
+    def test_incremental_copies_changed_static_files(self):
+        self.daemon.full()
+        self.assertEqual(self.daemon.incremental()["copied"], [])
+
+        self.write(os.path.join(self.static, "index.css"), "body { color: red }")
+        self.write(os.path.join(self.static, "images", "logo.svg"), "<svg/>")
+        result = self.daemon.incremental()
+        self.assertEqual(result["copied"], ["images/logo.svg", "index.css"])
+        # Without fingerprints the pages do not change
+        self.assertEqual(result["built"], [])
+        self.assertEqual(self.read("index.css"), "body { color: red }")
+        self.assertEqual(self.read("images/logo.svg"), "<svg/>")
+
+        os.remove(os.path.join(self.static, "images", "logo.svg"))
+        self.assertEqual(self.daemon.incremental()["copied"], ["images/logo.svg"])
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "images")))
+
+    def test_fingerprinted_asset_change_rebuilds_every_page(self):
+        self.write(self.template, '<link href="/index.css">{{ Content }}')
+        daemon = BuildDaemon(self.content, self.template, self.dest, static_dir=self.static,
+                             fingerprint=True, logger=lambda msg: None)
+        daemon.full()
+        old_name = daemon.asset_manifest["index.css"]
+        self.assertIn(old_name, self.read("index.html"))
+
+        self.write(os.path.join(self.static, "index.css"), "body { color: red }")
+        result = daemon.incremental()
+        new_name = daemon.asset_manifest["index.css"]
+        self.assertNotEqual(new_name, old_name)
+        self.assertEqual(sorted(result["built"]), ["blog/post.html", "index.html"])
+        self.assertIn(new_name, self.read("blog/post.html"))
+        self.assertFalse(os.path.exists(os.path.join(self.dest, old_name)))
+        self.assertEqual(self.read(new_name), "body { color: red }")
+        self.assertEqual(json.loads(self.read("asset-manifest.json")), {"index.css": new_name})
+
+        # A single page request also picks up the new names everywhere
+        self.write(os.path.join(self.static, "index.css"), "body {}")
+        result = daemon.page("index.md")
+        self.assertEqual(result["copied"], ["index.css"])
+        self.assertEqual(len(result["built"]), 2)
+        self.assertIn(old_name, self.read("blog/post.html"))
+
+    def test_bad_requests(self):
+        self.assertFalse(self.daemon.handle({"command": "nope"})["ok"])
+        self.assertFalse(self.daemon.handle({"command": "page"})["ok"])
+        self.assertFalse(self.daemon.handle({"command": "page", "path": "../template.html"})["ok"])
+        self.assertFalse(self.daemon.handle(["full"])["ok"])
+
+    def test_socket_api(self):
+        socket_path = os.path.join(self.tmp, "build.sock")
+        server = threading.Thread(target=serve, args=(self.daemon, socket_path))
+        server.start()
+        try:
+            for _ in range(500):
+                if os.path.exists(socket_path):
+                    break
+                threading.Event().wait(0.01)
+            self.assertTrue(request(socket_path, "full", timeout=10)["ok"])
+            self.assertEqual(request(socket_path, "incremental", timeout=10)["unchanged"], 2)
+            self.assertEqual(request(socket_path, "ping", timeout=10), {"ok": True, "pages": 2})
+        finally:
+            request(socket_path, "shutdown", timeout=10)
+            server.join(10)
+        self.assertFalse(server.is_alive())
+        self.assertFalse(os.path.exists(socket_path))
+
+
+    def test_socket_path_checks(self):
+        # Not a socket: left alone
+        with self.assertRaisesRegex(ValueError, "not a socket"):
+            serve(self.daemon, self.template)
+        self.assertTrue(os.path.exists(self.template))
+
+        socket_path = os.path.join(self.tmp, "build.sock")
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as live:
+            live.bind(socket_path)
+            live.listen()
+            with self.assertRaisesRegex(ValueError, "already listening"):
+                remove_stale_socket(socket_path)
+            self.assertTrue(os.path.exists(socket_path))
+        # Closed without removing its file, like a daemon that was killed
+        remove_stale_socket(socket_path)
+        self.assertFalse(os.path.exists(socket_path))
+
+
+if __name__ == "__main__":
+    unittest.main()
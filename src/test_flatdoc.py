@@ -0,0 +1,102 @@
+import random
+import tracemalloc
+import unittest
+
+from converter import markdown_to_html_node
+from flatdoc import LEAF, PARENT, FlatDocument, flatten_markdown
+from htmlnode import LeafNode, ParentNode
+
+
+MARKDOWN = """# Title with **bold**
+
+Para with [link](/a?x=1&y=2) and ![img](/b.png) and `code`.
+
+- one
+- _two_
+
+1. first
+2. second
+
+> quoted
+>line
+
+```
+raw **text** <b>
+```"""
+
+
+class TestFlatDocument(unittest.TestCase):
+
+    def test_matches_node_tree(self):
+        expected = markdown_to_html_node(MARKDOWN).to_html()
+        self.assertEqual(flatten_markdown(MARKDOWN).to_html(), expected)
+        self.assertEqual(FlatDocument.from_node(markdown_to_html_node(MARKDOWN)).to_html(), expected)
+
+    def test_columns(self):
+        doc = FlatDocument.from_node(ParentNode("p", [LeafNode(None, "a < b"), LeafNode("a", "x", {"href": "/y"})]))
+        self.assertEqual(list(doc.kinds), [PARENT, LEAF, LEAF])
+        self.assertEqual(list(doc.parents), [-1, 0, 0])
+        self.assertEqual([doc.tag(i) for i in range(len(doc))], ["p", None, "a"])
+        self.assertEqual(doc.value(1), "a < b")
+        self.assertEqual(list(doc.iter_text()), ["a < b", "x"])
+        self.assertEqual(doc.attributes("href"), [(2, "/y")])
+        self.assertEqual(doc.to_html(), '<p>a &lt; b<a href="/y">x</a></p>')
+
+    def test_nested_parents_close_in_order(self):
+        tree = ParentNode("div", [
+            ParentNode("ul", [ParentNode("li", [LeafNode("b", "1")]), ParentNode("li", [LeafNode(None, "2")])]),
+            LeafNode("i", "3"),
+        ])
+        self.assertEqual(FlatDocument.from_node(tree).to_html(), tree.to_html())
+
+    def test_encoding_leaves_tree_untouched(self):
+        tree = markdown_to_html_node(MARKDOWN)
+        FlatDocument.from_node(tree)
+        repr(tree)
+        stack = [tree]
+        while stack:
+            node = stack.pop()
+            self.assertTrue(node._props is None or node._props, repr(node))
+            stack.extend(node.children or [])
+
+    def test_invalid_documents_raise_like_tree(self):
+        with self.assertRaises(ValueError):
+            FlatDocument.from_node(ParentNode("p", []))
+        with self.assertRaises(ValueError):
+            FlatDocument.from_node(LeafNode("b", ""))
+        with self.assertRaises(ValueError):
+            flatten_markdown("")
+        with self.assertRaises(ValueError):
+            flatten_markdown("a **b")
+
+    def test_random_documents_match_tree(self):
+        blocks = ["# Head **b**", "## x_y_", "```\ncode <\n\nmore\n```", "> q _a\n> b_ c",
+                  "- [l](u)\n- ![i](s)", "1. one\n2. `t`", "para & <tag> **x**", "- ", "#nohash"]
+        rng = random.Random(3)
+        for _ in range(1000):
+            markdown = "\n\n".join(rng.choice(blocks) for _ in range(rng.randint(1, 5)))
+            try:
+                expected = markdown_to_html_node(markdown).to_html()
+            except ValueError:
+                with self.assertRaises(ValueError):
+                    flatten_markdown(markdown).to_html()
+                continue
+            self.assertEqual(flatten_markdown(markdown).to_html(), expected, markdown)
+
+    def test_smaller_than_node_tree(self):
+        pages = [MARKDOWN.replace("Title", f"Title {i}") for i in range(50)]
+        sizes = []
+        for build in (markdown_to_html_node, flatten_markdown):
+            tracemalloc.start()
+            try:
+                held = [build(page) for page in pages]
+                sizes.append(tracemalloc.get_traced_memory()[0])
+            finally:
+                tracemalloc.stop()
+            del held
+        # The node tree no longer allocates props for attribute-less nodes
+        self.assertLess(sizes[1] * 3, sizes[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
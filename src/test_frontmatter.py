@@ -0,0 +1,87 @@
+import os
+import tempfile
+import unittest
+
+from frontmatter import split_front_matter, read_front_matter, scan_header
+from generator import generate_page, render_page
+
+
+TEMPLATE = "<title>{{ Title }}</title>{{ Content }}"
+
+PAGE = "---\ntitle: \"Tom's page\"\nDate: 2024-05-01\n# a comment\n\ntags: a, b\n---\n# Tom\n\nBody text."
+
+
+class TestFrontMatter(unittest.TestCase):
+
+    def write(self, tmp, text, name="index.md"):
+        path = os.path.join(tmp, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def test_split(self):
+        meta, body = split_front_matter(PAGE)
+        self.assertEqual(meta, {"title": "Tom's page", "date": "2024-05-01", "tags": "a, b"})
+        self.assertEqual(body, "# Tom\n\nBody text.")
+
+    def test_no_front_matter(self):
+        self.assertEqual(split_front_matter("# Tom\n\n---\n"), ({}, "# Tom\n\n---\n"))
+        self.assertEqual(split_front_matter("---\n---"), ({}, ""))
+
+    def test_invalid(self):
+        with self.assertRaisesRegex(ValueError, "line 2"):
+            split_front_matter("---\nnot a pair\n---\n# T")
+
+    def test_unclosed_is_not_front_matter(self):
+        for text in ("---\ntitle: T\n# T", "---\nJust a paragraph\nafter a rule", "---"):
+            self.assertEqual(split_front_matter(text), ({}, text))
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self.write(tmp, "---\ndate: x\n\n# Title\n\n" + "word\n" * 100)
+            self.assertEqual(scan_header(path, limit=16), {"title": "Title"})
+            self.assertEqual(read_front_matter(path, limit=16), ({}, 0))
+
+    def test_scan_header_reads_only_the_head(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            path = self.write(tmp, "---\ndate: 2024-05-01\n---\n# Tom\n\n" + "é word\n" * 5000)
+            self.assertEqual(scan_header(path, limit=64), {"date": "2024-05-01", "title": "Tom"})
+            meta, offset = read_front_matter(path, limit=64)
+            with open(path, "rb") as f:
+                self.assertEqual(f.read()[offset:offset + 5], b"# Tom")
+
+    def test_scan_header_long_front_matter(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            lines = "".join(f"key{i}: é{i}\n" for i in range(100))
+            path = self.write(tmp, f"---\n{lines}title: Last\n---\nbody")
+            meta = scan_header(path, limit=32)
+            self.assertEqual(len(meta), 101)
+            self.assertEqual(meta["key99"], "é99")
+            self.assertEqual(meta["title"], "Last")
+
+    def test_scan_header_without_front_matter(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertEqual(scan_header(self.write(tmp, "# Plain\n\ntext")), {"title": "Plain"})
+            self.assertEqual(read_front_matter(self.write(tmp, "", "empty.md")), ({}, 0))
+
+    def test_render_page(self):
+        meta = {}
+        page = render_page(PAGE, TEMPLATE, meta=meta)
+        self.assertEqual(page, "<title>Tom's page</title><div><h1>Tom</h1><p>Body text.</p></div>")
+        self.assertEqual(meta["date"], "2024-05-01")
+
+    def test_streamed_matches_in_memory(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            src = self.write(tmp, PAGE)
+            template = self.write(tmp, TEMPLATE, "template.html")
+            outputs = []
+            for stream in (False, True):
+                dest = os.path.join(tmp, f"out{stream}.html")
+                meta = {}
+                generate_page(src, template, dest, logger=lambda msg: None, stream=stream, meta=meta)
+                self.assertEqual(meta["tags"], "a, b")
+                with open(dest, encoding="utf-8") as f:
+                    outputs.append(f.read())
+            self.assertEqual(outputs[0], outputs[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
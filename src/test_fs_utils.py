@@ -0,0 +1,57 @@
+import json
+import os
+import tempfile
+import unittest
+
+from fs_utils import copy_dir_recursive, fingerprint_name, ASSET_MANIFEST
+
+
+class TestCopyDirRecursive(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.src = os.path.join(self.tmp.name, "static")
+        self.dest = os.path.join(self.tmp.name, "docs")
+        os.makedirs(os.path.join(self.src, "images"))
+        for rel, data in [("index.css", b"body{}"), ("images/tom.png", b"\x89PNG")]:
+            with open(os.path.join(self.src, *rel.split("/")), "wb") as f:
+                f.write(data)
+
+    def test_plain_copy_clears_destination(self):
+        os.makedirs(self.dest)
+        stale = os.path.join(self.dest, "stale.html")
+        open(stale, "w").close()
+        self.assertIsNone(copy_dir_recursive(self.src, self.dest, logger=lambda msg: None))
+        self.assertFalse(os.path.exists(stale))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "images", "tom.png")))
+
+    def test_fingerprint(self):
+        manifest = copy_dir_recursive(self.src, self.dest, logger=lambda msg: None, fingerprint=True)
+        self.assertEqual(sorted(manifest), ["images/tom.png", "index.css"])
+        self.assertRegex(manifest["index.css"], r"^index\.[0-9a-f]{10}\.css$")
+        self.assertRegex(manifest["images/tom.png"], r"^images/tom\.[0-9a-f]{10}\.png$")
+        for hashed in manifest.values():
+            self.assertTrue(os.path.exists(os.path.join(self.dest, *hashed.split("/"))))
+        with open(os.path.join(self.dest, ASSET_MANIFEST), encoding="utf-8") as f:
+            self.assertEqual(json.load(f), manifest)
+
+    def test_fingerprint_changes_with_content(self):
+        first = copy_dir_recursive(self.src, self.dest, logger=lambda msg: None, fingerprint=True)
+        with open(os.path.join(self.src, "index.css"), "wb") as f:
+            f.write(b"body{color:red}")
+        second = copy_dir_recursive(self.src, self.dest, logger=lambda msg: None, fingerprint=True)
+        self.assertNotEqual(first["index.css"], second["index.css"])
+        self.assertEqual(first["images/tom.png"], second["images/tom.png"])
+
+    def test_fingerprint_name(self):
+        self.assertEqual(fingerprint_name("a/b.min.js", "abc"), "a/b.min.abc.js")
+        self.assertEqual(fingerprint_name(".nojekyll", "abc"), ".nojekyll.abc")
+
+    def test_missing_source(self):
+        with self.assertRaises(FileNotFoundError):
+            copy_dir_recursive(os.path.join(self.tmp.name, "nope"), self.dest)
+
+
+if __name__ == "__main__":
+    unittest.main()
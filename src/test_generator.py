@@ -0,0 +1,246 @@
+import os
+import tempfile
+import unittest
+
+from generator import generate_page, generate_pages_recursive, build_site, render_page, PageError
+from schedule import BuildTimings
+from sinks import DirectorySink
+from minify import minify_html
+
+
+TEMPLATE = '<html><head><title>{{ Title }}</title><link href="/index.css"></head><body>{{ Content }}</body></html>'
+
+MARKDOWN = """# Page Title
+
+Intro with [a link](/blog/post) and ![pic](/images/x.png).
+
+- one
+- **two**
+
+```
+code here
+```
+"""
+
+
+class TestGeneratePage(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.template_path = self._write("template.html", TEMPLATE)
+        self.md_path = self._write("index.md", MARKDOWN)
+
+    def _write(self, name, text):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def _generate(self, **kwargs):
+        dest = os.path.join(self.tmp.name, "out", "index.html")
+        generate_page(self.md_path, self.template_path, dest, logger=lambda msg: None, **kwargs)
+        with open(dest, encoding="utf-8") as f:
+            return f.read()
+
+    def test_basepath_rewritten(self):
+        page = self._generate(basepath="/site")
+        self.assertIn('<title>Page Title</title>', page)
+        self.assertIn('href="/site/index.css"', page)
+        self.assertIn('href="/site/blog/post"', page)
+        self.assertIn('src="/site/images/x.png"', page)
+
+    def test_asset_manifest_rewrites_references(self):
+        manifest = {"index.css": "index.abc123.css", "images/x.png": "images/x.def456.png"}
+        page = self._generate(basepath="/site/", asset_manifest=manifest)
+        self.assertIn('href="/site/index.abc123.css"', page)
+        self.assertIn('src="/site/images/x.def456.png"', page)
+        self.assertIn('href="/site/blog/post"', page)
+        self.assertEqual(self._generate(basepath="/site/", asset_manifest=manifest, stream=True), page)
+
+    def test_asset_manifest_matches_encoded_references(self):
+        self._write("index.md", "# T\n\n![a](/images/a%20b.png) ![c](/images/c&d.png) ![e](/images/e f.png)")
+        manifest = {"images/a b.png": "images/a b.abc.png", "images/c&d.png": "images/c&d.def.png",
+                    "images/e f.png": "images/e f.123.png"}
+        page = self._generate(asset_manifest=manifest)
+        self.assertIn('src="/images/a%20b.abc.png"', page)
+        self.assertIn('src="/images/c&amp;d.def.png"', page)
+        self.assertIn('src="/images/e%20f.123.png"', page)
+        self.assertEqual(self._generate(asset_manifest=manifest, stream=True), page)
+
+    def test_streamed_matches_in_memory(self):
+        self.assertEqual(
+            self._generate(basepath="/site/", stream=True),
+            self._generate(basepath="/site/", stream=False),
+        )
+
+    def test_streamed_matches_in_memory_with_crlf(self):
+        with open(self.md_path, "w", encoding="utf-8", newline="\r\n") as f:
+            f.write("---\ntitle: CRLF\n---\n" + MARKDOWN + "\n\n# Title\n\nHello **world**\n\n\n- a\n- b")
+        page = self._generate(stream=False)
+        self.assertIn("<p>Hello <b>world</b></p><ul><li>a</li><li>b</li></ul>", page)
+        self.assertNotIn("\r", page)
+        self.assertEqual(self._generate(stream=True), page)
+
+    def test_minified_streamed_matches_in_memory(self):
+        page = self._generate(stream=False, minify=True)
+        self.assertEqual(self._generate(stream=True, minify=True), page)
+        self.assertEqual(page, minify_html(self._generate(stream=False)))
+        self.assertIn("<pre><code>\ncode here\n</code></pre>", page)
+
+    def test_title_and_front_matter_escaped(self):
+        self.md_path = self._write("escaped.md", '---\nauthor: "Tom & <Jerry>"\n---\n# Q&A <b>\n\ntext')
+        self.template_path = self._write("meta.html", '<meta name="author" content="{{ author }}"><title>{{ Title }}</title>{{ Content }}')
+        for stream in (False, True):
+            page = self._generate(stream=stream)
+            self.assertIn('content="Tom &amp; &lt;Jerry&gt;"', page)
+            self.assertIn("<title>Q&amp;A &lt;b&gt;</title>", page)
+            self.assertIn("<h1>Q&amp;A &lt;b&gt;</h1>", page)
+
+    def test_streamed_missing_title_raises(self):
+        self.md_path = self._write("untitled.md", "no title\n\nhere")
+        with self.assertRaises(ValueError):
+            self._generate(stream=True)
+
+
+class TestBuildSite(unittest.TestCase):
+
+    def test_in_memory_sources(self):
+        pages = dict(build_site({"index.md": MARKDOWN, "blog/post/index.md": b"# Post"}, TEMPLATE, "/site"))
+        self.assertEqual(sorted(pages), ["blog/post/index.html", "index.html"])
+        self.assertIn(b"<title>Post</title>", pages["blog/post/index.html"])
+        self.assertIn(b'href="/site/blog/post"', pages["index.html"])
+
+    def test_pairs_source(self):
+        pages = list(build_site([("a.md", "# A"), ("b.md", "# B")], TEMPLATE))
+        self.assertEqual([rel for rel, _ in pages], ["a.html", "b.html"])
+
+    def test_directory_source_matches_generate_page(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content", "blog")
+            os.makedirs(content)
+            src = os.path.join(content, "index.md")
+            with open(src, "w", encoding="utf-8") as f:
+                f.write(MARKDOWN)
+            template_path = os.path.join(tmp, "template.html")
+            with open(template_path, "w", encoding="utf-8") as f:
+                f.write(TEMPLATE)
+            dest = os.path.join(tmp, "out.html")
+            generate_page(src, template_path, dest, basepath="/x/", logger=lambda msg: None)
+
+            pages = dict(build_site(os.path.join(tmp, "content"), TEMPLATE, "/x/"))
+            with open(dest, "rb") as f:
+                self.assertEqual(pages["blog/index.html"], f.read())
+
+
+class TestFaultIsolation(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template_path = os.path.join(self.tmp.name, "template.html")
+        with open(self.template_path, "w", encoding="utf-8") as f:
+            f.write(TEMPLATE)
+        pages = {
+            "a/index.md": "# A",
+            "b/index.md": "---\ndate: 2024\n---\n# B\n\nfine\n\nbroken **bold",
+            "c/index.md": "no title here",
+            "d/index.md": "# D",
+        }
+        for rel, text in pages.items():
+            path = os.path.join(self.content, *rel.split("/"))
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(text)
+
+    def test_render_page_reports_line(self):
+        with self.assertRaises(PageError) as ctx:
+            render_page("# T\n\nok\n\n- item\n- `code", TEMPLATE)
+        self.assertEqual(ctx.exception.line, 5)
+        self.assertIn("line 5: ", str(ctx.exception))
+
+    def test_streamed_reports_line_and_removes_partial_page(self):
+        src = os.path.join(self.content, "b", "index.md")
+        dest = os.path.join(self.tmp.name, "out", "b.html")
+        with self.assertRaises(PageError) as ctx:
+            generate_page(src, self.template_path, dest, logger=lambda msg: None, stream=True)
+        self.assertEqual(ctx.exception.line, 8)
+        self.assertFalse(os.path.exists(dest))
+
+    def test_first_failure_aborts_by_default(self):
+        with self.assertRaises(ValueError):
+            generate_pages_recursive(self.content, self.template_path, os.path.join(self.tmp.name, "docs"),
+                                     logger=lambda msg: None)
+
+    def test_collects_every_failure(self):
+        for dest in (os.path.join(self.tmp.name, "docs"), DirectorySink(os.path.join(self.tmp.name, "sink"))):
+            errors = []
+            generate_pages_recursive(self.content, self.template_path, dest, logger=lambda msg: None, errors=errors)
+            root = dest if isinstance(dest, str) else dest.root
+            self.assertEqual(sorted(os.listdir(root)), ["a", "d"])
+            self.assertEqual([(os.path.relpath(e.path, self.content), e.line) for e in errors],
+                             [(os.path.join("b", "index.md"), 8), (os.path.join("c", "index.md"), None)])
+            self.assertIn("index.md:8: ", str(errors[0]))
+            self.assertIn("No H1 title", str(errors[1]))
+
+    def test_parallel_collects_every_failure(self):
+        errors = []
+        dest = os.path.join(self.tmp.name, "docs")
+        generate_pages_recursive(self.content, self.template_path, dest, logger=lambda msg: None,
+                                 errors=errors, workers=2)
+        self.assertEqual(sorted(os.listdir(dest)), ["a", "d"])
+        self.assertEqual(sorted((os.path.relpath(e.path, self.content), e.line) for e in errors),
+                         [(os.path.join("b", "index.md"), 8), (os.path.join("c", "index.md"), None)])
+
+    def test_parallel_first_failure_raises(self):
+        with self.assertRaises(PageError):
+            generate_pages_recursive(self.content, self.template_path, os.path.join(self.tmp.name, "docs"),
+                                     logger=lambda msg: None, workers=2)
+
+
+class TestParallelBuild(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.content = os.path.join(self.tmp.name, "content")
+        self.template_path = os.path.join(self.tmp.name, "template.html")
+        with open(self.template_path, "w", encoding="utf-8") as f:
+            f.write(TEMPLATE)
+        for i in range(12):
+            path = os.path.join(self.content, f"page{i}", "index.md")
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(MARKDOWN.replace("Page Title", f"Page {i}") + "\n\nMore text.\n" * (i * 50))
+
+    def build(self, dest, **kwargs):
+        generate_pages_recursive(self.content, self.template_path, dest, basepath="/site/",
+                                 logger=lambda msg: None, **kwargs)
+        pages = {}
+        for root, _, files in os.walk(dest):
+            for name in files:
+                with open(os.path.join(root, name), encoding="utf-8") as f:
+                    pages[os.path.relpath(os.path.join(root, name), dest)] = f.read()
+        return pages
+
+    def test_matches_sequential_build(self):
+        sequential = self.build(os.path.join(self.tmp.name, "seq"))
+        parallel = self.build(os.path.join(self.tmp.name, "par"), workers=3)
+        self.assertEqual(len(parallel), 12)
+        self.assertEqual(parallel, sequential)
+
+    def test_timings_recorded_for_next_build(self):
+        cache = os.path.join(self.tmp.name, ".cache", "timings.json")
+        self.build(os.path.join(self.tmp.name, "docs"), workers=2, timings=BuildTimings(cache))
+        timings = BuildTimings(cache)
+        self.assertTrue(all(timings.get(f"page{i}/index.html") is not None for i in range(12)))
+
+    def test_images_not_supported(self):
+        with self.assertRaises(ValueError):
+            generate_pages_recursive(self.content, self.template_path, os.path.join(self.tmp.name, "docs"),
+                                     logger=lambda msg: None, images=object(), workers=2)
+
+
+if __name__ == "__main__":
+    unittest.main()
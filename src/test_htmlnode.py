@@ -1,5 +1,5 @@
 import unittest
-from htmlnode import HTMLNode, LeafNode, ParentNode  # adjust if your filename differs
+from htmlnode import HTMLNode, LeafNode, ParentNode, escape_attr, escape_text  # adjust if your filename differs
 
 
 class TestHTMLNode(unittest.TestCase):
@@ -32,6 +32,32 @@ class TestHTMLNode(unittest.TestCase):
         )
         self.assertEqual(repr(node), expected)
 
+    def test_props_cache_invalidated_on_mutation(self):
+        node = HTMLNode(props={"href": "/a"})
+        self.assertEqual(node.props_to_html(), ' href="/a"')
+        node.props["class"] = "x"
+        self.assertEqual(node.props_to_html(), ' href="/a" class="x"')
+        del node.props["href"]
+        self.assertEqual(node.props_to_html(), ' class="x"')
+        node.props.update({"id": "y"})
+        self.assertEqual(node.props_to_html(), ' class="x" id="y"')
+
+    def test_props_cache_invalidated_on_reassign(self):
+        node = LeafNode("a", "x", props={"href": "/a"})
+        self.assertEqual(node.to_html(), '<a href="/a">x</a>')
+        node.props = {"href": "/b"}
+        self.assertEqual(node.to_html(), '<a href="/b">x</a>')
+
+    def test_empty_props_not_allocated(self):
+        node = LeafNode("b", "x", props={})
+        self.assertIsNone(node._props)
+        self.assertEqual(node.to_html(), "<b>x</b>")
+        self.assertEqual(node, LeafNode("b", "x"))
+        self.assertIsNone(node._props)
+        # Still a mutable dict when asked for
+        node.props["class"] = "y"
+        self.assertEqual(node.to_html(), '<b class="y">x</b>')
+
     def test_to_html_not_implemented(self):
         node = HTMLNode()
         with self.assertRaises(NotImplementedError):
@@ -75,6 +101,20 @@ class TestLeafNode(unittest.TestCase):
         node = LeafNode("span", "0")
         self.assertEqual(node.to_html(), "<span>0</span>")
 
+    def test_to_html_escapes_value(self):
+        self.assertEqual(LeafNode("b", "a < b & c").to_html(), "<b>a &lt; b &amp; c</b>")
+        self.assertEqual(LeafNode(None, '<x> "q"').to_html(), '&lt;x&gt; "q"')
+
+    def test_to_html_escapes_props(self):
+        node = LeafNode("a", "x", props={"href": '/s?a=1&b="2"', "title": "<t>"})
+        self.assertEqual(node.to_html(), '<a href="/s?a=1&amp;b=&quot;2&quot;" title="&lt;t&gt;">x</a>')
+
+    def test_escape_helpers(self):
+        self.assertEqual(escape_text("plain"), "plain")
+        self.assertEqual(escape_text("&lt;"), "&amp;lt;")
+        self.assertEqual(escape_text('"'), '"')
+        self.assertEqual(escape_attr('"&'), "&quot;&amp;")
+
     def test_repr_with_tag(self):
         node = LeafNode("span", "hi", props={"x": "1"})
         self.assertEqual(
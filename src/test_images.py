@@ -0,0 +1,100 @@
+import os
+import struct
+import tempfile
+import threading
+import unittest
+import zlib
+
+from images import ImagePipeline, image_size, variant_name, Image
+
+
+def _png(width, height):
+    def chunk(kind, data):
+        return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data))
+    ihdr = struct.pack(">IIBBBBB", width, height, 8, 2, 0, 0, 0)
+    raw = b"".join(b"\x00" + b"\x00\x00\x00" * width for _ in range(height))
+    return b"\x89PNG\r\n\x1a\n" + chunk(b"IHDR", ihdr) + chunk(b"IDAT", zlib.compress(raw)) + chunk(b"IEND", b"")
+
+
+def _jpeg_header(width, height):
+    app0 = b"\xff\xe0" + struct.pack(">H", 16) + b"JFIF\x00" + b"\x01\x01\x00\x00\x01\x00\x01\x00\x00"
+    sof = b"\xff\xc0" + struct.pack(">HBHHB", 11, 8, height, width, 1) + b"\x01\x11\x00"
+    return b"\xff\xd8" + app0 + sof + b"\xff\xd9"
+
+
+class TestImages(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.static = os.path.join(self.tmp.name, "static")
+        os.makedirs(os.path.join(self.static, "images"))
+
+    def _write(self, rel, data):
+        path = os.path.join(self.static, *rel.split("/"))
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_png_size(self):
+        self.assertEqual(image_size(self._write("a.png", _png(3, 2))), (3, 2))
+
+    def test_gif_size(self):
+        self.assertEqual(image_size(self._write("a.gif", b"GIF89a" + struct.pack("<HH", 640, 480) + b"\x00" * 8)), (640, 480))
+
+    def test_jpeg_size(self):
+        self.assertEqual(image_size(self._write("a.jpg", _jpeg_header(1024, 768))), (1024, 768))
+
+    def test_unknown_format(self):
+        self.assertIsNone(image_size(self._write("a.txt", b"not an image at all, really")))
+
+    def test_rewrite_adds_dimensions(self):
+        self._write("images/a.png", _png(3, 2))
+        with ImagePipeline(self.static, logger=lambda msg: None) as images:
+            html = images.rewrite('<p><img src="/images/a.png" alt=""> </img><img src="/images/missing.png" alt=""> </img></p>')
+        self.assertEqual(
+            html,
+            '<p><img src="/images/a.png" alt="" width="3" height="2"> </img>'
+            '<img src="/images/missing.png" alt=""> </img></p>'
+        )
+
+    def test_variant_name(self):
+        self.assertEqual(variant_name("images/tom.png", "abc", 480), "images/tom.abc.480w.png")
+
+    @unittest.skipIf(Image is None, "Pillow is not installed")
+    def test_variants_and_srcset(self):
+        self._write("images/a.png", _png(20, 10))
+        dest = os.path.join(self.tmp.name, "docs")
+        with ImagePipeline(self.static, dest, widths=(5, 10, 40), logger=lambda msg: None) as images:
+            html = images.rewrite('<img src="/images/a.png" alt="">', basepath="/site/")
+            variants = [name for name, _ in images.info("images/a.png")["variants"]]
+        self.assertEqual(len(variants), 2)
+        self.assertIn(f'srcset="/site/{variants[0]} 5w, /site/{variants[1]} 10w, /site/images/a.png 20w"', html)
+        for name in variants:
+            self.assertEqual(image_size(os.path.join(dest, *name.split("/")))[0], int(name.rsplit(".", 2)[1][:-1]))
+
+
+    @unittest.skipIf(Image is None, "Pillow is not installed")
+    def test_sink_written_in_order_from_calling_thread(self):
+        class RecordingSink:
+            def __init__(self):
+                self.writes = []
+
+            def write(self, rel_path, data):
+                self.writes.append((rel_path, threading.current_thread()))
+
+        for name in ("b", "a", "c"):
+            self._write(f"images/{name}.png", _png(20, 10))
+        sink = RecordingSink()
+        with ImagePipeline(self.static, sink, widths=(5, 10), logger=lambda msg: None) as images:
+            for name in ("b", "a", "c"):
+                images.info(f"images/{name}.png")
+            self.assertEqual(sink.writes, [])
+        names = [rel_path for rel_path, _ in sink.writes]
+        self.assertEqual(len(names), 6)
+        self.assertEqual(names, sorted(names))
+        self.assertTrue(all(thread is threading.current_thread() for _, thread in sink.writes))
+
+
+if __name__ == "__main__":
+    unittest.main()
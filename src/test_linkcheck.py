@@ -0,0 +1,65 @@
+import os
+import tempfile
+import unittest
+
+from generator import build_site, generate_pages_recursive
+from linkcheck import LinkChecker, BrokenLink
+
+
+TEMPLATE = "<title>{{ Title }}</title>{{ Content }}"
+
+
+class TestLinkChecker(unittest.TestCase):
+
+    def checker(self, basepath='/'):
+        checker = LinkChecker(basepath)
+        checker.add_page("index.html")
+        checker.add_page("blog/tom/index.html")
+        checker.add_asset("images/tom.png")
+        return checker
+
+    def test_resolves_pages_and_assets(self):
+        checker = self.checker()
+        checker.add_links("index.html", ["/", "/blog/tom", "/blog/tom/", "/blog/tom/index.html#top",
+                                         "/images/tom.png", "blog/tom/", "https://example.com/x", "#top"])
+        checker.add_links("blog/tom/index.html", ["../../", "../../images/tom.png", "/missing", "other.png"])
+        self.assertEqual(checker.check(), [BrokenLink("blog/tom/index.html", "/missing"),
+                                           BrokenLink("blog/tom/index.html", "other.png")])
+
+    def test_basepath_prefix_is_optional(self):
+        checker = self.checker("/site")
+        checker.add_links("index.html", ["/site/blog/tom/", "/blog/tom/", "/site", "/site/nope"])
+        self.assertEqual(checker.check(), [BrokenLink("index.html", "/site/nope")])
+
+    def test_build_site_records_links(self):
+        checker = LinkChecker()
+        source = {"index.md": "# Home\n\n[Tom](/blog/tom) and [gone](/gone)",
+                  "blog/tom/index.md": "# Tom\n\n![Pic](/images/tom.png)\n\n- [home](../../)"}
+        list(build_site(source, TEMPLATE, link_checker=checker))
+        self.assertEqual(len(checker.links), 4)
+        self.assertEqual(checker.check(), [BrokenLink("index.html", "/gone"),
+                                           BrokenLink("blog/tom/index.html", "/images/tom.png")])
+
+    def test_generate_pages_recursive_with_static_dir(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            static = os.path.join(tmp, "static", "images")
+            os.makedirs(content)
+            os.makedirs(static)
+            with open(os.path.join(static, "tom.png"), "wb") as f:
+                f.write(b"png")
+            with open(os.path.join(content, "index.md"), "w") as f:
+                f.write("# Home\n\n![Pic](/images/tom.png) [bad](/nope)")
+            template = os.path.join(tmp, "template.html")
+            with open(template, "w") as f:
+                f.write(TEMPLATE)
+
+            checker = LinkChecker()
+            checker.add_assets_from_dir(os.path.join(tmp, "static"))
+            generate_pages_recursive(content, template, os.path.join(tmp, "docs"), logger=lambda msg: None,
+                                     link_checker=checker)
+            self.assertEqual(checker.check(), [BrokenLink("index.html", "/nope")])
+
+
+if __name__ == "__main__":
+    unittest.main()
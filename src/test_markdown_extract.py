@@ -1,5 +1,41 @@
+import os
+import random
+import re
+import tempfile
 import unittest
-from markdown_extract import extract_markdown_images, extract_markdown_links, markdown_to_blocks, block_to_block_type, BlockType, extract_title
+from markdown_extract import extract_markdown_images, extract_markdown_links, markdown_to_blocks, block_to_block_type, parse_block, parse_blocks, iter_buffer_blocks, iter_file_blocks, parse_file_blocks, Block, BlockType, extract_title, iter_link_spans, link_positions
+
+
+class _ScannedText(str):
+    """A str that counts the characters its `find` calls look at."""
+
+    scanned = 0
+
+    def find(self, sub, start=0, end=None):
+        end = len(self) if end is None else min(end, len(self))
+        found = str.find(self, sub, start, end)
+        self.scanned += (end if found == -1 else found + len(sub)) - start
+        return found
+
+
+class _CountedLine(str):
+    """A line that counts how often it is stripped, i.e. looked at by the block scanner."""
+
+    strips = 0
+
+    def strip(self, *chars):
+        _CountedLine.strips += 1
+        return str.strip(self, *chars)
+
+    def rstrip(self, *chars):
+        _CountedLine.strips += 1
+        return str.rstrip(self, *chars)
+
+
+class _CountedText(str):
+    def split(self, *args):
+        return [_CountedLine(line) for line in str.split(self, *args)]
+
 
 
 class TestMarkdownExtract(unittest.TestCase):
@@ -60,6 +96,35 @@ class TestMarkdownExtract(unittest.TestCase):
         matches = extract_markdown_links(text)
         self.assertListEqual(matches, [("click", "url")])
 
+    # -----------------------------
+    # Linear-time scanning
+    # -----------------------------
+    def test_scanner_matches_regexes(self):
+        # The scanner must find exactly what the patterns it replaced found
+        patterns = [
+            (r"\[([^\]]+)\]\(([^)]+)\)", dict(label_required=True, url_required=True)),
+            (r"!\[([^\]]*?)\]\((.*?)\)", dict(opener="![", url_newlines=False)),
+            (r"(?<!\!)\[([^\]]*?)\]\((.*?)\)", dict(skip_after="!", url_newlines=False)),
+        ]
+        rng = random.Random(11)
+        for _ in range(3000):
+            text = "".join(rng.choice("[]()!a\n") for _ in range(rng.randint(0, 20)))
+            for pattern, options in patterns:
+                expected = [m.span() + m.groups() for m in re.finditer(pattern, text)]
+                self.assertEqual(list(iter_link_spans(text, **options)), expected, (text, options))
+            self.assertEqual(extract_markdown_images(text), re.findall(r"!\[(.*?)\]\((.*?)\)", text), text)
+            self.assertEqual(extract_markdown_links(text), re.findall(r"(?<!\!)\[([^\]]*?)\]\((.*?)\)", text), text)
+
+    def test_unclosed_links_and_images_stay_linear(self):
+        # Backtracking patterns took minutes on these, rescanning the rest of the text for every opener
+        for unit in ("[", "![", "](", "![a](", "[a](", "![](\n", "[a]("):
+            self.assertEqual(extract_markdown_images(unit * 100000), [])
+            self.assertEqual(extract_markdown_links(unit * 100000), [])
+            for options in (dict(opener="![", url_newlines=False), dict(skip_after="!", url_newlines=False)):
+                text = _ScannedText(unit * 1000)
+                self.assertEqual(list(link_positions(text, **options)), [])
+                self.assertLessEqual(text.scanned, 2 * len(text), (unit, options))
+
 
 class TestMarkdownToBlocks(unittest.TestCase):
 
@@ -120,6 +185,33 @@ This is a paragraph of text. It has some **bold** and _italic_ words inside of i
         self.assertEqual(blocks, [])
 
 
+class TestIterBlocks(unittest.TestCase):
+
+    SAMPLES = [
+        "",
+        "Block 1\n\n\n\nBlock 2",
+        "  Block 1  \n\n  Block 2  \n",
+        "# Title\n\n- a\n- b\n\n\u00e9t\u00e9 \u2014 ok\n",
+        "\n\n\n",
+        "Intro\n\n```\ncode\n\n\nmore\n```\n\n- a",
+        "```\nunclosed\n\n```x\n\ntext",
+    ]
+
+    def test_buffer_matches_markdown_to_blocks(self):
+        for markdown in self.SAMPLES:
+            self.assertEqual(list(iter_buffer_blocks(markdown.encode("utf-8"))), markdown_to_blocks(markdown))
+
+    def test_file_blocks(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            for i, markdown in enumerate(self.SAMPLES):
+                path = os.path.join(tmp, f"{i}.md")
+                with open(path, "wb") as f:
+                    f.write(markdown.encode("utf-8"))
+                self.assertEqual(list(iter_file_blocks(path)), markdown_to_blocks(markdown))
+                self.assertEqual([(b.text, b.type, b.first_line) for b in parse_file_blocks(path)],
+                                 [(b.text, b.type, b.first_line) for b in parse_blocks(markdown)])
+
+
 class TestBlockToBlockType(unittest.TestCase):
 
     # -------- Heading Tests --------
@@ -249,6 +341,159 @@ class TestBlockToBlockType(unittest.TestCase):
         self.assertEqual(block_to_block_type(block), BlockType.PARAGRAPH)
 
 
+class TestParseBlock(unittest.TestCase):
+
+    def test_heading_level(self):
+        self.assertEqual(parse_block("### Title"), Block("### Title", BlockType.HEADING, level=3))
+
+    def test_ordered_list_offsets(self):
+        block = "\n".join(f"{i}. item" for i in range(1, 11))
+        record = parse_block(block)
+        self.assertEqual(record.type, BlockType.ORDERED_LIST)
+        self.assertEqual(record.offsets, [3] * 9 + [4])
+        self.assertEqual(record.items(), ["item"] * 10)
+
+    def test_quote_offsets(self):
+        record = parse_block("> spaced\n>tight")
+        self.assertEqual(record.offsets, [2, 1])
+        self.assertEqual(record.items(), ["spaced", "tight"])
+
+    def test_unordered_items(self):
+        self.assertEqual(parse_block("- a\n- b").items(), ["a", "b"])
+
+    def test_list_keeps_lines(self):
+        record = parse_block("- a\n- b")
+        self.assertEqual(record.type, BlockType.UNORDERED_LIST)
+        self.assertEqual(record.lines, ["- a", "- b"])
+
+    def test_ordered_list_keeps_lines(self):
+        record = parse_block("1. a\n2. b\n3. c")
+        self.assertEqual(record.type, BlockType.ORDERED_LIST)
+        self.assertEqual(record.lines, ["1. a", "2. b", "3. c"])
+
+    def test_ordered_list_double_digits(self):
+        block = "\n".join(f"{i}. item" for i in range(1, 12))
+        self.assertEqual(parse_block(block).type, BlockType.ORDERED_LIST)
+
+    def test_ordered_list_prefix_digit_mismatch(self):
+        self.assertEqual(parse_block("1. a\n20. b").type, BlockType.PARAGRAPH)
+
+    def test_quote_keeps_lines(self):
+        record = parse_block("> a\n>b")
+        self.assertEqual(record.type, BlockType.QUOTE)
+        self.assertEqual(record.lines, ["> a", ">b"])
+
+    def test_paragraph_not_split(self):
+        record = parse_block("just text\nmore")
+        self.assertEqual((record.type, record.lines), (BlockType.PARAGRAPH, None))
+
+    def test_heading_not_split(self):
+        record = parse_block("## Title")
+        self.assertEqual((record.type, record.lines), (BlockType.HEADING, None))
+
+    def test_empty_block(self):
+        record = parse_block("")
+        self.assertEqual((record.type, record.lines), (BlockType.PARAGRAPH, None))
+
+    def test_parse_blocks(self):
+        records = parse_blocks("# T\n\n- a\n\ntext")
+        self.assertEqual([r.type for r in records],
+                         [BlockType.HEADING, BlockType.UNORDERED_LIST, BlockType.PARAGRAPH])
+
+
+def _reference_blocks(markdown):
+    """A plain line-by-line implementation of the block grammar, used as the spec."""
+    lines = markdown.split("\n")
+    blocks = []
+    current = []
+    fences = True
+    i = 0
+    while i < len(lines):
+        line = lines[i]
+        stripped = line.strip()
+        opens = fences and stripped.startswith("```") and "`" not in stripped[3:]
+        close = None
+        if opens:
+            close = next((j for j in range(i + 1, len(lines)) if lines[j].rstrip().endswith("```")), None)
+            if close is None:
+                # Nothing later can close a fence either
+                fences = False
+        if not line:
+            if current:
+                blocks.append(current)
+            current = []
+        elif close is not None:
+            if current:
+                blocks.append(current)
+            current = []
+            blocks.append(lines[i:close + 1])
+            i = close
+        else:
+            current.append(line)
+        i += 1
+    if current:
+        blocks.append(current)
+    return [text for text in ("\n".join(block).strip() for block in blocks) if text]
+
+
+class TestBlockScanner(unittest.TestCase):
+
+    def test_fenced_code_keeps_blank_lines(self):
+        markdown = "Intro\n\n```\ndef f():\n\n\n    return 1\n```\n\nAfter"
+        records = parse_blocks(markdown)
+        self.assertEqual([r.type for r in records], [BlockType.PARAGRAPH, BlockType.CODE, BlockType.PARAGRAPH])
+        self.assertEqual(records[1].text, "```\ndef f():\n\n\n    return 1\n```")
+        self.assertEqual((records[1].first_line, records[1].last_line), (3, 8))
+        self.assertEqual(records[2].first_line, 10)
+
+    def test_fence_ends_block(self):
+        records = parse_blocks("```\ncode\n```\ntext right after\n\n```py\nx\n\ny\n```")
+        self.assertEqual([(r.type, r.first_line) for r in records],
+                         [(BlockType.CODE, 1), (BlockType.PARAGRAPH, 4), (BlockType.CODE, 6)])
+
+    def test_fence_inside_paragraph(self):
+        markdown = "Example:\n```\nx = 1\n\ny = 2\n```\nafter\n- a\n```\nz\n```"
+        records = parse_blocks(markdown)
+        self.assertEqual([(r.type, r.first_line, r.last_line) for r in records],
+                         [(BlockType.PARAGRAPH, 1, 1), (BlockType.CODE, 2, 6), (BlockType.PARAGRAPH, 7, 8),
+                          (BlockType.CODE, 9, 11)])
+        self.assertEqual(records[1].text, "```\nx = 1\n\ny = 2\n```")
+
+    def test_unclosed_fence_inside_paragraph_stays_text(self):
+        self.assertEqual(markdown_to_blocks("text\n```x\nmore\n\nend"), ["text\n```x\nmore", "end"])
+
+    def test_inline_code_line_does_not_open_fence(self):
+        markdown = "```x``` is inline\n\nSome para\n\n```\nreal code\n```"
+        records = parse_blocks(markdown)
+        self.assertEqual([r.type for r in records], [BlockType.PARAGRAPH, BlockType.PARAGRAPH, BlockType.CODE])
+        self.assertEqual(records[2].text, "```\nreal code\n```")
+
+    def test_unclosed_fence_is_not_code(self):
+        markdown = "```\nnot code\n\n```also not\n\ntext"
+        self.assertEqual(markdown_to_blocks(markdown), ["```\nnot code", "```also not", "text"])
+        self.assertEqual(parse_blocks(markdown)[0].type, BlockType.PARAGRAPH)
+
+    def test_line_ranges(self):
+        records = parse_blocks("\n\n  \n# T\n\n\n\n- a\n- b\n", first_line=5)
+        self.assertEqual([(r.first_line, r.last_line) for r in records], [(8, 8), (12, 13)])
+
+    def test_matches_reference(self):
+        rng = random.Random(7)
+        pieces = ["", "", "text", "  ", "```", "```py", "x```", "```one```", "- item", "> q", "# h", "  ```",
+                  "Example:", "```x``` is inline"]
+        for _ in range(2000):
+            markdown = "\n".join(rng.choice(pieces) for _ in range(rng.randint(0, 12)))
+            self.assertEqual(markdown_to_blocks(markdown), _reference_blocks(markdown), repr(markdown))
+
+    def test_unclosed_fences_stay_linear(self):
+        # Each fence opener would scan to the end of the input if unclosed fences were retried
+        markdown = "```x\n\n" * 1000
+        _CountedLine.strips = 0
+        self.assertEqual(len(parse_blocks(_CountedText(markdown))), 1000)
+        # Each line is read at most twice (see `_scan_blocks`)
+        self.assertLessEqual(_CountedLine.strips, 2 * markdown.count("\n"))
+
+
 class TestExtractTitle(unittest.TestCase):
 
     def test_simple_title(self):
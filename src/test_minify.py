@@ -0,0 +1,79 @@
+import unittest
+
+from minify import HTMLMinifier, minify_html
+
+
+PAGE = """<!doctype html>
+<html>
+  <head>
+    <!-- analytics go here -->
+    <title>Title</title>
+  </head>
+  <body>
+    <p>Some   text
+    over lines with <b>bold</b> <i>italic</i></p>
+    <pre><code>
+def f():
+    return  1   # <!-- not a comment -->
+</code></pre>
+  </body>
+</html>"""
+
+
+class TestMinify(unittest.TestCase):
+
+    def test_strips_comments_and_indentation(self):
+        html = minify_html(PAGE)
+        self.assertNotIn("analytics", html)
+        self.assertTrue(html.startswith("<!doctype html><html><head><title>Title</title></head><body>"))
+        self.assertIn("<p>Some text over lines with <b>bold</b> <i>italic</i></p>", html)
+
+    def test_pre_contents_untouched(self):
+        html = minify_html(PAGE)
+        self.assertIn("<pre><code>\ndef f():\n    return  1   # <!-- not a comment -->\n</code></pre>", html)
+
+    def test_conditional_comment_kept(self):
+        self.assertEqual(minify_html("<!--[if IE]><p>x</p><![endif]-->"), "<!--[if IE]><p>x</p><![endif]-->")
+
+    def test_chunked_feed_matches_whole(self):
+        expected = minify_html(PAGE)
+        for size in (1, 2, 7, 64):
+            minifier = HTMLMinifier()
+            out = [minifier.feed(PAGE[i:i + size]) for i in range(0, len(PAGE), size)]
+            out.append(minifier.close())
+            self.assertEqual("".join(out), expected)
+
+    def test_space_between_inline_elements_kept(self):
+        html = "<p><b>a</b>\n<i>b</i> and <code>x</code>\n<a href=\"/y\">link</a></p>\n<ul>\n  <li> <b>c</b> </li>\n</ul>"
+        expected = '<p><b>a</b> <i>b</i> and <code>x</code> <a href="/y">link</a></p><ul><li><b>c</b></li></ul>'
+        self.assertEqual(minify_html(html), expected)
+        for size in (1, 3):
+            minifier = HTMLMinifier()
+            out = [minifier.feed(html[i:i + size]) for i in range(0, len(html), size)]
+            out.append(minifier.close())
+            self.assertEqual("".join(out), expected)
+
+    def assertMinifies(self, html, expected):
+        self.assertEqual(minify_html(html), expected)
+        for size in (1, 3):
+            minifier = HTMLMinifier()
+            out = [minifier.feed(html[i:i + size]) for i in range(0, len(html), size)]
+            out.append(minifier.close())
+            self.assertEqual("".join(out), expected)
+
+    def test_script_with_less_than(self):
+        self.assertMinifies("<script>if (a<b) {}</script>\n<p>x    y</p>", "<script>if (a<b) {}</script><p>x y</p>")
+        self.assertMinifies("<STYLE>a<b {  }</Style>\n<p>x    y</p>", "<STYLE>a<b {  }</Style><p>x y</p>")
+        self.assertMinifies("<script>x <!-- y --> </script> <p>a  b</p>", "<script>x <!-- y --> </script><p>a b</p>")
+
+    def test_comment_keeps_surrounding_space(self):
+        self.assertMinifies("<p><b>a</b> <!-- c --> <i>b</i></p>", "<p><b>a</b> <i>b</i></p>")
+        self.assertMinifies("<p>a <!-- c --><b>b</b>c<!-- d -->d</p>", "<p>a <b>b</b>cd</p>")
+        self.assertMinifies("<div>\n  <!-- c -->\n  <p>x</p> <!-- d -->\n</div>", "<div><p>x</p></div>")
+
+    def test_unterminated_tag_emitted(self):
+        self.assertEqual(minify_html("<p>x</p><a href"), "<p>x</p><a href")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,67 @@
+import gzip
+import os
+import tempfile
+import unittest
+
+from precompress import Precompressor
+
+
+class TestPrecompressor(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.cache = os.path.join(self.tmp.name, "cache")
+
+    def _write(self, name, data):
+        path = os.path.join(self.tmp.name, name)
+        with open(path, "wb") as f:
+            f.write(data)
+        return path
+
+    def test_writes_gzip_sidecar(self):
+        data = b"<p>hello</p>" * 200
+        path = self._write("index.html", data)
+        with Precompressor(cache_dir=self.cache, logger=lambda msg: None) as pre:
+            pre.submit(path)
+        with open(path + ".gz", "rb") as f:
+            self.assertEqual(gzip.decompress(f.read()), data)
+
+    def test_skips_small_and_binary_files(self):
+        small = self._write("small.html", b"<p>x</p>")
+        image = self._write("big.png", b"\x89PNG" * 1000)
+        with Precompressor(cache_dir=self.cache, logger=lambda msg: None) as pre:
+            pre.submit(small)
+            pre.submit(image)
+        self.assertFalse(os.path.exists(small + ".gz"))
+        self.assertFalse(os.path.exists(image + ".gz"))
+
+    def test_unchanged_content_reuses_cache(self):
+        data = b"body { color: red; }\n" * 100
+        path = self._write("index.css", data)
+        logged = []
+        with Precompressor(cache_dir=self.cache, logger=logged.append) as pre:
+            pre.submit(path)
+        cached = os.listdir(self.cache)
+        os.remove(path + ".gz")
+
+        # Poison the cache entry: a cache hit must copy it instead of recompressing
+        with open(os.path.join(self.cache, cached[0]), "wb") as f:
+            f.write(b"cached")
+        with Precompressor(cache_dir=self.cache, logger=logged.append) as pre:
+            pre.submit(path)
+        with open(path + ".gz", "rb") as f:
+            self.assertEqual(f.read(), b"cached")
+
+    def test_fresh_sidecar_kept_without_cache(self):
+        path = self._write("page.html", b"<p>text</p>" * 200)
+        sidecar = self._write("page.html.gz", b"existing")
+        os.utime(path, (0, 0))
+        with Precompressor(logger=lambda msg: None) as pre:
+            pre.submit(path)
+        with open(sidecar, "rb") as f:
+            self.assertEqual(f.read(), b"existing")
+
+
+if __name__ == "__main__":
+    unittest.main()
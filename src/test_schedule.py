@@ -0,0 +1,79 @@
+import os
+import tempfile
+import unittest
+
+from schedule import BuildTimings, estimate_costs, plan_chunks
+
+
+class TestPlanChunks(unittest.TestCase):
+
+    def test_largest_first(self):
+        tasks = plan_chunks(["a", "b", "c", "d"], [10, 400, 30, 200], workers=2, chunks_per_worker=2)
+        self.assertEqual(tasks[0], ["b"])
+        self.assertEqual(tasks[1:], [["d"], ["c", "a"]])
+
+    def test_small_items_chunked(self):
+        items = ["huge"] + [f"small{i}" for i in range(100)]
+        costs = [1000] + [10] * 100
+        tasks = plan_chunks(items, costs, workers=4, chunks_per_worker=2)
+        self.assertEqual(tasks[0], ["huge"])
+        # Every item is scheduled exactly once, in far fewer tasks than items
+        self.assertEqual(sorted(item for task in tasks for item in task), sorted(items))
+        self.assertLess(len(tasks), 20)
+        self.assertTrue(all(len(task) > 1 for task in tasks[1:]))
+
+    def test_equal_costs_keep_order(self):
+        tasks = plan_chunks(["a", "b", "c"], [5, 5, 5], workers=3, chunks_per_worker=1)
+        self.assertEqual(tasks, [["a"], ["b"], ["c"]])
+
+    def test_empty(self):
+        self.assertEqual(plan_chunks([], [], workers=4), [])
+
+
+class TestCosts(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+        self.pages = []
+        for name, size in (("a", 100), ("b", 300), ("c", 200)):
+            path = os.path.join(self.tmp, f"{name}.md")
+            with open(path, "w") as f:
+                f.write("x" * size)
+            self.pages.append((path, f"{name}.html"))
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def test_file_sizes_without_timings(self):
+        self.assertEqual(estimate_costs(self.pages), [100.0, 300.0, 200.0])
+
+    def test_timings_override_sizes(self):
+        cache = os.path.join(self.tmp, ".cache", "timings.json")
+        timings = BuildTimings(cache)
+        # "a" is small but was slow; "b" built at 300 bytes per second
+        timings.record("a.html", 2.0)
+        timings.record("b.html", 1.0)
+        timings.save()
+
+        costs = estimate_costs(self.pages, BuildTimings(cache))
+        # 400 timed bytes in 3 seconds
+        self.assertAlmostEqual(costs[0], 2.0 * 400 / 3)
+        self.assertAlmostEqual(costs[1], 400 / 3)
+        self.assertEqual(costs[2], 200.0)
+
+    def test_only_current_pages_saved(self):
+        cache = os.path.join(self.tmp, "timings.json")
+        timings = BuildTimings(cache)
+        timings.record("a.html", 1.0)
+        timings.save()
+        timings = BuildTimings(cache)
+        timings.record("b.html", 1.0)
+        timings.save()
+        timings = BuildTimings(cache)
+        self.assertIsNone(timings.get("a.html"))
+        self.assertEqual(timings.get("b.html"), 1.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import os
+import tempfile
+import unittest
+
+from generator import generate_pages_recursive
+from sections import Section, SectionIndex, listing_path
+from siteindex import SiteIndex
+from sinks import DirectorySink
+
+
+TEMPLATE = "<title>{{ Title }}</title>{{ Content }}"
+
+
+class TestSections(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.tmp = self._tmp.name
+        self.content = os.path.join(self.tmp, "content")
+        self.dest = os.path.join(self.tmp, "docs")
+        self.cache = os.path.join(self.tmp, ".cache", "sections.json")
+        self.template = os.path.join(self.tmp, "template.html")
+        with open(self.template, "w") as f:
+            f.write(TEMPLATE)
+        self.add_post("index.md", "# Home")
+        for day in (1, 2, 3):
+            self.add_post(f"blog/post{day}/index.md", f"---\ndate: 2024-05-0{day}\n---\n# Post {day}\n\nBody")
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def add_post(self, rel_path, markdown):
+        path = os.path.join(self.content, *rel_path.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(markdown)
+
+    def read(self, rel_path):
+        with open(os.path.join(self.dest, *rel_path.split("/"))) as f:
+            return f.read()
+
+    def build(self, per_page=2):
+        index = SectionIndex(self.content, [Section("blog", per_page)], cache_path=self.cache)
+        logs = []
+        generate_pages_recursive(self.content, self.template, self.dest, logger=logs.append, sections=index)
+        return index, logs
+
+    def test_listing_path(self):
+        self.assertEqual(listing_path("blog", 1), "blog/index.html")
+        self.assertEqual(listing_path("blog", 3), "blog/page/3/index.html")
+
+    def test_posts_sorted_by_date(self):
+        index = SectionIndex(self.content, [Section("blog")])
+        posts = index.posts(index.sections[0])
+        self.assertEqual([post["title"] for post in posts], ["Post 3", "Post 2", "Post 1"])
+        self.assertEqual(posts[0]["path"], "blog/post3/index.html")
+
+    def test_paginated_pages(self):
+        self.build()
+        first = self.read("blog/index.html")
+        self.assertIn('<li><a href="/blog/post3/">Post 3</a> (2024-05-03)</li>', first)
+        self.assertIn('<a href="/blog/page/2/">Older posts</a>', first)
+        second = self.read("blog/page/2/index.html")
+        self.assertIn("<h1>Blog (page 2 of 2)</h1>", second)
+        self.assertIn("Post 1", second)
+        self.assertIn('<a href="/blog/">Newer posts</a>', second)
+
+    def test_incremental_rebuild(self):
+        self.build()
+        index, logs = self.build()
+        self.assertEqual(index.scanned, 0)
+        self.assertEqual(sum("Unchanged section listing" in line for line in logs), 2)
+
+        # One more post only needs its own header scanned
+        self.add_post("blog/post0/index.md", "---\ndate: 2024-04-30\n---\n# Post 0")
+        index, logs = self.build()
+        self.assertEqual(index.scanned, 1)
+        self.assertTrue(any(line.startswith("Unchanged section listing") and "index.html" in line
+                            and "page" not in line for line in logs))
+        self.assertIn("Post 0", self.read("blog/page/2/index.html"))
+
+        # Fewer pages than before: the stale page is removed
+        index, logs = self.build(per_page=10)
+        self.assertFalse(os.path.exists(os.path.join(self.dest, "blog", "page")))
+
+    def test_titles_are_not_markdown(self):
+        self.add_post("blog/post4/index.md", "---\ntitle: Using snake_case names\ndate: 2024-05-04\n---\nBody")
+        self.add_post("blog/post5/index.md", "---\ntitle: [Draft] **a** < b\ndate: 2024-05-05\n---\nBody")
+        self.build(per_page=10)
+        listing = self.read("blog/index.html")
+        self.assertIn('<li><a href="/blog/post5/">[Draft] **a** &lt; b</a> (2024-05-05)</li>', listing)
+        self.assertIn('<li><a href="/blog/post4/">Using snake_case names</a> (2024-05-04)</li>', listing)
+
+    def test_conflicting_hand_written_index(self):
+        self.add_post("blog/index.md", "# Blog")
+        with self.assertRaisesRegex(ValueError, "conflicts"):
+            self.build()
+
+    def test_conflict_recorded_with_errors_list(self):
+        self.add_post("blog/index.md", "# Blog")
+        index = SectionIndex(self.content, [Section("blog", 2)], cache_path=self.cache)
+        site_index = SiteIndex()
+        errors = []
+        generate_pages_recursive(self.content, self.template, self.dest, logger=lambda msg: None, sections=index,
+                                 site_index=site_index, errors=errors)
+        self.assertEqual([error.path for error in errors], ["blog/index.html"])
+        self.assertIn("conflicts", str(errors[0]))
+        # The rest of the build, including the site index, still finished
+        self.assertIn("Post 1", self.read("blog/page/2/index.html"))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "search-index.json")))
+
+    def test_unlistable_section_recorded_with_errors_list(self):
+        index = SectionIndex(self.content, [Section("nope"), Section("blog", 2), Section("blog/post1", 0)],
+                             cache_path=self.cache)
+        site_index = SiteIndex()
+        errors = []
+        generate_pages_recursive(self.content, self.template, self.dest, logger=lambda msg: None, sections=index,
+                                 site_index=site_index, errors=errors)
+        self.assertEqual([error.path for error in errors],
+                         [os.path.join(self.content, "nope"), os.path.join(self.content, "blog", "post1")])
+        self.assertIn("not found", str(errors[0]))
+        self.assertIn("at least one post per page", str(errors[1]))
+        self.assertIn("Post 1", self.read("blog/page/2/index.html"))
+        self.assertTrue(os.path.exists(os.path.join(self.dest, "search-index.json")))
+
+    def test_sink_destination(self):
+        index = SectionIndex(self.content, [Section("blog", 2)])
+        sink = DirectorySink(self.dest)
+        generate_pages_recursive(self.content, self.template, sink, logger=lambda msg: None, sections=index)
+        sink.close()
+        self.assertIn("Post 3", self.read("blog/index.html"))
+
+
+if __name__ == "__main__":
+    unittest.main()
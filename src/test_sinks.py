@@ -0,0 +1,76 @@
+import os
+import tarfile
+import tempfile
+import unittest
+import zipfile
+
+from fs_utils import copy_dir_recursive
+from generator import generate_pages_recursive
+from sinks import ArchiveSink, DirectorySink, open_sink
+
+
+class TestSinks(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+        self.static = os.path.join(self.tmp.name, "static")
+        os.makedirs(os.path.join(self.static, "images"))
+        for rel, data in [("index.css", b"body{}"), ("images/b.png", b"\x89PNG"), ("images/a.png", b"\x89PNG!")]:
+            with open(os.path.join(self.static, *rel.split("/")), "wb") as f:
+                f.write(data)
+        self.content = os.path.join(self.tmp.name, "content")
+        os.makedirs(os.path.join(self.content, "blog"))
+        for rel, text in [("index.md", "# Home\n\n[post](/blog)"), ("blog/index.md", "# Blog")]:
+            with open(os.path.join(self.content, *rel.split("/")), "w", encoding="utf-8") as f:
+                f.write(text)
+        self.template = os.path.join(self.tmp.name, "template.html")
+        with open(self.template, "w", encoding="utf-8") as f:
+            f.write("<title>{{ Title }}</title>{{ Content }}")
+
+    def _build(self, name):
+        path = os.path.join(self.tmp.name, name)
+        with open_sink(path) as sink:
+            copy_dir_recursive(self.static, sink, logger=lambda msg: None)
+            generate_pages_recursive(self.content, self.template, sink, basepath="/site/", logger=lambda msg: None)
+        with open(path, "rb") as f:
+            return path, f.read()
+
+    def test_tar_gz_reproducible_and_ordered(self):
+        path, first = self._build("a.tar.gz")
+        _, second = self._build("b.tar.gz")
+        self.assertEqual(first, second)
+        with tarfile.open(path) as tar:
+            self.assertEqual(tar.getnames(), ["index.css", "images/a.png", "images/b.png", "index.html", "blog/index.html"])
+            self.assertTrue(all(member.mtime == 0 for member in tar.getmembers()))
+            page = tar.extractfile("index.html").read()
+        self.assertIn(b'<a href="/site/blog">post</a>', page)
+
+    def test_zip_reproducible(self):
+        path, first = self._build("a.zip")
+        _, second = self._build("b.zip")
+        self.assertEqual(first, second)
+        with zipfile.ZipFile(path) as archive:
+            self.assertEqual(archive.read("images/b.png"), b"\x89PNG")
+
+    def test_directory_sink(self):
+        out = os.path.join(self.tmp.name, "out")
+        sink = open_sink(out)
+        self.assertIsInstance(sink, DirectorySink)
+        sink.write("blog/index.html", b"<p>x</p>")
+        with open(os.path.join(out, "blog", "index.html"), "rb") as f:
+            self.assertEqual(f.read(), b"<p>x</p>")
+
+    def test_duplicate_member_rejected(self):
+        with ArchiveSink(os.path.join(self.tmp.name, "dup.tar")) as sink:
+            sink.write("a.html", b"1")
+            with self.assertRaises(ValueError):
+                sink.write("a.html", b"2")
+
+    def test_unsupported_format(self):
+        with self.assertRaises(ValueError):
+            ArchiveSink(os.path.join(self.tmp.name, "site.rar"))
+
+
+if __name__ == "__main__":
+    unittest.main()
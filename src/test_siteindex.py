@@ -0,0 +1,78 @@
+import json
+import os
+import tempfile
+import unittest
+
+from generator import build_site, generate_pages_recursive
+from siteindex import SiteIndex, page_url, SITEMAP, SEARCH_INDEX
+
+
+TEMPLATE = "<title>{{ Title }}</title>{{ Content }}"
+
+
+class TestSiteIndex(unittest.TestCase):
+
+    def test_page_url(self):
+        self.assertEqual(page_url("index.html"), "/")
+        self.assertEqual(page_url("blog/tom/index.html", "/site"), "/site/blog/tom/")
+        self.assertEqual(page_url("about.html"), "/about.html")
+
+    def test_built_from_render(self):
+        index = SiteIndex("https://example.com")
+        source = {"blog/index.md": "# Blog\n\nSome **bold** words.\n\n## Part one\n\n- a\n- b\n\n```\nskipped code\n```"}
+        list(build_site(source, TEMPLATE, site_index=index))
+        entry = index.entries["/blog/"]
+        self.assertEqual(entry["title"], "Blog")
+        self.assertEqual(entry["headings"], ["Part one"])
+        self.assertEqual(entry["text"], "Some bold words. a b")
+        self.assertIn(b"<loc>https://example.com/blog/</loc>", index.sitemap_bytes())
+
+    def test_text_is_unescaped(self):
+        index = SiteIndex()
+        list(build_site({"index.md": "# T\n\nQ&A: a < b"}, TEMPLATE, site_index=index))
+        self.assertEqual(index.entries["/"]["text"], "Q&A: a < b")
+
+    def test_text_limit(self):
+        index = SiteIndex()
+        list(build_site({"index.md": "# T\n\n" + "word " * 100}, TEMPLATE, site_index=index))
+        self.assertEqual(len(index.entries["/"]["text"]), 300)
+
+    def test_incremental_update_and_prune(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            content = os.path.join(tmp, "content")
+            dest = os.path.join(tmp, "docs")
+            os.makedirs(os.path.join(content, "old"))
+            os.makedirs(dest)
+            template = os.path.join(tmp, "template.html")
+            for path, text in [(template, TEMPLATE), (os.path.join(content, "index.md"), "# Home"),
+                               (os.path.join(content, "old", "index.md"), "# Old")]:
+                with open(path, "w", encoding="utf-8") as f:
+                    f.write(text)
+
+            generate_pages_recursive(content, template, dest, logger=lambda msg: None,
+                                     site_index=SiteIndex("https://example.com"))
+            os.remove(os.path.join(content, "old", "index.md"))
+            with open(os.path.join(content, "index.md"), "w", encoding="utf-8") as f:
+                f.write("# New Home")
+            index = SiteIndex.load(dest, "https://example.com")
+            self.assertEqual(sorted(index.entries), ["/", "/old/"])
+            generate_pages_recursive(content, template, dest, logger=lambda msg: None, site_index=index)
+
+            with open(os.path.join(dest, SEARCH_INDEX), encoding="utf-8") as f:
+                entries = json.load(f)
+            self.assertEqual([(e["url"], e["title"]) for e in entries], [("/", "New Home")])
+            with open(os.path.join(dest, SITEMAP), encoding="utf-8") as f:
+                self.assertNotIn("/old/", f.read())
+
+    def test_no_sitemap_without_site_url(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            index = SiteIndex()
+            list(build_site({"index.md": "# Home"}, TEMPLATE, site_index=index))
+            logs = []
+            index.write(tmp, logger=logs.append)
+            self.assertEqual(os.listdir(tmp), [SEARCH_INDEX])
+            self.assertTrue(any(SITEMAP in line for line in logs))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,92 @@
+import os
+import random
+import tracemalloc
+import unittest
+
+from converter import block_to_html, markdown_to_html
+from markdown_extract import parse_block
+from spans import span_text, span_url, text_to_spans, write_block, write_markdown
+from splitter import text_to_textnodes
+from textnode import TextType
+
+
+class TestTextToSpans(unittest.TestCase):
+
+    def _nodes(self, source, start=0, end=None):
+        return [(span[0], span_text(source, span), span_url(source, span))
+                for span in text_to_spans(source, start, end)]
+
+    def test_spans_point_into_source(self):
+        source = "skip **bold** and [link](/a) ![img](/b.png) done"
+        spans = list(text_to_spans(source, 5))
+        self.assertEqual(spans[0], (TextType.BOLD, 7, 11))
+        self.assertEqual(self._nodes(source, 5), [
+            (TextType.BOLD, "bold", None),
+            (TextType.PLAIN, " and ", None),
+            (TextType.LINK, "link", "/a"),
+            (TextType.PLAIN, " ", None),
+            (TextType.IMAGE, "", "/b.png"),
+            (TextType.PLAIN, " done", None),
+        ])
+
+    def test_matches_text_nodes(self):
+        rng = random.Random(5)
+        for _ in range(3000):
+            text = "".join(rng.choice("ab _*`[]()!\n<&") for _ in range(rng.randint(0, 18)))
+            try:
+                expected = [(node.text_type, node.text, node.URL) for node in text_to_textnodes(text)]
+            except ValueError:
+                with self.assertRaises(ValueError):
+                    self._nodes("<" + text + ">", 1, len(text) + 1)
+                continue
+            self.assertEqual(self._nodes("<" + text + ">", 1, len(text) + 1), expected, text)
+
+
+class TestWriteMarkdown(unittest.TestCase):
+
+    def _render(self, markdown):
+        out = []
+        write_markdown(markdown, out.append)
+        return "".join(out)
+
+    def test_matches_string_path(self):
+        blocks = ["# Head **b**", "## x_y_", "```\ncode <\n\nmore\n```", "> q _a\n> b_ c",
+                  "- [l](u)\n- ![i](s)", "1. one\n2. `t`", "para & <tag> **x**", "- ", "#nohash"]
+        rng = random.Random(9)
+        for _ in range(2000):
+            markdown = "\n\n".join(rng.choice(blocks) for _ in range(rng.randint(1, 5)))
+            try:
+                expected = markdown_to_html(markdown)
+            except ValueError:
+                with self.assertRaises(ValueError):
+                    self._render(markdown)
+                continue
+            self.assertEqual(self._render(markdown), expected, markdown)
+
+    def test_links_collected(self):
+        links = []
+        write_markdown("[a](/x) ![b](/y.png)\n\n- [c](/z)", [].append, links)
+        self.assertEqual(links, ["/x", "/y.png", "/z"])
+
+    def test_empty_document_raises(self):
+        with self.assertRaises(ValueError):
+            write_markdown("\n\n", [].append)
+
+    def test_large_block_is_not_copied(self):
+        # Written to a file, the spans path holds one node at a time
+        text = "\n".join(f"- item {i} with _italic_ text and a [link](/p/{i})" for i in range(3000))
+        block = parse_block(text)
+        with open(os.devnull, "w") as out:
+            peaks = []
+            for render in (lambda: out.write(block_to_html(block)), lambda: write_block(block, out.write)):
+                tracemalloc.start()
+                try:
+                    render()
+                    peaks.append(tracemalloc.get_traced_memory()[1])
+                finally:
+                    tracemalloc.stop()
+        self.assertLess(peaks[1] * 5, peaks[0])
+
+
+if __name__ == "__main__":
+    unittest.main()
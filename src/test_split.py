@@ -248,5 +248,27 @@ class TestTextToTextNodes(unittest.TestCase):
         ]
         self.assertEqual(nodes, expected)
 
+class TestPathologicalInput(unittest.TestCase):
+
+    # How these inputs scale is measured by `bench.py pathological_inline`
+
+    def test_unclosed_brackets(self):
+        for unit in ("[", "![", "](", "![a](", "[a](", "![](\n", "[a](\n"):
+            nodes = text_to_textnodes(unit * 100000)
+            self.assertEqual(nodes, [TextNode(unit * 100000, TextType.PLAIN)])
+
+    def test_delimiter_runs(self):
+        self.assertEqual(text_to_textnodes("**" * 100000), [])
+        self.assertEqual(text_to_textnodes("_" * 100000), [])
+        with self.assertRaises(ValueError):
+            text_to_textnodes("_" * 100001)
+
+    def test_many_links_on_one_line(self):
+        text = "[a](b) " * 20000
+        nodes = split_nodes_link([TextNode(text, TextType.PLAIN)])
+        self.assertEqual(len(nodes), 40000)
+        self.assertEqual(nodes[-2], TextNode("a", TextType.LINK, "b"))
+
+
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,99 @@
+import os
+import tempfile
+import time
+import unittest
+
+from generator import generate_pages_recursive, render_page
+from templates import TemplateLoader, compile_template, load_template, select_template
+
+
+class TestTemplates(unittest.TestCase):
+
+    def setUp(self):
+        self._tmp = tempfile.TemporaryDirectory()
+        self.root = self._tmp.name
+
+    def tearDown(self):
+        self._tmp.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.root, *name.split("/"))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "w") as f:
+            f.write(text)
+        return path
+
+    def test_render_and_split(self):
+        template = compile_template("<t>{{ Title }}</t>{{Content}}|{{ date }}|{{ Content }}")
+        self.assertEqual(template.render({"Title": "T", "Content": "C"}), "<t>T</t>C||C")
+        self.assertEqual(template.split({"Title": "T", "date": "D"}, "Content"), ["<t>T</t>", "|D|", ""])
+
+    def test_include_and_extends(self):
+        self.write("partials/nav.html", '<nav><a href="/">{{ Title }}</a></nav>')
+        self.write("base.html", '<html>{% include "partials/nav.html" %}'
+                                '{% block main %}<p>default</p>{% endblock %}'
+                                '{% block footer %}<footer>base</footer>{% endblock %}</html>')
+        self.write("post.html", '{% extends "base.html" %}ignored'
+                                '{% block main %}<article>{{ Content }}</article>{% endblock %}')
+        self.write("review.html", '{% extends "post.html" %}{% block footer %}<footer>review</footer>{% endblock %}')
+        loader = TemplateLoader(self.root)
+        context = {"Title": "T", "Content": "C"}
+        self.assertEqual(loader.get("post.html").render(context),
+                         '<html><nav><a href="/">T</a></nav><article>C</article><footer>base</footer></html>')
+        self.assertEqual(loader.get("review.html").render(context),
+                         '<html><nav><a href="/">T</a></nav><article>C</article><footer>review</footer></html>')
+
+    def test_invalidated_by_mtime(self):
+        self.write("partial.html", "one")
+        path = self.write("page.html", '{% include "partial.html" %}')
+        loader = TemplateLoader(self.root)
+        first = loader.get("page.html")
+        self.assertIs(loader.get("page.html"), first)
+
+        partial = self.write("partial.html", "two")
+        later = time.time() + 10
+        os.utime(partial, (later, later))
+        self.assertEqual(loader.get("page.html").render({}), "two")
+        self.assertEqual(load_template(path).render({}), "two")
+
+    def test_errors(self):
+        self.write("loop.html", '{% include "loop.html" %}')
+        with self.assertRaisesRegex(ValueError, "itself"):
+            TemplateLoader(self.root).get("loop.html")
+        with self.assertRaisesRegex(ValueError, "Unclosed"):
+            compile_template("a\n{% block main %}")
+        with self.assertRaisesRegex(ValueError, "line 2"):
+            compile_template("a\n{% endblock %}")
+        with self.assertRaisesRegex(ValueError, "Unknown template tag"):
+            compile_template("{% for x %}")
+        with self.assertRaisesRegex(ValueError, "loaded from a file"):
+            compile_template('{% include "x.html" %}')
+
+    def test_select_template(self):
+        sections = {"blog": "blog.html", "blog/reviews/": "review.html"}
+        self.assertEqual(select_template("blog/tom/index.html", "t.html", sections), "blog.html")
+        self.assertEqual(select_template("blog/reviews/a/index.html", "t.html", sections), "review.html")
+        self.assertEqual(select_template("blogroll/index.html", "t.html", sections), "t.html")
+        self.assertEqual(select_template("index.html", "t.html"), "t.html")
+
+    def test_render_page_uses_front_matter_and_basepath(self):
+        template = compile_template('<a href="/">{{ Title }}</a> {{ author }}{{ Content }}')
+        page = render_page("---\nauthor: Tom\n---\n# Hi\n\n[x](/x)", template, basepath="/site")
+        self.assertEqual(page, '<a href="/site/">Hi</a> Tom<div><h1>Hi</h1><p><a href="/site/x">x</a></p></div>')
+
+    def test_section_templates(self):
+        for rel, text in {"index.md": "# Home", "blog/tom/index.md": "# Tom"}.items():
+            self.write("content/" + rel, text)
+        default = self.write("template.html", "<main>{{ Content }}</main>")
+        blog = self.write("blog.html", "<article>{{ Content }}</article>")
+        dest = os.path.join(self.root, "docs")
+        generate_pages_recursive(os.path.join(self.root, "content"), default, dest, logger=lambda msg: None,
+                                 section_templates={"blog": blog})
+        with open(os.path.join(dest, "index.html")) as f:
+            self.assertTrue(f.read().startswith("<main>"))
+        with open(os.path.join(dest, "blog", "tom", "index.html")) as f:
+            self.assertTrue(f.read().startswith("<article>"))
+
+
+if __name__ == "__main__":
+    unittest.main()